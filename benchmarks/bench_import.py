@@ -0,0 +1,43 @@
+"""Time ``import core`` in fresh interpreters, lazily and with every submodule loaded.
+
+Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/bench_import.py
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+
+STATEMENTS = {
+    "import core": "import core",
+    "messages only": "import core; core.Command",
+    "message bus": "import core; core.Bootstrapper; core.MessageBus",
+    "everything": "import core, core.views, core.unit_of_work, core.orm",
+}
+
+
+def measure(statement: str, repeat: int) -> float:
+    """Fastest wall time of ``repeat`` interpreters running ``statement``."""
+    env = dict(os.environ)
+    env.setdefault("PYTHONPATH", "src")
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], env=env, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(repeat: int = 10):
+    baseline = measure("pass", repeat)
+    for name, statement in STATEMENTS.items():
+        seconds = measure(statement, repeat) - baseline
+        print(f"{name:>14}: {seconds * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""Throughput and latency of the hot paths, against SQLite and the test doubles.
+
+Run from the repository root:
+
+    PYTHONPATH=src:. python -m benchmarks.suite --output results.json
+    PYTHONPATH=src:. python -m benchmarks.suite --compare results.json
+
+``--quick`` limits the tables to 1k rows; ``--group`` and ``-k`` select cases.
+"""
+
+from . import bootstrapper, bus, repository, serialization, views
+from .harness import *
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+import tempfile
+
+from . import harness
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--output", type=pathlib.Path, help="write results as JSON")
+    parser.add_argument(
+        "--compare",
+        type=pathlib.Path,
+        help="fail when a median is slower than in this results file",
+    )
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--group", action="append", choices=sorted(harness.SUITES))
+    parser.add_argument("-k", dest="pattern", help="substring of group/name")
+    parser.add_argument("--quick", action="store_true", help="1k row tables only")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+def report(result: harness.Result):
+    print(
+        f"{result.key:<40} {result.median * 1e6:12.2f} us"
+        f"  +- {result.stdev * 1e6:9.2f}  {result.ops:12.1f} ops/s",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as workdir:
+        context = harness.Context(
+            workdir=pathlib.Path(workdir),
+            sizes=(1_000,) if args.quick else (1_000, 100_000),
+            repeat=args.repeat,
+            min_time=args.min_time,
+        )
+        results = harness.run(context, args.group, args.pattern, report)
+
+    if args.output:
+        harness.write_json(results, args.output, context)
+    if args.compare:
+        regressions = harness.compare(results, args.compare, args.threshold)
+        for key, ratio in regressions:
+            print(f"regression: {key} is {ratio:.2f}x the baseline median")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""Bootstrapper construction and bootstrap() with the fake routers."""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+import core
+from tests.double import fake
+
+from . import environment, harness
+
+
+@harness.suite("bootstrapper")
+def cases(context: harness.Context) -> Iterator[harness.Case]:
+    kwargs = {
+        "command_router": {
+            fake.CreateModelCommand: fake.create_model,
+            fake.CreateModelErrorCommand: fake.create_model_with_error,
+        },
+        "event_router": {
+            fake.CreatedModelEvent: [
+                fake.handle_created_model_1,
+                fake.handle_created_model_2,
+            ],
+            fake.CreatedModelErrorEvent: [fake.handle_created_model_3],
+        },
+        "dependencies": {"uow": core.UnitOfWork(environment.memory_config())},
+    }
+    yield harness.Case("construct", lambda: core.Bootstrapper(**kwargs))
+    yield harness.Case("bootstrap", lambda: core.Bootstrapper(**kwargs).bootstrap())
@@ -0,0 +1,72 @@
+"""MessageBus.handle: event cascades on the in-memory adapter, commands on SQLite."""
+
+from __future__ import annotations
+
+import dataclasses
+import itertools
+from typing import Iterator
+
+import core
+from tests.double import fake
+
+from . import environment, harness
+
+
+class StartCascade(core.Command):
+    depth: int
+
+
+class Cascaded(core.Event):
+    depth: int
+
+
+@dataclasses.dataclass
+class Node(core.BaseModel):
+    depth: int = 0
+
+
+def _record(uow: core.UnitOfWork, depth: int):
+    with uow:
+        node = Node(depth=depth)
+        node.events.append(Cascaded(depth=depth))
+        uow.repo.add(node)
+        uow.commit()
+
+
+def start_cascade(command: StartCascade, uow: core.UnitOfWork):
+    _record(uow, command.depth)
+
+
+def cascade(event: Cascaded, uow: core.UnitOfWork):
+    # Every level records the event of the next one, down to depth 0.
+    if event.depth > 0:
+        _record(uow, event.depth - 1)
+
+
+@harness.suite("bus")
+def cases(context: harness.Context) -> Iterator[harness.Case]:
+    bus = core.Bootstrapper(
+        command_router={StartCascade: start_cascade},
+        event_router={Cascaded: [cascade]},
+        dependencies={"uow": core.UnitOfWork(environment.memory_config())},
+    ).bootstrap()
+    for depth in (1, 10, 100):
+        command = StartCascade(depth=depth)
+        yield harness.Case(
+            f"handle_cascade[{depth}]",
+            lambda: bus.handle(command),
+            params={"depth": depth, "framework": "memory"},
+        )
+
+    with environment.database(context.workdir, 0) as (config, _):
+        bus = core.Bootstrapper(
+            command_router={fake.CreateModelCommand: fake.create_model},
+            event_router={fake.CreatedModelEvent: []},
+            dependencies={"uow": core.UnitOfWork(config)},
+        ).bootstrap()
+        names = itertools.count()
+        yield harness.Case(
+            "handle_create_model",
+            lambda: bus.handle(fake.CreateModelCommand(name=str(next(names)))),
+            params={"framework": "sqlalchemy"},
+        )
@@ -0,0 +1,84 @@
+"""SQLite databases holding the test double ``fake.Model``."""
+
+from __future__ import annotations
+
+import contextlib
+import pathlib
+import uuid
+from typing import Any, Iterator
+
+import sqlalchemy
+
+import core
+from core.adapters import sqlalchemy_adapter
+from tests.double import fake
+
+_METADATA: sqlalchemy.MetaData | None = None
+
+
+def sqlite_config(path: pathlib.Path) -> dict[str, Any]:
+    return {"framework": "sqlalchemy", "connection": {"url": f"sqlite:///{path}"}}
+
+
+def memory_config() -> dict[str, Any]:
+    return {"framework": "memory", "connection": {"url": f"memory://{uuid.uuid4()}"}}
+
+
+def _map(factory: sqlalchemy_adapter.ComponentFactory) -> sqlalchemy.MetaData:
+    """Map fake.Model once per process, the way tests/conftest.py does."""
+    global _METADATA
+    if _METADATA is None:
+        registry = factory.create_orm_registry()
+        table = sqlalchemy.Table(
+            "models",
+            registry.metadata,
+            sqlalchemy.Column("id", sqlalchemy.String(200), primary_key=True),
+            sqlalchemy.Column("created_time", sqlalchemy.DateTime),
+            sqlalchemy.Column("updated_time", sqlalchemy.DateTime),
+            sqlalchemy.Column("message_id", sqlalchemy.String(200)),
+            sqlalchemy.Column("name", sqlalchemy.String(200)),
+        )
+        registry.map_imperatively(fake.Model, table)
+        _METADATA = registry.metadata
+    return _METADATA
+
+
+def seed(config: dict[str, Any], rows: int, batch_size: int = 10_000) -> list[str]:
+    """Insert ``rows`` models named by their position; return their ids."""
+    ids = []
+    uow = core.UnitOfWork(config)
+    for start in range(0, rows, batch_size):
+        models = [
+            fake.Model(name=f"model-{i:08d}")
+            for i in range(start, min(rows, start + batch_size))
+        ]
+        with uow:
+            uow.repo.add(models, bulk=True)
+            uow.commit()
+        ids.extend(model.id for model in models)
+    return ids
+
+
+@contextlib.contextmanager
+def database(
+    workdir: pathlib.Path,
+    rows: int,
+) -> Iterator[tuple[dict[str, Any], list[str]]]:
+    """database.
+
+    Args:
+        workdir (pathlib.Path): workdir
+        rows (int): models to insert.
+
+    Returns:
+        tuple[dict[str, Any], list[str]]: the database config and the model ids.
+    """
+    path = workdir / f"models-{rows}-{uuid.uuid4().hex[:8]}.db"
+    config = sqlite_config(path)
+    factory = sqlalchemy_adapter.ComponentFactory(config)
+    _map(factory).create_all(bind=factory.engine)
+    try:
+        yield config, seed(config, rows)
+    finally:
+        sqlalchemy_adapter.dispose_all()
+        path.unlink(missing_ok=True)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import json
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from typing import Any, Callable, Iterator
+
+__all__ = [
+    "Case",
+    "Context",
+    "Result",
+    "suite",
+    "run",
+    "write_json",
+    "compare",
+]
+
+
+@dataclasses.dataclass
+class Context:
+    """Context.
+
+    Attributes:
+        workdir (pathlib.Path): Scratch directory for the SQLite databases.
+        sizes (tuple[int, ...]): Table sizes of the repository and view cases.
+        repeat (int): Timing rounds per case.
+        min_time (float): Seconds each round runs for at least.
+    """
+
+    workdir: pathlib.Path
+    sizes: tuple[int, ...] = (1_000, 100_000)
+    repeat: int = 5
+    min_time: float = 0.2
+
+
+@dataclasses.dataclass
+class Case:
+    """One timed operation; ``func`` is called repeatedly without arguments."""
+
+    name: str
+    func: Callable[[], Any]
+    params: dict[str, Any] = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class Result:
+    """Result.
+
+    Timings are seconds per call of the case's ``func``.
+    """
+
+    group: str
+    name: str
+    params: dict[str, Any]
+    rounds: int
+    iterations: int
+    min: float
+    median: float
+    mean: float
+    stdev: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.group}/{self.name}"
+
+    @property
+    def ops(self) -> float:
+        return 1 / self.median if self.median else float("inf")
+
+
+# Group name to a generator of cases. Cases are timed while the generator is
+# suspended on them, so it can hold databases open around its ``yield``.
+SUITES: dict[str, Callable[[Context], Iterator[Case]]] = {}
+
+
+def suite(group: str):
+    """Register a case generator under ``group``."""
+
+    def decorator(func: Callable[[Context], Iterator[Case]]):
+        SUITES[group] = func
+        return func
+
+    return decorator
+
+
+def measure(case: Case, context: Context) -> tuple[int, list[float]]:
+    """measure.
+
+    Args:
+        case (Case): case
+        context (Context): context
+
+    Returns:
+        tuple[int, list[float]]: calls per round, and the seconds per call of
+            every round.
+    """
+    timer = timeit.Timer(case.func)
+    number, seconds = timer.autorange()
+    if seconds < context.min_time:
+        number = max(1, round(number * context.min_time / seconds))
+    rounds = timer.repeat(repeat=context.repeat, number=number)
+    return number, [seconds / number for seconds in rounds]
+
+
+def run(
+    context: Context,
+    groups: list[str] | None = None,
+    pattern: str | None = None,
+    report: Callable[[Result], None] = lambda result: None,
+) -> list[Result]:
+    """run.
+
+    Args:
+        context (Context): context
+        groups (list[str] | None): groups to run. Defaults to None (all).
+        pattern (str | None): substring of "group/name" a case must contain.
+        report (Callable[[Result], None]): called with every result as it is ready.
+
+    Returns:
+        list[Result]: results
+    """
+    results = []
+    for group, cases in SUITES.items():
+        if groups and group not in groups:
+            continue
+        for case in cases(context):
+            if pattern and pattern not in f"{group}/{case.name}":
+                continue
+            number, timings = measure(case, context)
+            result = Result(
+                group=group,
+                name=case.name,
+                params=case.params,
+                rounds=len(timings),
+                iterations=number,
+                min=min(timings),
+                median=statistics.median(timings),
+                mean=statistics.fmean(timings),
+                stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            )
+            report(result)
+            results.append(result)
+    return results
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_json(results: list[Result], path: pathlib.Path, context: Context):
+    """Write the results with the commit and machine they were measured on."""
+    document = {
+        "metadata": {
+            "commit": _commit(),
+            "created": datetime.datetime.now(datetime.UTC).isoformat(),
+            "python": sys.version,
+            "platform": platform.platform(),
+            "sizes": list(context.sizes),
+            "repeat": context.repeat,
+        },
+        "benchmarks": [
+            {"key": result.key, **dataclasses.asdict(result), "ops": result.ops}
+            for result in results
+        ],
+    }
+    path.write_text(json.dumps(document, indent=2))
+
+
+def compare(
+    results: list[Result],
+    baseline: pathlib.Path,
+    threshold: float,
+) -> list[tuple[str, float]]:
+    """compare.
+
+    Args:
+        results (list[Result]): results
+        baseline (pathlib.Path): a file written by ``write_json``.
+        threshold (float): tolerated slowdown of the median, e.g. 0.1 for 10%.
+
+    Returns:
+        list[tuple[str, float]]: key and median ratio (new / baseline) of every
+            case slower than the threshold allows.
+    """
+    previous = {
+        entry["key"]: entry["median"]
+        for entry in json.loads(baseline.read_text())["benchmarks"]
+    }
+    regressions = []
+    for result in results:
+        median = previous.get(result.key)
+        if not median:
+            continue
+        ratio = result.median / median
+        if ratio > 1 + threshold:
+            regressions.append((result.key, ratio))
+    return regressions
@@ -0,0 +1,43 @@
+"""Repository.add and get against SQLite tables of every context size."""
+
+from __future__ import annotations
+
+import itertools
+import random
+from typing import Iterator
+
+import core
+from tests.double import fake
+
+from . import environment, harness
+
+BATCH = 100
+
+
+@harness.suite("repository")
+def cases(context: harness.Context) -> Iterator[harness.Case]:
+    for rows in context.sizes:
+        with environment.database(context.workdir, rows) as (config, ids):
+            uow = core.UnitOfWork(config)
+            names = itertools.count()
+            picks = random.Random(rows)
+
+            def add(bulk: bool):
+                models = [fake.Model(name=f"added-{next(names)}") for _ in range(BATCH)]
+                with uow:
+                    uow.repo.add(models, bulk=bulk)
+                    uow.commit()
+
+            def get():
+                with uow:
+                    uow.repo.get_model(fake.Model, id=picks.choice(ids))
+
+            def get_many():
+                with uow:
+                    uow.repo.get_many(fake.Model, picks.sample(ids, BATCH))
+
+            params = {"rows": rows, "batch": BATCH}
+            yield harness.Case(f"add[{rows}]", lambda: add(False), params)
+            yield harness.Case(f"add_bulk[{rows}]", lambda: add(True), params)
+            yield harness.Case(f"get[{rows}]", get, {"rows": rows})
+            yield harness.Case(f"get_many[{rows}]", get_many, params)
@@ -0,0 +1,23 @@
+"""BaseModel.json and BaseModel.list_json on the fake.Model test double."""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+import core
+from tests.double import fake
+
+from . import harness
+
+
+@harness.suite("serialization")
+def cases(context: harness.Context) -> Iterator[harness.Case]:
+    model = fake.Model(name="model")
+    yield harness.Case("json", lambda: model.json)
+    for count in (10, 1_000):
+        models = [fake.Model(name=f"model-{i}") for i in range(count)]
+        yield harness.Case(
+            f"list_json[{count}]",
+            lambda: core.BaseModel.list_json(models),
+            {"models": count},
+        )
@@ -0,0 +1,54 @@
+"""View.fetch_models with offset and keyset pagination, near the start and the end."""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+import core
+from core import pagination
+from tests.double import fake
+
+from . import environment, harness
+
+LIMIT = 20
+ORDERS = "+name"
+
+
+@harness.suite("views")
+def cases(context: harness.Context) -> Iterator[harness.Case]:
+    for rows in context.sizes:
+        with environment.database(context.workdir, rows) as (config, _):
+            view = core.View(config)
+
+            def offset_page(offset: int):
+                with view.fetch_models(
+                    fake.Model, orders=ORDERS, limit=LIMIT, offset=offset
+                ) as models:
+                    return models
+
+            def keyset_page(cursor: str | None):
+                with view.fetch_models(
+                    fake.Model,
+                    orders=ORDERS,
+                    limit=LIMIT,
+                    mode="keyset",
+                    cursor=cursor,
+                ) as page:
+                    return page
+
+            # The cursor after the second to last page, built from its last row.
+            keys = pagination.parse_orders(ORDERS)
+            deep = offset_page(rows - 2 * LIMIT)[-1]
+            cursor = pagination.encode_cursor(deep, keys, pagination.NEXT)
+
+            params = {"rows": rows, "limit": LIMIT}
+            yield harness.Case(f"offset_first[{rows}]", lambda: offset_page(0), params)
+            yield harness.Case(
+                f"offset_last[{rows}]", lambda: offset_page(rows - LIMIT), params
+            )
+            yield harness.Case(
+                f"keyset_first[{rows}]", lambda: keyset_page(None), params
+            )
+            yield harness.Case(
+                f"keyset_last[{rows}]", lambda: keyset_page(cursor), params
+            )
@@ -1,8 +1,117 @@
-from .adapters import sqlalchemy_adapter
-from .bootstrap import *
-from .message_bus import *
-from .messages import *
-from .models import *
-from .orm import *
-from .unit_of_work import *
-from .views import *
+"""core.
+
+Public names are imported from their submodules on first access, so that
+``import core`` stays cheap and reads no configuration.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .adapters import sqlalchemy_adapter
+    from .bootstrap import *
+    from .caching import *
+    from .encoders import *
+    from .instrumentation import *
+    from .message_bus import *
+    from .messages import *
+    from .models import *
+    from .orm import *
+    from .outbox import *
+    from .pagination import *
+    from .statements import *
+    from .unit_of_work import *
+    from .views import *
+
+_EXPORTS: dict[str, tuple[str, ...]] = {
+    "bootstrap": ("Bootstrapper", "CommandRouter", "EventRouter", "Dependencies"),
+    "caching": ("ResultCache", "LRUCache"),
+    "encoders": (
+        "Encoder",
+        "JsonEncoder",
+        "OrjsonEncoder",
+        "get_encoder",
+        "set_encoder",
+    ),
+    "instrumentation": (
+        "Hook",
+        "Histogram",
+        "MetricsCollector",
+        "PrometheusExporter",
+        "RelayMetrics",
+    ),
+    "message_bus": ("MessageBus", "AsyncMessageBus", "Route"),
+    "messages": (
+        "Message",
+        "Command",
+        "Event",
+        "LightMessage",
+        "LightCommand",
+        "LightEvent",
+        "COMMAND_TYPES",
+        "EVENT_TYPES",
+    ),
+    "models": ("BaseModel", "EventList", "is_serializable"),
+    "orm": ("PyDict", "PyList", "MAPPED_ORM", "map_once"),
+    "outbox": ("Outbox", "OutboxRelay"),
+    "pagination": ("Page", "InvalidCursorException"),
+    "statements": ("StatementStats", "NPlusOneDetector", "NPlusOneDetected"),
+    "unit_of_work": (
+        "BaseUnitOfWork",
+        "UnitOfWork",
+        "AsyncUnitOfWork",
+        "UnsupportedDatabaseFrameworkException",
+    ),
+    "views": ("View", "VIEW", "get_view", "set_view"),
+}
+_ORIGINS: dict[str, str] = {
+    name: module for module, names in _EXPORTS.items() for name in names
+}
+_SUBMODULES: dict[str, str] = {
+    name: f"{__name__}.{name}"
+    for name in (
+        "abstract",
+        "adapters",
+        "bootstrap",
+        "caching",
+        "configurations",
+        "dependency_injection",
+        "encoders",
+        "identity_map",
+        "instrumentation",
+        "message_bus",
+        "messages",
+        "models",
+        "orm",
+        "outbox",
+        "pagination",
+        "statements",
+        "unit_of_work",
+        "views",
+    )
+}
+_SUBMODULES["sqlalchemy_adapter"] = f"{__name__}.adapters.sqlalchemy_adapter"
+# Rebound by their modules after import, so they are looked up on every access.
+_DYNAMIC = {"VIEW", "MAPPED_ORM"}
+
+__all__ = [*_ORIGINS, "sqlalchemy_adapter"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        value = importlib.import_module(_SUBMODULES[name])
+    elif name in _ORIGINS:
+        module = importlib.import_module(f"{__name__}.{_ORIGINS[name]}")
+        value = getattr(module, name)
+        if name in _DYNAMIC:
+            return value
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_ORIGINS, *_SUBMODULES})
@@ -1,20 +1,30 @@
 from __future__ import annotations
 
 import abc
-from typing import Any, Generic, TypeVar, Type
+from typing import Any, Generic, Iterable, Iterator, TypeVar, Type
 
 from core.configurations import DatabaseConfig
+from core.identity_map import IdentityMap
 from core.models import BaseModel
 
 
 T = TypeVar("T", bound=BaseModel)
 
 
-class Repository(abc.ABC):
-    """Repository."""
+class BaseRepository(abc.ABC):
+    """BaseRepository.
+
+    Identity map handling shared by the sync and async repositories.
 
-    def __init__(self):
-        self.cached: dict[Any, T] = {}
+    Attributes:
+        written (set[type]): The model classes added, removed or updated through
+            the repository, or changed after a load where the adapter tracks it,
+            whose cached View results the unit of work drops on commit.
+    """
+
+    def __init__(self, cache_size: int | None = None):
+        self.cached = IdentityMap(max_size=cache_size)
+        self.written: set[type] = set()
 
     def cache(self, models: list[T]):
         """cache.
@@ -23,8 +33,52 @@ class Repository(abc.ABC):
             models (list[T]): models
         """
         for model in models:
-            model_id = model.id
-            self.cached[model_id] = model
+            self.cached.add(model)
+
+    def lookup(self, model_cls: Type[T], identities: dict[str, Any]) -> T | None:
+        """lookup.
+
+        Serves lookups by primary key alone from the cache.
+
+        Args:
+            model_cls (Type[T]): model_cls
+            identities (dict[str, Any]): identities
+
+        Returns:
+            T | None: the cached model, None when the lookup must go to the database.
+        """
+        if len(identities) != 1 or "id" not in identities:
+            return None
+        return self.cached.get(model_cls, identities["id"])
+
+    def resolve_many(
+        self,
+        model_cls: Type[T],
+        ids: list[Any],
+    ) -> tuple[dict[Any, T], list[Any]]:
+        """resolve_many.
+
+        Args:
+            model_cls (Type[T]): model_cls
+            ids (list[Any]): ids
+
+        Returns:
+            tuple[dict[Any, T], list[Any]]: the cached models by id, and the
+                distinct ids missing from the cache.
+        """
+        found: dict[Any, T] = {}
+        misses = []
+        for model_id in dict.fromkeys(ids):
+            model = self.cached.get(model_cls, model_id)
+            if model is None:
+                misses.append(model_id)
+            else:
+                found[model_id] = model
+        return found, misses
+
+
+class Repository(BaseRepository):
+    """Repository."""
 
     def add(
         self,
@@ -43,6 +97,7 @@ class Repository(abc.ABC):
             models = [models]
 
         self._add(models, *args, **kwargs)
+        self.written.update({type(model) for model in models})
         self.cache(models)
 
     def get(
@@ -60,20 +115,70 @@ class Repository(abc.ABC):
         Returns:
             list[T] | T | None:
         """
+        model = self.lookup(model_cls, identities)
+        if model is not None:
+            return [model]
         models = self._get(model_cls, **identities)
         self.cache(models)
         return models
 
     def get_model(self, model_cls: Type[T], **identities) -> T | None:
-        model = self._get(model_cls, **identities)
-        if len(model) == 0:
+        models = self.get(model_cls, **identities)
+        if len(models) == 0:
             return None
-        return model[0]
+        return models[0]
 
     def get_models(self, model_cls: Type[T], **identities) -> list[T]:
-        models = self._get(model_cls, **identities)
-        self.cache(models)
-        return models
+        return self.get(model_cls, **identities)
+
+    def get_many(
+        self,
+        model_cls: Type[T],
+        ids: Iterable[Any],
+    ) -> tuple[list[T], list[Any]]:
+        """get_many.
+
+        Resolves ids from the cache first and fetches the misses in batches.
+
+        Args:
+            model_cls (Type[T]): model_cls
+            ids (Iterable[Any]): ids
+
+        Returns:
+            tuple[list[T], list[Any]]: the found models in the order of ``ids``, and
+                the ids that matched no model.
+        """
+        ids = list(ids)
+        found, misses = self.resolve_many(model_cls, ids)
+        if misses:
+            models = self._get_many(model_cls, misses)
+            self.cache(models)
+            found.update((model.id, model) for model in models)
+
+        models = [found[model_id] for model_id in ids if model_id in found]
+        missing = [model_id for model_id in ids if model_id not in found]
+        return models, missing
+
+    def iter(
+        self,
+        model_cls: Type[T],
+        batch_size: int = 1000,
+        **identities,
+    ) -> Iterator[T]:
+        """iter.
+
+        Streams matching models in batches of ``batch_size``. Streamed models are
+        not kept in the cache, so memory stays bounded regardless of row count.
+
+        Args:
+            model_cls (Type[T]): model_cls
+            batch_size (int): batch_size
+            identities:
+
+        Returns:
+            Iterator[T]:
+        """
+        return self._iter(model_cls, batch_size, **identities)
 
     def remove(self, model: T, *args, **kwargs):
         """remove.
@@ -83,8 +188,52 @@ class Repository(abc.ABC):
             args:
             kwargs:
         """
+        self.cached.discard(model)
+        self.written.add(type(model))
         return self._remove(model, *args, **kwargs)
 
+    def remove_where(self, model_cls: Type[T], **filters) -> int:
+        """remove_where.
+
+        Deletes every matching row with one statement, without loading the models.
+
+        Args:
+            model_cls (Type[T]): model_cls
+            filters:
+
+        Returns:
+            int: the number of deleted rows.
+        """
+        cached = self.cached.find(model_cls, **filters)
+        count = self._remove_where(model_cls, **filters)
+        self.written.add(model_cls)
+        for model in cached:
+            self.cached.discard(model)
+        return count
+
+    def update_where(
+        self,
+        model_cls: Type[T],
+        values: dict[str, Any],
+        **filters,
+    ) -> int:
+        """update_where.
+
+        Updates every matching row with one statement, without loading the models.
+        The adapters bring the matching models already loaded up to date.
+
+        Args:
+            model_cls (Type[T]): model_cls
+            values (dict[str, Any]): values
+            filters:
+
+        Returns:
+            int: the number of updated rows.
+        """
+        count = self._update_where(model_cls, values, **filters)
+        self.written.add(model_cls)
+        return count
+
     @abc.abstractmethod
     def _get(
         self,
@@ -93,6 +242,21 @@ class Repository(abc.ABC):
     ) -> list[T]:
         raise NotImplementedError
 
+    def _get_many(
+        self,
+        model_cls: Type[T],
+        ids: list[Any],
+    ) -> list[T]:
+        return [model for model_id in ids for model in self._get(model_cls, id=model_id)]
+
+    def _iter(
+        self,
+        model_cls: Type[T],
+        batch_size: int,
+        **identities,
+    ) -> Iterator[T]:
+        return iter(self._get(model_cls, **identities))
+
     @abc.abstractmethod
     def _add(
         self,
@@ -111,6 +275,47 @@ class Repository(abc.ABC):
     ):
         raise NotImplementedError
 
+    def _remove_where(self, model_cls: Type[T], **filters) -> int:
+        models = self._get(model_cls, **filters)
+        for model in models:
+            self._remove(model)
+        return len(models)
+
+    def _update_where(
+        self,
+        model_cls: Type[T],
+        values: dict[str, Any],
+        **filters,
+    ) -> int:
+        models = self._get(model_cls, **filters)
+        for model in models:
+            for key, value in values.items():
+                setattr(model, key, value)
+        return len(models)
+
+
+class Savepoint(abc.ABC):
+    """Savepoint.
+
+    A nested transaction opened by ``Session.begin_nested``.
+    """
+
+    def commit(self):
+        """Release the savepoint, keeping its work in the enclosing transaction."""
+        self._commit()
+
+    def rollback(self):
+        """Undo the work done since the savepoint, and only that work."""
+        self._rollback()
+
+    @abc.abstractmethod
+    def _commit(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _rollback(self):
+        raise NotImplementedError
+
 
 class Session(abc.ABC):
     """Session."""
@@ -137,6 +342,14 @@ class Session(abc.ABC):
         """close."""
         self._close()
 
+    def begin_nested(self) -> Savepoint:
+        """begin_nested.
+
+        Returns:
+            Savepoint: a savepoint in the current transaction.
+        """
+        return self._begin_nested()
+
     @abc.abstractmethod
     def _commit(self):
         raise NotImplementedError
@@ -149,6 +362,9 @@ class Session(abc.ABC):
     def _close(self):
         raise NotImplementedError
 
+    def _begin_nested(self) -> Savepoint:
+        raise NotImplementedError(f"{type(self).__name__} has no savepoints")
+
     @abc.abstractmethod
     def _create_repository(self, *args, **kwargs) -> Repository:
         raise NotImplementedError
@@ -191,3 +407,241 @@ class ComponentFactory(abc.ABC):
             Repository:
         """
         raise NotImplementedError
+
+    def stick_to_primary(self):
+        """Keep the read-only sessions of the current context on the primary
+        database. A no-op for factories without read replicas."""
+
+
+class AsyncRepository(BaseRepository):
+    """AsyncRepository."""
+
+    def add(
+        self,
+        models: list[T] | T,
+        *args,
+        **kwargs,
+    ):
+        """add.
+
+        Args:
+            models (list[T] | T): models
+            args:
+            kwargs:
+        """
+        if not isinstance(models, list):
+            models = [models]
+
+        self._add(models, *args, **kwargs)
+        self.written.update({type(model) for model in models})
+        self.cache(models)
+
+    async def get(
+        self,
+        model_cls: Type[T],
+        **identities,
+    ) -> list[T]:
+        """get.
+
+        Args:
+            model_cls (type[T]): model_class
+            identities:
+
+        Returns:
+            list[T]:
+        """
+        model = self.lookup(model_cls, identities)
+        if model is not None:
+            return [model]
+        models = await self._get(model_cls, **identities)
+        self.cache(models)
+        return models
+
+    async def get_model(self, model_cls: Type[T], **identities) -> T | None:
+        models = await self.get(model_cls, **identities)
+        if len(models) == 0:
+            return None
+        return models[0]
+
+    async def get_models(self, model_cls: Type[T], **identities) -> list[T]:
+        return await self.get(model_cls, **identities)
+
+    async def get_many(
+        self,
+        model_cls: Type[T],
+        ids: Iterable[Any],
+    ) -> tuple[list[T], list[Any]]:
+        """get_many.
+
+        Args:
+            model_cls (Type[T]): model_cls
+            ids (Iterable[Any]): ids
+
+        Returns:
+            tuple[list[T], list[Any]]: the found models in the order of ``ids``, and
+                the ids that matched no model.
+        """
+        ids = list(ids)
+        found, misses = self.resolve_many(model_cls, ids)
+        if misses:
+            models = await self._get_many(model_cls, misses)
+            self.cache(models)
+            found.update((model.id, model) for model in models)
+
+        models = [found[model_id] for model_id in ids if model_id in found]
+        missing = [model_id for model_id in ids if model_id not in found]
+        return models, missing
+
+    async def remove(self, model: T, *args, **kwargs):
+        """remove.
+
+        Args:
+            model (base_model.BaseModel): model
+            args:
+            kwargs:
+        """
+        self.cached.discard(model)
+        self.written.add(type(model))
+        return await self._remove(model, *args, **kwargs)
+
+    @abc.abstractmethod
+    async def _get(
+        self,
+        model_cls: Type[T],
+        **identities,
+    ) -> list[T]:
+        raise NotImplementedError
+
+    async def _get_many(
+        self,
+        model_cls: Type[T],
+        ids: list[Any],
+    ) -> list[T]:
+        models = []
+        for model_id in ids:
+            models.extend(await self._get(model_cls, id=model_id))
+        return models
+
+    @abc.abstractmethod
+    def _add(
+        self,
+        models: list[T],
+        *args,
+        **kwargs,
+    ) -> list[T]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _remove(
+        self,
+        model: T,
+        *args,
+        **kwargs,
+    ):
+        raise NotImplementedError
+
+
+class AsyncSavepoint(abc.ABC):
+    """AsyncSavepoint.
+
+    A nested transaction opened by ``AsyncSession.begin_nested``.
+    """
+
+    async def commit(self):
+        """Release the savepoint, keeping its work in the enclosing transaction."""
+        await self._commit()
+
+    async def rollback(self):
+        """Undo the work done since the savepoint, and only that work."""
+        await self._rollback()
+
+    @abc.abstractmethod
+    async def _commit(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _rollback(self):
+        raise NotImplementedError
+
+
+class AsyncSession(abc.ABC):
+    """AsyncSession."""
+
+    def create_repository(self, *args, **kwargs):
+        """create_repository.
+
+        Args:
+            args:
+            kwargs:
+        """
+        repo = self._create_repository(*args, **kwargs)
+        return repo
+
+    async def commit(self):
+        """commit."""
+        await self._commit()
+
+    async def rollback(self):
+        """rollback."""
+        await self._rollback()
+
+    async def close(self):
+        """close."""
+        await self._close()
+
+    async def begin_nested(self) -> AsyncSavepoint:
+        """begin_nested.
+
+        Returns:
+            AsyncSavepoint: a savepoint in the current transaction.
+        """
+        return await self._begin_nested()
+
+    @abc.abstractmethod
+    async def _commit(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _rollback(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _close(self):
+        raise NotImplementedError
+
+    async def _begin_nested(self) -> AsyncSavepoint:
+        raise NotImplementedError(f"{type(self).__name__} has no savepoints")
+
+    @abc.abstractmethod
+    def _create_repository(self, *args, **kwargs) -> AsyncRepository:
+        raise NotImplementedError
+
+
+class AsyncComponentFactory(ComponentFactory):
+    """AsyncComponentFactory."""
+
+    @abc.abstractmethod
+    def create_session(self, *args, **kwargs) -> AsyncSession:
+        """create_session.
+
+        Args:
+            args:
+            kwargs:
+
+        Returns:
+            AsyncSession:
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def create_repository(self, *args, **kwargs) -> AsyncRepository:
+        """create_repository.
+
+        Args:
+            args:
+            kwargs:
+
+        Returns:
+            AsyncRepository:
+        """
+        raise NotImplementedError
@@ -3,10 +3,21 @@ from typing import Any
 import utils
 
 from core import abstract
-from core.adapters import sqlalchemy_adapter
+from core.adapters import (
+    memory_adapter,
+    sqlalchemy_adapter,
+    sqlalchemy_async_adapter,
+    sqlalchemy_sharded_adapter,
+)
 
 adapter_routers: dict[str, type[abstract.ComponentFactory]] = {
     "sqlalchemy": sqlalchemy_adapter.ComponentFactory,
+    "sqlalchemy_sharded": sqlalchemy_sharded_adapter.ShardedComponentFactory,
+    "memory": memory_adapter.ComponentFactory,
+}
+
+async_adapter_routers: dict[str, type[abstract.AsyncComponentFactory]] = {
+    "sqlalchemy": sqlalchemy_async_adapter.AsyncComponentFactory,
 }
 
 
@@ -30,3 +41,25 @@ def create_component_factory(
         raise ValueError
 
     return adapter_routers[framework](config)
+
+
+def create_async_component_factory(
+    config: dict[str, Any] | None = None,
+) -> abstract.AsyncComponentFactory:
+    """create_async_component_factory.
+
+    Args:
+        config (dict[str, Any] | None): config
+
+    Returns:
+        abstract.AsyncComponentFactory:
+    """
+    config = config or utils.get_config()["database"]
+
+    assert config, "Database configuration is required."
+
+    framework = config["framework"]
+    if framework not in async_adapter_routers:
+        raise ValueError
+
+    return async_adapter_routers[framework](config)
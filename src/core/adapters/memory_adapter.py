@@ -0,0 +1,433 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Hashable, override, TypeVar, Type
+
+import sqlalchemy
+
+from core import abstract, pagination
+from core import models as base_models
+from core.configurations import DatabaseConfig, DatabaseConnectionConfig
+
+__all__ = [
+    "MemoryConfig",
+    "MemoryDatabase",
+    "Savepoint",
+    "Session",
+    "Repository",
+    "ComponentFactory",
+    "get_database",
+]
+
+T = TypeVar("T", bound=base_models.BaseModel)
+
+FRAMEWORK = "memory"
+
+
+class MemoryConfig(DatabaseConfig):
+    """MemoryConfig.
+
+    The connection url names the database, e.g. ``memory://orders``; factories
+    built with the same url share their data.
+    """
+
+    framework: str = FRAMEWORK
+    connection: DatabaseConnectionConfig = DatabaseConnectionConfig(url="memory://")
+
+    @classmethod
+    def from_database_config(cls, config: DatabaseConfig) -> MemoryConfig:
+        return cls(**config.model_dump())
+
+
+def _state(model: Any) -> dict[str, Any]:
+    return {
+        key: value
+        for key, value in model.__dict__.items()
+        if key not in ("_sa_instance_state", "events")
+    }
+
+
+def _matches(model: Any, filters: dict[str, Any]) -> bool:
+    return all(getattr(model, attr, None) == value for attr, value in filters.items())
+
+
+def _clone(model: T) -> T:
+    """A copy of the model's attributes, detached from any ORM session."""
+    model_cls = type(model)
+    mapper = sqlalchemy.inspect(model_cls, raiseerr=False)
+    if mapper is not None:
+        clone = mapper.class_manager.new_instance()
+    else:
+        clone = model_cls.__new__(model_cls)
+    clone.__dict__.update(_state(model))
+    clone.__dict__["events"] = base_models.EventList()
+    return clone
+
+
+class MemoryTable:
+    """MemoryTable.
+
+    Committed models of one class by id, with hash indexes built on first use
+    of an attribute in a filter and maintained on every write.
+    """
+
+    def __init__(self):
+        self.rows: dict[Any, Any] = {}
+        self.indexes: dict[str, dict[Hashable, set[Any]]] = {}
+        # Attributes holding unhashable values are scanned instead.
+        self.unindexable: set[str] = set()
+
+    def put(self, model: Any):
+        """put.
+
+        Args:
+            model (Any): model
+        """
+        previous = self.rows.get(model.id)
+        if previous is not None:
+            self._unindex(previous)
+        self.rows[model.id] = model
+        self._index(model)
+
+    def delete(self, model_id: Any):
+        """delete.
+
+        Args:
+            model_id (Any): model_id
+        """
+        previous = self.rows.pop(model_id, None)
+        if previous is not None:
+            self._unindex(previous)
+
+    def find(self, **filters) -> list[Any]:
+        """find.
+
+        Args:
+            filters: attribute equality filters.
+
+        Returns:
+            list[Any]: the committed models matching every filter.
+        """
+        if not filters:
+            return list(self.rows.values())
+        if "id" in filters:
+            model = self.rows.get(filters["id"])
+            candidates = [] if model is None else [model]
+        else:
+            candidates = None
+            for attr, value in filters.items():
+                index = self._get_index(attr)
+                if index is None or not isinstance(value, Hashable):
+                    continue
+                candidates = [self.rows[model_id] for model_id in index.get(value, ())]
+                break
+            if candidates is None:
+                candidates = self.rows.values()
+        return [model for model in candidates if _matches(model, filters)]
+
+    def _get_index(self, attr: str) -> dict[Hashable, set[Any]] | None:
+        if attr in self.unindexable:
+            return None
+        index = self.indexes.get(attr)
+        if index is None:
+            index = {}
+            try:
+                for model_id, model in self.rows.items():
+                    index.setdefault(getattr(model, attr, None), set()).add(model_id)
+            except TypeError:
+                self.unindexable.add(attr)
+                return None
+            self.indexes[attr] = index
+        return index
+
+    def _index(self, model: Any):
+        for attr, index in list(self.indexes.items()):
+            try:
+                index.setdefault(getattr(model, attr, None), set()).add(model.id)
+            except TypeError:
+                del self.indexes[attr]
+                self.unindexable.add(attr)
+
+    def _unindex(self, model: Any):
+        for attr, index in self.indexes.items():
+            ids = index.get(getattr(model, attr, None))
+            if ids is not None:
+                ids.discard(model.id)
+
+
+class MemoryDatabase:
+    """MemoryDatabase."""
+
+    def __init__(self):
+        self.tables: dict[type, MemoryTable] = {}
+        self.lock = threading.RLock()
+
+    def table(self, model_cls: type) -> MemoryTable:
+        """table.
+
+        Args:
+            model_cls (type): model_cls
+        """
+        table = self.tables.get(model_cls)
+        if table is None:
+            table = self.tables.setdefault(model_cls, MemoryTable())
+        return table
+
+    def clear(self):
+        """clear."""
+        with self.lock:
+            self.tables.clear()
+
+
+DATABASES: dict[str, MemoryDatabase] = {}
+_DATABASES_LOCK = threading.Lock()
+
+
+def get_database(name: str) -> MemoryDatabase:
+    """get_database.
+
+    Args:
+        name (str): the connection url.
+
+    Returns:
+        MemoryDatabase: the process-wide database with this name.
+    """
+    with _DATABASES_LOCK:
+        database = DATABASES.get(name)
+        if database is None:
+            database = DATABASES[name] = MemoryDatabase()
+        return database
+
+
+class Savepoint(abstract.Savepoint):
+    """Savepoint.
+
+    The session's models and pending changes as they were when it was taken.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.identity = dict(session.identity)
+        self.states = {key: _state(model) for key, model in session.identity.items()}
+        self.new = set(session.new)
+        self.deleted = dict(session.deleted)
+
+    @override
+    def _commit(self):
+        pass
+
+    @override
+    def _rollback(self):
+        session = self.session
+        session.identity = dict(self.identity)
+        for key, model in session.identity.items():
+            model.__dict__.update(self.states[key])
+        session.new = set(self.new)
+        session.deleted = dict(self.deleted)
+
+
+class Session(abstract.Session):
+    """Session.
+
+    Models handed out by a session are private copies; the database sees their
+    attribute changes, additions and removals on commit only. Rollback restores
+    the attributes the models had when they were loaded or last committed.
+    """
+
+    def __init__(self, database: MemoryDatabase, *args, **kwargs):
+        self.database = database
+        self.identity: dict[tuple[type, Any], Any] = {}
+        self.snapshots: dict[tuple[type, Any], dict[str, Any]] = {}
+        self.new: set[tuple[type, Any]] = set()
+        self.deleted: dict[tuple[type, Any], Any] = {}
+        super().__init__(*args, **kwargs)
+
+    def add(self, model: Any):
+        """add.
+
+        Args:
+            model (Any): model
+        """
+        key = (type(model), model.id)
+        self.deleted.pop(key, None)
+        if self.identity.get(key) is not model:
+            self.identity[key] = model
+            self.new.add(key)
+
+    def delete(self, model: Any):
+        """delete.
+
+        Args:
+            model (Any): model
+        """
+        key = (type(model), model.id)
+        self.identity.pop(key, None)
+        if key in self.new:
+            self.new.discard(key)
+        else:
+            self.deleted[key] = model
+
+    def find(self, model_cls: Type[T], **filters) -> list[T]:
+        """find.
+
+        Args:
+            model_cls (Type[T]): model_cls
+            filters: attribute equality filters.
+
+        Returns:
+            list[T]: this session's copies of the matching models, committed
+                ones first, then the ones added in the session.
+        """
+        with self.database.lock:
+            stored = self.database.table(model_cls).find(**filters)
+            models = {}
+            for row in stored:
+                key = (model_cls, row.id)
+                if key not in self.deleted:
+                    models[key] = self._load(key, row)
+        for key, model in self.identity.items():
+            if key[0] is model_cls and key not in models:
+                models[key] = model
+        return [model for model in models.values() if _matches(model, filters)]
+
+    def _load(self, key: tuple[type, Any], row: Any) -> Any:
+        model = self.identity.get(key)
+        if model is None:
+            model = _clone(row)
+            self.identity[key] = model
+            self.snapshots[key] = _state(row)
+        return model
+
+    @override
+    def _commit(self):
+        with self.database.lock:
+            for (model_cls, model_id) in self.deleted:
+                self.database.table(model_cls).delete(model_id)
+            for key, model in self.identity.items():
+                state = _state(model)
+                if key not in self.new and self.snapshots.get(key) == state:
+                    continue
+                self.database.table(key[0]).put(_clone(model))
+                self.snapshots[key] = state
+        self.new.clear()
+        self.deleted.clear()
+
+    @override
+    def _rollback(self):
+        for key in self.new:
+            self.identity.pop(key, None)
+        for key, model in self.deleted.items():
+            self.identity[key] = model
+        for key, model in self.identity.items():
+            snapshot = self.snapshots.get(key)
+            if snapshot is not None:
+                model.__dict__.update(snapshot)
+        self.new.clear()
+        self.deleted.clear()
+
+    @override
+    def _begin_nested(self) -> Savepoint:
+        return Savepoint(self)
+
+    @override
+    def _close(self):
+        self.identity.clear()
+        self.snapshots.clear()
+        self.new.clear()
+        self.deleted.clear()
+
+    @override
+    def _create_repository(self, *args, **kwargs) -> Repository:
+        return Repository(self, *args, **kwargs)
+
+
+class Repository(abstract.Repository):
+    """Repository."""
+
+    def __init__(self, session: Session, cache_size: int | None = None):
+        super().__init__(cache_size=cache_size)
+        self.session = session
+
+    @override
+    def _add(self, models: list[T], *args, **kwargs) -> list[T]:
+        # Bulk inserts and upserts need no special path: commit writes every
+        # added model, replacing a stored one with the same id.
+        for model in models:
+            self.session.add(model)
+        return models
+
+    @override
+    def _get(self, model_class: Type[T], **identities) -> list[T]:
+        return self.session.find(model_class, **identities)
+
+    @override
+    def _remove(self, model: T, *args, **kwargs):
+        self.session.delete(model)
+
+    def select(
+        self,
+        model_class: Type[T],
+        keys: list[tuple[str, str]] | None = None,
+        **filters,
+    ) -> list[T]:
+        """select.
+
+        Args:
+            model_class (Type[T]): model_class
+            keys (list[tuple[str, str]] | None): (attribute, "+" or "-") pairs to
+                sort by. Defaults to None (insertion order).
+            filters: attribute equality filters.
+
+        Returns:
+            list[T]: the matching models, sorted.
+        """
+        models = self.session.find(model_class, **filters)
+        if keys:
+            models.sort(key=pagination.sort_key(keys))
+        return models
+
+
+class ComponentFactory(abstract.ComponentFactory):
+    """ComponentFactory."""
+
+    config_cls: Type[DatabaseConfig] = MemoryConfig
+
+    def __init__(self, config: dict[str, Any] | MemoryConfig | DatabaseConfig):
+        if isinstance(config, DatabaseConfig) and not isinstance(
+            config, self.config_cls
+        ):
+            config = self.config_cls.from_database_config(config)
+        super().__init__(config)
+        self.database = get_database(self.config.connection.url)
+
+    @override
+    def create_session(self, *args, read_only: bool = False, **kwargs) -> Session:
+        """create_session.
+
+        Args:
+            read_only (bool): accepted for compatibility, there are no replicas.
+            args:
+            kwargs:
+
+        Returns:
+            Session:
+        """
+        return Session(self.database, *args, **kwargs)
+
+    @override
+    def create_repository(
+        self,
+        *args,
+        session: Session | None = None,
+        **kwargs,
+    ) -> Repository:
+        """create_repository.
+
+        Args:
+            session (Session | None): session
+            args:
+            kwargs:
+        """
+        session = session or self.create_session()
+        kwargs.setdefault("cache_size", self.config.identity_map_size)
+        return Repository(session, *args, **kwargs)
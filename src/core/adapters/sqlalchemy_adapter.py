@@ -1,22 +1,71 @@
 from __future__ import annotations
 
-from typing import Any, override, TypeVar, Type
+import contextvars
+import itertools
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterator, override, TypeVar, Type
 
 import sqlalchemy
+import utils
 from sqlalchemy import orm as sqlalchemy_orm
+from sqlalchemy.dialects import mysql as mysql_dialect
+from sqlalchemy.dialects import postgresql as postgresql_dialect
+from sqlalchemy.dialects import sqlite as sqlite_dialect
 
-from core import abstract
+from core import abstract, statements
 from core import models as base_models
 from core.configurations import DatabaseConfig
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
 __all__ = [
+    "Savepoint",
     "Session",
     "ComponentFactory",
     "Repository",
+    "EngineRegistry",
+    "ReplicaRouter",
+    "ReplicaSession",
+    "get_engine_registry",
+    "dispose_all",
+    "instrument",
+    "track_flush",
 ]
 
+logger = utils.get_logger()
+
 T = TypeVar("T", bound=base_models.BaseModel)
 
+DEFAULT_MAX_BIND_PARAMETERS = 999
+
+# Largest number of bound parameters a single statement may carry, per dialect.
+MAX_BIND_PARAMETERS: dict[str, int] = {
+    "sqlite": 999,
+    "mysql": 65535,
+    "mariadb": 65535,
+    "postgresql": 32767,
+    "mssql": 2100,
+    "oracle": 1000,
+}
+
+
+class Savepoint(abstract.Savepoint):
+    """Savepoint."""
+
+    def __init__(self, transaction: sqlalchemy_orm.SessionTransaction):
+        self.transaction = transaction
+
+    @override
+    def _commit(self):
+        self.transaction.commit()
+
+    @override
+    def _rollback(self):
+        self.transaction.rollback()
+
 
 class Session(abstract.Session):
     """Session."""
@@ -52,29 +101,154 @@ class Session(abstract.Session):
     def _rollback(self):
         self.__core_session.rollback()
 
+    @override
+    def _begin_nested(self) -> Savepoint:
+        return Savepoint(self.__core_session.begin_nested())
+
     @override
     def _create_repository(self, *args, **kwargs) -> Repository:
         repo = Repository(self, *args, **kwargs)
         return repo
 
 
+def track_flush(repo: abstract.BaseRepository, core_session: sqlalchemy_orm.Session):
+    """Add the classes of the models a flush of ``core_session`` writes, changes
+    made to loaded models included, to ``repo.written``."""
+
+    def before_flush(session: sqlalchemy_orm.Session, *_):
+        repo.written.update(
+            type(model) for model in (*session.new, *session.dirty, *session.deleted)
+        )
+
+    sqlalchemy.event.listen(core_session, "before_flush", before_flush)
+
+
 class Repository(abstract.Repository):
     """Repository."""
 
-    def __init__(self, session: Session):
-        super().__init__()
+    def __init__(self, session: Session, cache_size: int | None = None):
+        super().__init__(cache_size=cache_size)
         self.session = session.core_session
+        track_flush(self, self.session)
+
+    @override
+    def add(
+        self,
+        models: list[T] | T,
+        *args,
+        bulk: bool = False,
+        upsert: bool = False,
+        **kwargs,
+    ):
+        """add.
+
+        Args:
+            models (list[T] | T): models
+            bulk (bool): see ``_add``.
+            upsert (bool): see ``_add``.
+
+        Bulk-inserted models are not attached to the session, so they are kept
+        out of the identity map, where a later ``get`` would hand them out as if
+        their changes were tracked; only their events are collected.
+        """
+        if not (bulk or upsert):
+            super().add(models, *args, **kwargs)
+            return
+        if not isinstance(models, list):
+            models = [models]
+        self._add(models, *args, bulk=bulk, upsert=upsert, **kwargs)
+        self.written.update({type(model) for model in models})
+        for model in models:
+            self.cached.watch(model)
 
     @override
     def _add(
         self,
         models: list[T],
         *args,
+        bulk: bool = False,
+        upsert: bool = False,
         **kwargs,
     ) -> list[T]:
-        self.session.add_all(models, *args, **kwargs)
+        """_add.
+
+        Args:
+            models (list[T]): models
+            bulk (bool): insert with one executemany statement per model class,
+                bypassing the ORM flush. Bulk-inserted models are not attached to
+                the session, so later changes to them are not persisted.
+            upsert (bool): update rows whose primary key already exists. Implies bulk.
+        """
+        if not (bulk or upsert):
+            self.session.add_all(models, *args, **kwargs)
+            return models
+
+        grouped: dict[type, list[T]] = {}
+        for model in models:
+            grouped.setdefault(type(model), []).append(model)
+        for model_class, group in grouped.items():
+            self._bulk_insert(model_class, group, upsert)
         return models
 
+    def _dialect_name(self) -> str:
+        return self.session.get_bind().dialect.name
+
+    def _bulk_insert(
+        self,
+        model_class: Type[T],
+        models: list[T],
+        upsert: bool,
+        bind_arguments: dict[str, Any] | None = None,
+    ):
+        mapper = sqlalchemy.inspect(model_class)
+        table = mapper.local_table
+        attributes = [(prop.key, prop.columns[0].key) for prop in mapper.column_attrs]
+        rows = [
+            {column: getattr(model, key) for key, column in attributes}
+            for model in models
+        ]
+        statement = sqlalchemy.insert(table)
+        if upsert:
+            immutable_columns = {
+                column
+                for key, column in attributes
+                if key in models[0]._immutable_atributes
+            }
+            statement = self._upsert_statement(table, immutable_columns)
+        self.session.execute(statement, rows, bind_arguments=bind_arguments)
+
+    def _upsert_statement(
+        self,
+        table: sqlalchemy.Table,
+        immutable_columns: set[str],
+    ) -> sqlalchemy.Insert:
+        dialect = self._dialect_name()
+        primary_keys = [column.key for column in table.primary_key.columns]
+        updated_columns = [
+            column.key
+            for column in table.columns
+            if column.key not in primary_keys and column.key not in immutable_columns
+        ]
+
+        match dialect:
+            case "mysql" | "mariadb":
+                statement = mysql_dialect.insert(table)
+                updated_columns = updated_columns or primary_keys
+                return statement.on_duplicate_key_update(
+                    {column: statement.inserted[column] for column in updated_columns}
+                )
+            case "sqlite" | "postgresql":
+                module = sqlite_dialect if dialect == "sqlite" else postgresql_dialect
+                statement = module.insert(table)
+                if not updated_columns:
+                    return statement.on_conflict_do_nothing(index_elements=primary_keys)
+                return statement.on_conflict_do_update(
+                    index_elements=primary_keys,
+                    set_={column: statement.excluded[column] for column in updated_columns},
+                )
+            case _:
+                raise NotImplementedError(f"Upsert is not supported for {dialect}")
+
     @override
     def _get(
         self,
@@ -83,10 +257,57 @@ class Repository(abstract.Repository):
     ) -> list[T]:
         return self.session.query(model_class).filter_by(**identities).all()
 
+    @override
+    def _get_many(
+        self,
+        model_class: Type[T],
+        ids: list[Any],
+    ) -> list[T]:
+        dialect = self._dialect_name()
+        chunk_size = MAX_BIND_PARAMETERS.get(dialect, DEFAULT_MAX_BIND_PARAMETERS)
+        models = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start : start + chunk_size]
+            models.extend(
+                self.session.query(model_class)
+                .filter(model_class.id.in_(chunk))
+                .all()
+            )
+        return models
+
+    @override
+    def _iter(
+        self,
+        model_class: Type[T],
+        batch_size: int,
+        **identities,
+    ) -> Iterator[T]:
+        query = (
+            self.session.query(model_class)
+            .filter_by(**identities)
+            .yield_per(batch_size)
+        )
+        yield from query
+
     @override
     def _remove(self, model: T, *args, **kwargs):
         self.session.delete(model, *args, **kwargs)
 
+    @override
+    def _remove_where(self, model_class: Type[T], **filters) -> int:
+        statement = sqlalchemy.delete(model_class).filter_by(**filters)
+        return self.session.execute(statement).rowcount
+
+    @override
+    def _update_where(
+        self,
+        model_class: Type[T],
+        values: dict[str, Any],
+        **filters,
+    ) -> int:
+        statement = sqlalchemy.update(model_class).filter_by(**filters).values(**values)
+        return self.session.execute(statement).rowcount
+
 
 class SessionFactory:
     """SessionFactory."""
@@ -101,21 +322,64 @@ class SessionFactory:
             bind=engine, expire_on_commit=False, **kwargs
         )
 
-    def create_session(self, *args, **kwargs) -> Session:
+    def create_session(
+        self,
+        *args,
+        bind: sqlalchemy.Engine | None = None,
+        router: ReplicaRouter | None = None,
+        **kwargs,
+    ) -> Session:
         """create_session.
 
         Args:
+            bind (sqlalchemy.Engine | None): engine to use instead of ``engine``.
+            router (ReplicaRouter | None): the router ``bind``, one of its
+                replicas, was chosen by; the session falls back to its primary
+                when connecting to the replica fails. Defaults to None.
             args:
             kwargs:
 
         Returns:
             Session:
         """
-        core_session = self.core_factory()
+        if bind is None:
+            core_session = self.core_factory()
+        elif router is not None:
+            core_session = ReplicaSession(
+                bind=bind, router=router, expire_on_commit=False
+            )
+        else:
+            core_session = self.core_factory(bind=bind)
         session = Session(core_session, *args, **kwargs)
         return session
 
 
+class ReplicaSession(sqlalchemy_orm.Session):
+    """ReplicaSession.
+
+    A read-only session bound to a replica. When connecting to the replica
+    fails, which marks it unhealthy, the session is bound to the primary and
+    the read that failed is run there instead of raising.
+    """
+
+    def __init__(self, *args, router: ReplicaRouter, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.router = router
+
+    @override
+    def _connection_for_bind(self, engine, execution_options=None, **kw):
+        try:
+            return super()._connection_for_bind(engine, execution_options, **kw)
+        except sqlalchemy.exc.DBAPIError:
+            if engine is self.router.primary or engine not in self.router.unhealthy:
+                raise
+            logger.warning("Replica %s failed, reading from the primary", engine.url)
+        self.bind = self.router.primary
+        return super()._connection_for_bind(
+            self.router.primary, execution_options, **kw
+        )
+
+
 class Database:
     """Database."""
 
@@ -164,11 +428,328 @@ class SQLAlchemyConfig(DatabaseConfig):
 
     @classmethod
     def from_database_config(cls, config: DatabaseConfig) -> SQLAlchemyConfig:
-        return cls(
-            framework=config.framework,
-            connection=config.connection,
+        return cls(**config.model_dump())
+
+
+class EngineRegistry:
+    """EngineRegistry.
+
+    Process-wide registry of engines keyed by the normalized database config, so
+    every ComponentFactory, View and UnitOfWork built from the same config shares
+    one engine and one connection pool.
+    """
+
+    def __init__(self):
+        self.engines: dict[tuple[str, str], sqlalchemy.Engine] = {}
+        self.async_engines: dict[tuple[str, str], AsyncEngine] = {}
+        self.replica_routers: dict[tuple[Any, ...], ReplicaRouter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(config: DatabaseConfig) -> tuple[str, str]:
+        """normalize.
+
+        Args:
+            config (DatabaseConfig): config
+
+        Returns:
+            tuple[str, str]: the rendered url and the sorted engine arguments.
+        """
+        url = sqlalchemy.make_url(config.connection.url)
+        args = json.dumps(config.connection.args, sort_keys=True, default=repr)
+        return url.render_as_string(hide_password=False), args
+
+    def get_engine(self, config: DatabaseConfig) -> sqlalchemy.Engine:
+        """get_engine.
+
+        Args:
+            config (DatabaseConfig): config
+
+        Returns:
+            sqlalchemy.Engine: the shared engine for this config.
+        """
+        key = self.normalize(config)
+        engine = self.engines.get(key)
+        if engine is not None:
+            return engine
+
+        with self._lock:
+            engine = self.engines.get(key)
+            if engine is None:
+                engine = sqlalchemy.create_engine(
+                    url=config.connection.url, **config.connection.args
+                )
+                instrument(engine)
+                self.engines[key] = engine
+        return engine
+
+    def get_replica_router(self, config: DatabaseConfig) -> ReplicaRouter:
+        """get_replica_router.
+
+        Args:
+            config (DatabaseConfig): config, with at least one replica.
+
+        Returns:
+            ReplicaRouter: the shared router, and so the shared replica health,
+                for this config.
+        """
+        replicas = [
+            config.model_copy(update={"connection": replica, "replicas": []})
+            for replica in config.replicas
+        ]
+        key = (
+            self.normalize(config),
+            *(self.normalize(replica) for replica in replicas),
+            config.replica_strategy,
+        )
+        router = self.replica_routers.get(key)
+        if router is not None:
+            return router
+
+        primary = self.get_engine(config)
+        engines = [self.get_engine(replica) for replica in replicas]
+        with self._lock:
+            router = self.replica_routers.get(key)
+            if router is None:
+                router = ReplicaRouter(
+                    primary,
+                    engines,
+                    strategy=config.replica_strategy,
+                    retry_interval=config.replica_retry_interval,
+                )
+                self.replica_routers[key] = router
+        return router
+
+    def get_async_engine(self, config: DatabaseConfig) -> AsyncEngine:
+        """get_async_engine.
+
+        Args:
+            config (DatabaseConfig): config, with an async driver in its url.
+
+        Returns:
+            AsyncEngine: the shared async engine for this config.
+        """
+        key = self.normalize(config)
+        engine = self.async_engines.get(key)
+        if engine is not None:
+            return engine
+
+        from sqlalchemy.ext.asyncio import (  # pylint: disable=import-outside-toplevel
+            create_async_engine,
         )
 
+        with self._lock:
+            engine = self.async_engines.get(key)
+            if engine is None:
+                engine = create_async_engine(
+                    url=config.connection.url, **config.connection.args
+                )
+                instrument(engine.sync_engine)
+                self.async_engines[key] = engine
+        return engine
+
+    def pool_statistics(self) -> list[dict[str, Any]]:
+        """pool_statistics.
+
+        Returns:
+            list[dict[str, Any]]: one entry per registered engine.
+        """
+        statistics = []
+        engines = [
+            *self.engines.values(),
+            *(engine.sync_engine for engine in self.async_engines.values()),
+        ]
+        for engine in engines:
+            pool = engine.pool
+            entry: dict[str, Any] = {
+                "url": engine.url.render_as_string(hide_password=True),
+                "pool": type(pool).__name__,
+                "status": pool.status(),
+            }
+            for name in ("size", "checkedin", "checkedout", "overflow"):
+                method = getattr(pool, name, None)
+                if callable(method):
+                    entry[name] = method()
+            statistics.append(entry)
+        return statistics
+
+    def dispose_all(self, close: bool = True):
+        """dispose_all.
+
+        Args:
+            close (bool): close pooled connections. Pass ``False`` in a freshly
+                forked child so the parent's connections are left untouched.
+        """
+        with self._lock:
+            for engine in self.engines.values():
+                engine.dispose(close=close)
+            # Async connections can only be closed from the event loop, see
+            # dispose_all_async; here their pools are just dereferenced.
+            for engine in self.async_engines.values():
+                engine.sync_engine.dispose(close=False)
+
+    async def dispose_all_async(self):
+        """dispose_all_async.
+
+        Disposes every engine, closing async connections on the running loop.
+        """
+        for engine in list(self.async_engines.values()):
+            await engine.dispose()
+        with self._lock:
+            for engine in self.engines.values():
+                engine.dispose()
+
+
+# Time until which read-only sessions of this context use the primary, on the
+# clock of the ReplicaRouter that reads it.
+_PRIMARY_UNTIL: contextvars.ContextVar[float] = contextvars.ContextVar(
+    "primary_until", default=0.0
+)
+
+
+def stick_to_primary(seconds: float, clock: Callable[[], float] = time.monotonic):
+    """Route the read-only sessions of the current context to the primary.
+
+    Args:
+        seconds (float): how long, typically the expected replication lag.
+        clock (Callable[[], float]): the clock of the routers, see
+            ``ReplicaRouter.stick_to_primary``. Defaults to time.monotonic.
+    """
+    _PRIMARY_UNTIL.set(max(_PRIMARY_UNTIL.get(), clock() + seconds))
+
+
+class ReplicaRouter:
+    """ReplicaRouter.
+
+    Picks the engine of a read-only session among the replicas of a primary. A
+    replica whose connection fails is skipped for ``retry_interval`` seconds,
+    and the primary is used when no replica is available. The session that hit
+    the failure retries on the primary, see ``ReplicaSession``.
+
+    Attributes:
+        primary (sqlalchemy.Engine): primary
+        replicas (list[sqlalchemy.Engine]): replicas
+        strategy (str): "round_robin" or "least_connections".
+        retry_interval (float): retry_interval
+        unhealthy (dict[sqlalchemy.Engine, float]): replicas that failed, with the
+            time of ``clock`` they may be tried again.
+        clock (Callable[[], float]): the time source of health checks and of
+            ``stick_to_primary``. Defaults to time.monotonic.
+    """
+
+    def __init__(
+        self,
+        primary: sqlalchemy.Engine,
+        replicas: list[sqlalchemy.Engine],
+        strategy: str = "round_robin",
+        retry_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Unsupported replica strategy: {strategy}")
+        self.primary = primary
+        self.replicas = replicas
+        self.strategy = strategy
+        self.retry_interval = retry_interval
+        self.clock = clock
+        self.unhealthy: dict[sqlalchemy.Engine, float] = {}
+        self._counter = itertools.count()
+        for replica in replicas:
+            sqlalchemy.event.listen(replica, "handle_error", self._on_error)
+
+    def choose(self) -> sqlalchemy.Engine:
+        """choose.
+
+        Returns:
+            sqlalchemy.Engine: the engine for the next read-only session.
+        """
+        now = self.clock()
+        if _PRIMARY_UNTIL.get() > now:
+            return self.primary
+        healthy = [
+            replica
+            for replica in self.replicas
+            if self.unhealthy.get(replica, 0.0) <= now
+        ]
+        if not healthy:
+            return self.primary
+        if self.strategy == "least_connections":
+            return min(healthy, key=_checked_out)
+        return healthy[next(self._counter) % len(healthy)]
+
+    def mark_unhealthy(self, replica: sqlalchemy.Engine):
+        """mark_unhealthy.
+
+        Args:
+            replica (sqlalchemy.Engine): replica
+        """
+        self.unhealthy[replica] = self.clock() + self.retry_interval
+
+    def stick_to_primary(self, seconds: float):
+        """``stick_to_primary`` on the clock of this router."""
+        stick_to_primary(seconds, self.clock)
+
+    def _on_error(self, context: sqlalchemy.engine.ExceptionContext):
+        if context.is_disconnect or context.connection is None:
+            self.mark_unhealthy(context.engine)
+
+
+def _before_cursor_execute(
+    connection: sqlalchemy.Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+):
+    if context is not None and statements.tracking():
+        context.statement_start = time.perf_counter()
+
+
+def _after_cursor_execute(
+    connection: sqlalchemy.Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+):
+    start = getattr(context, "statement_start", None)
+    if start is not None:
+        context.statement_start = None
+        statements.record(statement, time.perf_counter() - start)
+
+
+def instrument(engine: sqlalchemy.Engine):
+    """Report the statements ``engine`` executes to the entered StatementStats."""
+    if not sqlalchemy.event.contains(
+        engine, "before_cursor_execute", _before_cursor_execute
+    ):
+        sqlalchemy.event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        sqlalchemy.event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _checked_out(engine: sqlalchemy.Engine) -> int:
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return checkedout() if callable(checkedout) else 0
+
+
+ENGINE_REGISTRY: EngineRegistry = EngineRegistry()
+
+
+def get_engine_registry() -> EngineRegistry:
+    global ENGINE_REGISTRY
+    return ENGINE_REGISTRY
+
+
+def dispose_all(close: bool = True):
+    """dispose_all.
+
+    Args:
+        close (bool): close pooled connections.
+    """
+    get_engine_registry().dispose_all(close=close)
+
 
 class ComponentFactory(abstract.ComponentFactory):
     """ComponentFactory."""
@@ -179,34 +760,54 @@ class ComponentFactory(abstract.ComponentFactory):
         self,
         config: dict[str, Any] | SQLAlchemyConfig | DatabaseConfig,
     ):
-        if isinstance(config, DatabaseConfig):
-            config = SQLAlchemyConfig.from_database_config(config)
+        if isinstance(config, DatabaseConfig) and not isinstance(
+            config, self.config_cls
+        ):
+            config = self.config_cls.from_database_config(config)
         super().__init__(config)
         self.engine = self._init_engine()
         self.session_factory = self._init_session_factory()
+        self.replica_router = self._init_replica_router()
 
     def _init_engine(self) -> sqlalchemy.Engine:
-        return sqlalchemy.create_engine(
-            url=self.config.connection.url, **self.config.connection.args
-        )
+        return get_engine_registry().get_engine(self.config)
+
+    def _init_replica_router(self) -> ReplicaRouter | None:
+        if not self.config.replicas:
+            return None
+        return get_engine_registry().get_replica_router(self.config)
 
     def _init_session_factory(self) -> SessionFactory:
         return SessionFactory(self.engine)
 
     @override
-    def create_session(self, *args, **kwargs) -> Session:
+    def create_session(self, *args, read_only: bool = False, **kwargs) -> Session:
         """create_session.
 
         Args:
+            read_only (bool): bind the session to a replica when the config has
+                healthy ones. Defaults to False (primary).
             args:
             kwargs:
 
         Returns:
             Session:
         """
+        if read_only and self.replica_router is not None:
+            engine = self.replica_router.choose()
+            if engine is not self.engine:
+                return self.session_factory.create_session(
+                    *args, bind=engine, router=self.replica_router, **kwargs
+                )
         session = self.session_factory.create_session(*args, **kwargs)
         return session
 
+    def stick_to_primary(self):
+        """Keep the reads of the current context on the primary for the
+        configured replication lag, e.g. right after a commit."""
+        if self.replica_router is not None:
+            self.replica_router.stick_to_primary(self.config.replica_lag)
+
     @override
     def create_repository(
         self,
@@ -222,6 +823,7 @@ class ComponentFactory(abstract.ComponentFactory):
             kwargs:
         """
         session = session or self.create_session()
+        kwargs.setdefault("cache_size", self.config.identity_map_size)
         repo = Repository(session, *args, **kwargs)
         return repo
 
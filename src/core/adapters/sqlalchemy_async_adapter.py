@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from typing import Any, override, TypeVar, Type
+
+import sqlalchemy
+from sqlalchemy.ext import asyncio as sqlalchemy_asyncio
+
+from core import abstract
+from core import models as base_models
+from core.adapters import sqlalchemy_adapter
+from core.configurations import DatabaseConfig
+
+__all__ = [
+    "AsyncSavepoint",
+    "AsyncSession",
+    "AsyncComponentFactory",
+    "AsyncRepository",
+]
+
+T = TypeVar("T", bound=base_models.BaseModel)
+
+
+class AsyncSavepoint(abstract.AsyncSavepoint):
+    """AsyncSavepoint."""
+
+    def __init__(self, transaction: sqlalchemy_asyncio.AsyncSessionTransaction):
+        self.transaction = transaction
+
+    @override
+    async def _commit(self):
+        await self.transaction.commit()
+
+    @override
+    async def _rollback(self):
+        await self.transaction.rollback()
+
+
+class AsyncSession(abstract.AsyncSession):
+    """AsyncSession."""
+
+    def __init__(
+        self,
+        core_session: sqlalchemy_asyncio.AsyncSession,
+        *args,
+        **kwargs,
+    ):
+        self.__core_session = core_session
+        super().__init__(*args, **kwargs)
+
+    @property
+    def core_session(self) -> sqlalchemy_asyncio.AsyncSession:
+        """Getter method for core_session property."""
+        return self.__core_session
+
+    @override
+    async def _close(self):
+        await self.__core_session.close()
+
+    @override
+    async def _commit(self):
+        await self.__core_session.commit()
+
+    @override
+    async def _rollback(self):
+        await self.__core_session.rollback()
+
+    @override
+    async def _begin_nested(self) -> AsyncSavepoint:
+        return AsyncSavepoint(await self.__core_session.begin_nested())
+
+    @override
+    def _create_repository(self, *args, **kwargs) -> AsyncRepository:
+        repo = AsyncRepository(self, *args, **kwargs)
+        return repo
+
+
+class AsyncRepository(abstract.AsyncRepository):
+    """AsyncRepository."""
+
+    def __init__(self, session: AsyncSession, cache_size: int | None = None):
+        super().__init__(cache_size=cache_size)
+        self.session = session.core_session
+        sqlalchemy_adapter.track_flush(self, self.session.sync_session)
+
+    @override
+    def _add(
+        self,
+        models: list[T],
+        *args,
+        **kwargs,
+    ) -> list[T]:
+        self.session.add_all(models, *args, **kwargs)
+        return models
+
+    @override
+    async def _get(
+        self,
+        model_class: Type[T],
+        **identities,
+    ) -> list[T]:
+        statement = sqlalchemy.select(model_class).filter_by(**identities)
+        result = await self.session.execute(statement)
+        return list(result.scalars().all())
+
+    @override
+    async def _get_many(
+        self,
+        model_class: Type[T],
+        ids: list[Any],
+    ) -> list[T]:
+        dialect = self.session.get_bind().dialect.name
+        chunk_size = sqlalchemy_adapter.MAX_BIND_PARAMETERS.get(
+            dialect, sqlalchemy_adapter.DEFAULT_MAX_BIND_PARAMETERS
+        )
+        models = []
+        for start in range(0, len(ids), chunk_size):
+            statement = sqlalchemy.select(model_class).where(
+                model_class.id.in_(ids[start : start + chunk_size])
+            )
+            result = await self.session.execute(statement)
+            models.extend(result.scalars().all())
+        return models
+
+    @override
+    async def _remove(self, model: T, *args, **kwargs):
+        await self.session.delete(model, *args, **kwargs)
+
+
+class AsyncComponentFactory(abstract.AsyncComponentFactory):
+    """AsyncComponentFactory.
+
+    Builds sessions on SQLAlchemy's ``AsyncSession``. The connection url must name
+    an async driver, e.g. ``mysql+aiomysql://`` or ``sqlite+aiosqlite://``.
+    """
+
+    config_cls: Type[DatabaseConfig] = sqlalchemy_adapter.SQLAlchemyConfig
+
+    def __init__(
+        self,
+        config: dict[str, Any] | sqlalchemy_adapter.SQLAlchemyConfig | DatabaseConfig,
+    ):
+        if isinstance(config, DatabaseConfig):
+            config = sqlalchemy_adapter.SQLAlchemyConfig.from_database_config(config)
+        super().__init__(config)
+        self.engine = sqlalchemy_adapter.get_engine_registry().get_async_engine(
+            self.config
+        )
+        self.core_factory = sqlalchemy_asyncio.async_sessionmaker(
+            bind=self.engine, expire_on_commit=False
+        )
+
+    @override
+    def create_session(self, *args, **kwargs) -> AsyncSession:
+        """create_session.
+
+        Args:
+            args:
+            kwargs:
+
+        Returns:
+            AsyncSession:
+        """
+        return AsyncSession(self.core_factory(), *args, **kwargs)
+
+    @override
+    def create_repository(
+        self,
+        *args,
+        session: AsyncSession | None = None,
+        **kwargs,
+    ) -> AsyncRepository:
+        """create_repository.
+
+        Args:
+            session (AsyncSession | None): session
+            args:
+            kwargs:
+        """
+        session = session or self.create_session()
+        kwargs.setdefault("cache_size", self.config.identity_map_size)
+        return AsyncRepository(session, *args, **kwargs)
@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+import dataclasses
+import heapq
+import itertools
+import zlib
+from typing import Any, Callable, Iterable, override, TypeVar, Type
+
+import sqlalchemy
+from sqlalchemy import orm as sqlalchemy_orm
+from sqlalchemy.ext import horizontal_shard
+from sqlalchemy.sql import elements, operators
+
+from core import models as base_models
+from core import pagination
+from core.adapters import sqlalchemy_adapter
+from core.configurations import DatabaseConnectionConfig
+
+__all__ = [
+    "ShardedSQLAlchemyConfig",
+    "ShardedComponentFactory",
+    "ShardedRepository",
+    "ShardRouter",
+    "register_shard_key",
+    "hash_shard",
+    "merge_sorted",
+]
+
+T = TypeVar("T", bound=base_models.BaseModel)
+
+FRAMEWORK = "sqlalchemy_sharded"
+set_shard_id = horizontal_shard.set_shard_id
+# Shard of the models without a shard key, backed by ``connection``.
+DEFAULT_SHARD = "default"
+
+
+class ShardedSQLAlchemyConfig(sqlalchemy_adapter.SQLAlchemyConfig):
+    """ShardedSQLAlchemyConfig.
+
+    Attributes:
+        connection (DatabaseConnectionConfig): The default shard, holding every
+            model class without a registered shard key.
+        shards (dict[str, DatabaseConnectionConfig]): Shard id to connection, for
+            the model classes with a shard key.
+    """
+
+    framework: str = FRAMEWORK
+    shards: dict[str, DatabaseConnectionConfig] = {}
+
+
+def hash_shard(value: Any, shard_ids: list[str]) -> str:
+    """hash_shard.
+
+    Args:
+        value (Any): the shard key of a model.
+        shard_ids (list[str]): shard_ids
+
+    Returns:
+        str: a shard id, stable across processes for the same value.
+    """
+    return shard_ids[zlib.crc32(str(value).encode()) % len(shard_ids)]
+
+
+@dataclasses.dataclass(frozen=True)
+class ShardKey:
+    """ShardKey."""
+
+    attribute: str
+    chooser: Callable[[Any, list[str]], str] = hash_shard
+
+
+SHARD_KEYS: dict[type, ShardKey] = {}
+
+
+def register_shard_key(
+    model_cls: type,
+    attribute: str = "id",
+    chooser: Callable[[Any, list[str]], str] = hash_shard,
+):
+    """register_shard_key.
+
+    Args:
+        model_cls (type): model_cls
+        attribute (str): the attribute whose value places a model on a shard.
+            Defaults to "id".
+        chooser (Callable[[Any, list[str]], str]): maps that value and the shard
+            ids to a shard id. Defaults to hash_shard.
+    """
+    SHARD_KEYS[model_cls] = ShardKey(attribute, chooser)
+
+
+class ShardRouter:
+    """ShardRouter.
+
+    The shard choosers of a ShardedSession. Statements whose criteria pin the
+    shard key, with ``==`` or ``IN`` in a top-level AND, go to the matching
+    shards; every other statement on a sharded class goes to all shards.
+    """
+
+    def __init__(self, engines: dict[str, sqlalchemy.Engine]):
+        self.engines = engines
+        self.shard_ids = sorted(set(engines) - {DEFAULT_SHARD}) or [DEFAULT_SHARD]
+
+    def shard_for(self, model: Any) -> str:
+        """shard_for.
+
+        Args:
+            model (Any): model
+
+        Returns:
+            str: the shard the model is stored on.
+        """
+        shard_key = SHARD_KEYS.get(type(model))
+        if shard_key is None:
+            return DEFAULT_SHARD
+        return shard_key.chooser(getattr(model, shard_key.attribute), self.shard_ids)
+
+    def shards_for(self, model_cls: type, **filters) -> list[str]:
+        """shards_for.
+
+        Args:
+            model_cls (type): model_cls
+            filters: equality filters of a query.
+
+        Returns:
+            list[str]: the shards the matching models may be stored on.
+        """
+        shard_key = SHARD_KEYS.get(model_cls)
+        if shard_key is None:
+            return [DEFAULT_SHARD]
+        if shard_key.attribute not in filters:
+            return list(self.shard_ids)
+        return [shard_key.chooser(filters[shard_key.attribute], self.shard_ids)]
+
+    def shard_chooser(
+        self,
+        mapper: sqlalchemy_orm.Mapper | None,
+        instance: Any,
+        clause: Any = None,
+        **kw,
+    ) -> str:
+        """Shard of a new instance."""
+        if instance is None:
+            return DEFAULT_SHARD
+        return self.shard_for(instance)
+
+    def identity_chooser(
+        self,
+        mapper: sqlalchemy_orm.Mapper,
+        primary_key: Any,
+        **kw,
+    ) -> list[str]:
+        """Shards a primary key may be stored on."""
+        shard_key = SHARD_KEYS.get(mapper.class_)
+        if shard_key is None:
+            return [DEFAULT_SHARD]
+        columns = [column.key for column in mapper.primary_key]
+        if columns == [mapper.attrs[shard_key.attribute].columns[0].key]:
+            return [shard_key.chooser(primary_key[0], self.shard_ids)]
+        return list(self.shard_ids)
+
+    def execute_chooser(self, context: sqlalchemy_orm.ORMExecuteState) -> list[str]:
+        """Shards a statement runs on."""
+        mapper = context.bind_mapper
+        if mapper is None or mapper.class_ not in SHARD_KEYS:
+            return [DEFAULT_SHARD]
+        shard_key = SHARD_KEYS[mapper.class_]
+        column = mapper.attrs[shard_key.attribute].columns[0]
+        values = _pinned_values(context.statement, column)
+        if values is None:
+            return list(self.shard_ids)
+        return list(
+            dict.fromkeys(shard_key.chooser(value, self.shard_ids) for value in values)
+        )
+
+
+def _pinned_values(statement: Any, column: sqlalchemy.Column) -> list[Any] | None:
+    """Values the statement restricts ``column`` to, None when unrestricted."""
+    criteria = getattr(statement, "whereclause", None)
+    if criteria is None:
+        return None
+    if (
+        isinstance(criteria, elements.BooleanClauseList)
+        and criteria.operator is operators.and_
+    ):
+        conjuncts = criteria.clauses
+    else:
+        conjuncts = [criteria]
+
+    for conjunct in conjuncts:
+        if not isinstance(conjunct, elements.BinaryExpression):
+            continue
+        left, right = conjunct.left, conjunct.right
+        if getattr(left, "table", None) is not column.table or left.key != column.key:
+            continue
+        if not isinstance(right, elements.BindParameter):
+            continue
+        if conjunct.operator is operators.eq:
+            return [right.effective_value]
+        if conjunct.operator is operators.in_op:
+            return list(right.effective_value)
+    return None
+
+
+class ShardedRepository(sqlalchemy_adapter.Repository):
+    """ShardedRepository."""
+
+    def __init__(
+        self,
+        session: sqlalchemy_adapter.Session,
+        router: ShardRouter,
+        cache_size: int | None = None,
+    ):
+        super().__init__(session, cache_size=cache_size)
+        self.router = router
+
+    @override
+    def _add(
+        self,
+        models: list[T],
+        *args,
+        bulk: bool = False,
+        upsert: bool = False,
+        **kwargs,
+    ) -> list[T]:
+        if not (bulk or upsert):
+            return super()._add(models, *args, **kwargs)
+
+        grouped: dict[tuple[type, str], list[T]] = {}
+        for model in models:
+            key = (type(model), self.router.shard_for(model))
+            grouped.setdefault(key, []).append(model)
+        for (model_class, shard_id), group in grouped.items():
+            self._bulk_insert(
+                model_class, group, upsert, bind_arguments={"shard_id": shard_id}
+            )
+        return models
+
+    @override
+    def _dialect_name(self) -> str:
+        return self.router.engines[self.router.shard_ids[0]].dialect.name
+
+    @override
+    def _remove_where(self, model_class: Type[T], **filters) -> int:
+        statement = sqlalchemy.delete(model_class).filter_by(**filters)
+        return sum(
+            self.session.execute(
+                statement, bind_arguments={"shard_id": shard_id}
+            ).rowcount
+            for shard_id in self.router.shards_for(model_class, **filters)
+        )
+
+    @override
+    def _update_where(
+        self,
+        model_class: Type[T],
+        values: dict[str, Any],
+        **filters,
+    ) -> int:
+        statement = sqlalchemy.update(model_class).filter_by(**filters).values(**values)
+        return sum(
+            self.session.execute(
+                statement, bind_arguments={"shard_id": shard_id}
+            ).rowcount
+            for shard_id in self.router.shards_for(model_class, **filters)
+        )
+
+
+class ShardedComponentFactory(sqlalchemy_adapter.ComponentFactory):
+    """ShardedComponentFactory.
+
+    Sessions span every shard. Inserts go to the shard of their model, queries
+    to the shards their criteria allow. Commits are issued shard by shard and
+    are not atomic across shards.
+    """
+
+    config_cls: Type[ShardedSQLAlchemyConfig] = ShardedSQLAlchemyConfig
+
+    @override
+    def _init_engine(self) -> sqlalchemy.Engine:
+        registry = sqlalchemy_adapter.get_engine_registry()
+        self.shard_engines = {DEFAULT_SHARD: registry.get_engine(self.config)}
+        for shard_id, connection in self.config.shards.items():
+            if shard_id == DEFAULT_SHARD:
+                raise ValueError(f"Shard id {DEFAULT_SHARD!r} is reserved")
+            shard_config = self.config.model_copy(
+                update={"connection": connection, "shards": {}}
+            )
+            self.shard_engines[shard_id] = registry.get_engine(shard_config)
+        self.router = ShardRouter(self.shard_engines)
+        return self.shard_engines[DEFAULT_SHARD]
+
+    @override
+    def _init_session_factory(self) -> sqlalchemy_adapter.SessionFactory:
+        return sqlalchemy_adapter.SessionFactory(
+            self.engine,
+            class_=horizontal_shard.ShardedSession,
+            shards=self.shard_engines,
+            shard_chooser=self.router.shard_chooser,
+            identity_chooser=self.router.identity_chooser,
+            execute_chooser=self.router.execute_chooser,
+        )
+
+    @override
+    def create_repository(
+        self,
+        *args,
+        session: sqlalchemy_adapter.Session | None = None,
+        **kwargs,
+    ) -> ShardedRepository:
+        """create_repository.
+
+        Args:
+            session (Session | None): session
+            args:
+            kwargs:
+        """
+        session = session or self.create_session()
+        kwargs.setdefault("cache_size", self.config.identity_map_size)
+        return ShardedRepository(session, self.router, *args, **kwargs)
+
+    def shards_for(self, model_cls: type, **filters) -> list[str]:
+        """shards_for.
+
+        Args:
+            model_cls (type): model_cls
+            filters: equality filters of a query.
+
+        Returns:
+            list[str]: the shards a query with these filters has to visit.
+        """
+        return self.router.shards_for(model_cls, **filters)
+
+
+def merge_sorted(
+    results: Iterable[Iterable[T]],
+    keys: list[tuple[str, str]],
+    offset: int | None = None,
+    limit: int | None = None,
+) -> list[T]:
+    """merge_sorted.
+
+    Args:
+        results (Iterable[Iterable[T]]): per-shard results, each already sorted
+            by ``keys``.
+        keys (list[tuple[str, str]]): (attribute, "+" or "-") pairs.
+        offset (int | None): models of the merged result to skip.
+        limit (int | None): models of the merged result to keep.
+
+    Returns:
+        list[T]: the merged, sorted slice.
+    """
+    merged = heapq.merge(*results, key=pagination.sort_key(keys))
+    start = offset or 0
+    stop = None if limit is None else start + limit
+    return list(itertools.islice(merged, start, stop))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import concurrent.futures
 import dataclasses
 import os
 from typing import TYPE_CHECKING, Callable, NewType, NoReturn
@@ -20,11 +21,19 @@ __all__ = [
 
 
 CommandRouter = NewType(
-    "CommandRouter", dict[type[messages.Command], Callable[..., NoReturn]]
+    "CommandRouter",
+    dict[
+        type[messages.Command] | type[messages.LightCommand],
+        Callable[..., NoReturn],
+    ],
 )
 
 EventRouter = NewType(
-    "EventRouter", dict[type[messages.Event], list[Callable[..., NoReturn]]]
+    "EventRouter",
+    dict[
+        type[messages.Event] | type[messages.LightEvent],
+        list[Callable[..., NoReturn]],
+    ],
 )
 
 Dependencies = NewType("Dependencies", dict[str, object])
@@ -43,6 +52,12 @@ class Bootstrapper(pydantic.BaseModel):
         command_router (CommandRouter): A dictionary with Command as key and handler as value.
         event_router (EventRouter): A dictionary with Event as key and list of handlers as value.
         dependencies (dict[str, object]): A dictionary indicating dependencies used by the application.
+            Values may be dependency_injection providers (Singleton, Factory, Scoped) resolved per call.
+        concurrent_events (bool): Run the handlers of one event in parallel on a shared thread pool, each with its
+            own unit of work: the "uow" dependency must be a dependency_injection.Scoped provider. Defaults to False.
+        max_event_workers (int | None): Size of that thread pool. Defaults to the ThreadPoolExecutor default.
+        hooks (list[object]): instrumentation.Hook instances the buses call around every handler, e.g. a
+            MetricsCollector. Defaults to none.
     """
 
     use_orm: bool = pydantic.Field(default=False)
@@ -50,6 +65,12 @@ class Bootstrapper(pydantic.BaseModel):
     command_router: CommandRouter = pydantic.Field(default_factory=dict)
     event_router: EventRouter = pydantic.Field(default_factory=dict)
     dependencies: dict[str, object] = pydantic.Field(default_factory=dict)
+    concurrent_events: bool = pydantic.Field(default=False)
+    max_event_workers: int | None = pydantic.Field(default=None)
+    hooks: list[object] = pydantic.Field(default_factory=list)
+    _event_executor: concurrent.futures.ThreadPoolExecutor | None = pydantic.PrivateAttr(
+        default=None
+    )
     _injected_command_handlers: dict[
         type[messages.Command], Callable[..., NoReturn]
     ] = pydantic.PrivateAttr(default_factory=dict)
@@ -120,6 +141,67 @@ class Bootstrapper(pydantic.BaseModel):
             self.dependencies["uow"],
             self._injected_command_handlers,
             self._injected_event_handlers,
+            event_executor=self.event_executor(),
+            hooks=self.hooks,
+        )
+        return bus
+
+    def event_executor(self) -> concurrent.futures.ThreadPoolExecutor | None:
+        """
+        The thread pool shared by every bus for concurrent event fan-out.
+
+        Returns:
+            executor: None unless concurrent_events is enabled.
+        """
+        if not self.concurrent_events:
+            return None
+        if self._event_executor is None:
+            self._event_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_event_workers,
+                thread_name_prefix="event-handler",
+            )
+        return self._event_executor
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shut down the thread pool of concurrent_events, if it was started.
+
+        The buses bootstrapped so far can no longer fan out events afterwards;
+        the next bootstrap starts a new pool.
+
+        Args:
+            wait (bool): Wait for the running handlers. Defaults to True.
+        """
+        executor, self._event_executor = self._event_executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def bootstrap_async(
+        self,
+        executor: concurrent.futures.Executor | None = None,
+    ) -> message_bus.AsyncMessageBus:
+        """
+        Bootstrap the application for asyncio workers.
+
+        Coroutine handlers from the routers are awaited, sync handlers run on
+        ``executor``. The ``uow`` dependency should be an AsyncUnitOfWork, or a
+        dependency_injection.Scoped provider of one when messages are handled by
+        concurrent tasks.
+
+        Args:
+            executor (concurrent.futures.Executor | None): Executor for sync handlers.
+                Defaults to the event loop's default executor.
+
+        Returns:
+            bus: An instance of the AsyncMessageBus.
+        """
+
+        bus = message_bus.AsyncMessageBus(
+            self.dependencies["uow"],
+            self._injected_command_handlers,
+            self._injected_event_handlers,
+            executor=executor,
+            hooks=self.hooks,
         )
         return bus
 
@@ -139,3 +221,10 @@ def bootstrap() -> message_bus.MessageBus:
     if BOOTSTRAPPER is None:
         raise ValueError("Bootstrapper is not set")
     return BOOTSTRAPPER.bootstrap()
+
+
+def bootstrap_async() -> message_bus.AsyncMessageBus:
+    global BOOTSTRAPPER
+    if BOOTSTRAPPER is None:
+        raise ValueError("Bootstrapper is not set")
+    return BOOTSTRAPPER.bootstrap_async()
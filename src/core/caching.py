@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import abc
+import collections
+import threading
+import time
+import weakref
+from typing import Any, Callable, Hashable
+
+__all__ = [
+    "ResultCache",
+    "LRUCache",
+]
+
+MISSING = object()
+
+
+class ResultCache(abc.ABC):
+    """ResultCache.
+
+    Query results keyed by ``make_key``, invalidated per model class.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: Hashable) -> Any:
+        """get.
+
+        Args:
+            key (Hashable): key
+
+        Returns:
+            Any: the cached result, MISSING when absent or expired.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set(self, key: Hashable, value: Any, model_cls: type):
+        """set.
+
+        Args:
+            key (Hashable): key
+            value (Any): value
+            model_cls (type): the model class the result was read from.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def invalidate(self, model_cls: type):
+        """Drop every result read from ``model_cls``."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self):
+        """clear."""
+        raise NotImplementedError
+
+
+class LRUCache(ResultCache):
+    """In-process ResultCache with least recently used eviction and a TTL.
+
+    Attributes:
+        max_size (int): Upper bound on the number of results kept. Defaults to 1024.
+        ttl (float | None): Seconds a result stays valid. Defaults to None (no expiry).
+        hits (int): Lookups served from the cache.
+        misses (int): Lookups that were absent or expired.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.entries: collections.OrderedDict[Hashable, tuple[float | None, type, Any]] = (
+            collections.OrderedDict()
+        )
+        self.keys_by_model: dict[type, set[Hashable]] = collections.defaultdict(set)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires, _, value = entry
+            if expires is not None and expires <= self.clock():
+                self._pop(key)
+                self.misses += 1
+                return MISSING
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, model_cls: type):
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self.lock:
+            self.entries[key] = (expires, model_cls, value)
+            self.entries.move_to_end(key)
+            self.keys_by_model[model_cls].add(key)
+            while len(self.entries) > self.max_size:
+                self._pop(next(iter(self.entries)))
+
+    def invalidate(self, model_cls: type):
+        with self.lock:
+            for key in self.keys_by_model.pop(model_cls, ()):
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_model.clear()
+
+    @property
+    def statistics(self) -> dict[str, int]:
+        """statistics."""
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _pop(self, key: Hashable):
+        _, model_cls, _ = self.entries.pop(key)
+        keys = self.keys_by_model.get(model_cls)
+        if keys is not None:
+            keys.discard(key)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+
+def make_key(model_cls: type, operation: str, **params) -> Hashable:
+    """make_key.
+
+    Args:
+        model_cls (type): model_cls
+        operation (str): the View method, e.g. ``fetch_models``.
+        params: filters, orders, limit, offset and the other query arguments.
+
+    Returns:
+        Hashable: the cache key.
+    """
+    return (model_cls, operation, _freeze(params))
+
+
+CACHES: weakref.WeakSet[ResultCache] = weakref.WeakSet()
+
+
+def register(cache: ResultCache):
+    """Let ``invalidate`` reach ``cache``."""
+    CACHES.add(cache)
+
+
+def invalidate(model_cls: type):
+    """Drop the results read from ``model_cls`` in every registered cache."""
+    for cache in list(CACHES):
+        cache.invalidate(model_cls)
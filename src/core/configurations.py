@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Literal
 
 import pydantic
 
@@ -17,7 +17,21 @@ class DatabaseConnectionConfig(pydantic.BaseModel):
 
 
 class DatabaseConfig(pydantic.BaseModel):
-    """DatabaseConfig."""
+    """DatabaseConfig.
+
+    Attributes:
+        replicas (list[DatabaseConnectionConfig]): Read replicas of ``connection``,
+            used by read-only sessions. Defaults to none.
+        replica_strategy (str): "round_robin" or "least_connections".
+        replica_retry_interval (float): Seconds a replica that failed is skipped.
+        replica_lag (float): Seconds reads stay on the primary after a commit in
+            the same context, so that they see their own writes.
+    """
 
     framework: str = DEFAULT_DATABASE_FRAMEWORK
     connection: DatabaseConnectionConfig
+    identity_map_size: int | None = None
+    replicas: list[DatabaseConnectionConfig] = pydantic.Field(default_factory=list)
+    replica_strategy: Literal["round_robin", "least_connections"] = "round_robin"
+    replica_retry_interval: float = 30.0
+    replica_lag: float = 1.0
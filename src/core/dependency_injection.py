@@ -1,6 +1,141 @@
+from __future__ import annotations
+
+import abc
+import contextlib
+import contextvars
 import functools
 import inspect
-from typing import Any, Callable
+import threading
+from typing import Any, Callable, Iterator
+
+__all__ = [
+    "Provider",
+    "Singleton",
+    "Factory",
+    "Scoped",
+    "scope",
+    "resolve",
+    "inject_dependencies",
+]
+
+_SCOPE: contextvars.ContextVar[dict[Provider, Any] | None] = contextvars.ContextVar(
+    "dependency_scope", default=None
+)
+
+
+class Provider(abc.ABC):
+    """Provider.
+
+    A dependency that is built when a handler is called rather than when the
+    Bootstrapper is constructed.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+
+    @abc.abstractmethod
+    def resolve(self) -> Any:
+        """resolve."""
+        raise NotImplementedError
+
+
+class Singleton(Provider):
+    """Built on first use, then shared by every handler and thread."""
+
+    _UNSET = object()
+
+    def __init__(self, factory: Callable[[], Any]):
+        super().__init__(factory)
+        self.instance = self._UNSET
+        self.lock = threading.Lock()
+
+    def resolve(self) -> Any:
+        instance = self.instance
+        if instance is self._UNSET:
+            with self.lock:
+                if self.instance is self._UNSET:
+                    self.instance = self.factory()
+                instance = self.instance
+        return instance
+
+
+class Factory(Provider):
+    """Built anew for every handler call."""
+
+    def resolve(self) -> Any:
+        return self.factory()
+
+
+class Scoped(Provider):
+    """Built once per scope, i.e. once per message handled by the MessageBus,
+    and shared by every handler of the messages it cascades into."""
+
+    def resolve(self) -> Any:
+        instances = _SCOPE.get()
+        if instances is None:
+            raise RuntimeError("Scoped dependency resolved outside of a scope")
+        if self not in instances:
+            instances[self] = self.factory()
+        return instances[self]
+
+
+@contextlib.contextmanager
+def scope(isolated: bool = False) -> Iterator[None]:
+    """Open a dependency scope, or join the one that is already open.
+
+    Args:
+        isolated (bool): Open a new scope even inside another one, whose Scoped
+            instances are not shared with it. Defaults to False.
+    """
+    if not isolated and _SCOPE.get() is not None:
+        yield
+        return
+    token = _SCOPE.set({})
+    try:
+        yield
+    finally:
+        _SCOPE.reset(token)
+
+
+def resolve(dependency: Any) -> Any:
+    """resolve.
+
+    Args:
+        dependency (Any): a Provider or a plain value.
+
+    Returns:
+        Any: the provided instance, or the value itself.
+    """
+    if isinstance(dependency, Provider):
+        return dependency.resolve()
+    return dependency
+
+
+def _call_plan(
+    handler: Callable[..., Any],
+    dependencies: dict[str, Any],
+) -> tuple[tuple[Any, ...], dict[str, Any]]:
+    """Split the dependencies a handler takes into positional and keyword ones.
+
+    Dependencies directly following the first (message) parameter are passed by
+    position, the others by keyword.
+    """
+    params = list(inspect.signature(handler).parameters.values())
+    positional = []
+    for param in params[1:]:
+        if param.kind not in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+            break
+        if param.name not in dependencies:
+            break
+        positional.append(param.name)
+    keywords = {
+        param.name: dependencies[param.name]
+        for param in params
+        if param.name in dependencies
+        and param.name not in positional
+        and param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY)
+    }
+    return tuple(dependencies[name] for name in positional), keywords
 
 
 def inject_dependencies(
@@ -9,17 +144,39 @@ def inject_dependencies(
 ):
     """inject_dependencies.
 
+    The call plan is built once here, so a call to the returned wrapper only
+    resolves providers and forwards the message, with any keyword arguments
+    the caller adds.
+
     Args:
         handler (Callable[..., None]): handler
-        dependencies (dict[str, Any]): dependencies
+        dependencies (dict[str, Any]): dependencies, plain values or Providers.
     """
-    params = inspect.signature(handler).parameters
-    deps = {
-        name: dependency for name, dependency in dependencies.items() if name in params
-    }
+    positional, keywords = _call_plan(handler, dependencies)
+
+    if any(isinstance(dep, Provider) for dep in (*positional, *keywords.values())):
+
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            if keywords:
+                return handler(
+                    *args,
+                    *[resolve(dep) for dep in positional],
+                    **{name: resolve(dep) for name, dep in keywords.items()},
+                    **kwargs,
+                )
+            return handler(*args, *[resolve(dep) for dep in positional], **kwargs)
+
+    elif keywords:
+
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            return handler(*args, *positional, **keywords, **kwargs)
+
+    else:
 
-    @functools.wraps(handler)
-    def wrapper(*args, **kwargs):
-        return handler(*args, **deps, **kwargs)
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            return handler(*args, *positional, **kwargs)
 
     return wrapper
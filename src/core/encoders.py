@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import abc
+import dataclasses
+import json
+from datetime import date
+from typing import Any
+
+import pydantic
+
+from core import messages, models
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+__all__ = [
+    "Encoder",
+    "JsonEncoder",
+    "OrjsonEncoder",
+    "get_encoder",
+    "set_encoder",
+]
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for values the backend cannot encode natively."""
+    if isinstance(obj, models.BaseModel):
+        return obj.json
+    if isinstance(obj, pydantic.BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, messages.LightMessage):
+        return {
+            field.name: getattr(obj, field.name)
+            for field in dataclasses.fields(obj)
+            if field.init
+        }
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class Encoder(abc.ABC):
+    """Encoder.
+
+    Encodes models, messages and plain values straight to UTF-8 JSON bytes.
+    """
+
+    def dumps(self, obj: Any) -> bytes:
+        """dumps.
+
+        Args:
+            obj (Any): a BaseModel, a pydantic model (e.g. a message), or any
+                JSON compatible value, possibly containing either.
+
+        Returns:
+            bytes: UTF-8 encoded JSON.
+        """
+        if isinstance(obj, pydantic.BaseModel):
+            return obj.__pydantic_serializer__.to_json(obj)
+        return self._dumps(obj)
+
+    @abc.abstractmethod
+    def _dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def loads(self, data: bytes | str) -> Any:
+        """loads.
+
+        Args:
+            data (bytes | str): data
+
+        Returns:
+            Any:
+        """
+        raise NotImplementedError
+
+
+class JsonEncoder(Encoder):
+    """Encoder backed by the standard library."""
+
+    def _dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonEncoder(Encoder):
+    """Encoder backed by orjson."""
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        # Route dataclasses (BaseModel) through _default so that they are
+        # encoded with BaseModel.json rather than field by field.
+        self.options = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+
+    def _dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=self.options)
+
+    def loads(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+
+ENCODER: Encoder | None = None
+
+
+def get_encoder() -> Encoder:
+    """The process wide encoder, orjson when installed, stdlib otherwise."""
+    global ENCODER  # pylint: disable=global-statement
+    if ENCODER is None:
+        ENCODER = OrjsonEncoder() if orjson is not None else JsonEncoder()
+    return ENCODER
+
+
+def set_encoder(encoder: Encoder | None):
+    """set_encoder.
+
+    Args:
+        encoder (Encoder | None): the encoder to use, None to pick the default again.
+    """
+    global ENCODER  # pylint: disable=global-statement
+    ENCODER = encoder
+
+
+def dumps(obj: Any) -> bytes:
+    """dumps.
+
+    Args:
+        obj (Any): obj
+
+    Returns:
+        bytes: UTF-8 encoded JSON, see Encoder.dumps.
+    """
+    return get_encoder().dumps(obj)
+
+
+def loads(data: bytes | str) -> Any:
+    """loads.
+
+    Args:
+        data (bytes | str): data
+
+    Returns:
+        Any:
+    """
+    return get_encoder().loads(data)
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import collections
+from typing import Any, Iterator, Type, TypeVar
+
+from core.models import BaseModel, EventList
+
+__all__ = [
+    "IdentityMap",
+]
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class IdentityMap:
+    """IdentityMap.
+
+    Models loaded or added in the current unit of work, keyed by class and id.
+
+    Attributes:
+        max_size (int | None): Upper bound on the number of models kept. The least
+            recently used models are evicted first; models with pending events are
+            never evicted. Defaults to None (unbounded).
+        hits (int): Lookups served from the map.
+        misses (int): Lookups that had to go to the database.
+        dirty (dict[tuple[type, Any], BaseModel]): Models that recorded events
+            since the last drain, in the order they recorded their first one.
+        drains (int): Number of ``drain_events`` calls.
+
+    It also reads like the ``dict[id, model]`` repositories used to cache models
+    in: ``map[model_id]``, ``model_id in map``, iteration, ``keys`` and ``items``
+    go by id alone, the last added model winning when classes share an id, and
+    ``len`` counts those ids. ``get`` keeps its (model_cls, model_id) signature;
+    ``statistics`` counts every cached model.
+    """
+
+    def __init__(self, max_size: int | None = None):
+        self.max_size = max_size
+        self.models: collections.OrderedDict[tuple[type, Any], BaseModel] = (
+            collections.OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.dirty: dict[tuple[type, Any], BaseModel] = {}
+        self.ids: dict[Any, BaseModel] = {}
+        self.drains = 0
+
+    def add(self, model: BaseModel):
+        """add.
+
+        Args:
+            model (BaseModel): model
+        """
+        key = (type(model), model.id)
+        self.models[key] = model
+        self.models.move_to_end(key)
+        self.ids[model.id] = model
+        events = getattr(model, "events", None)
+        if events is not None:
+            if type(events) is not EventList:
+                model.events = events = EventList(events)
+            events.bind(model, self)
+            if events:
+                self.dirty[key] = model
+        if self.max_size is not None and len(self.models) > self.max_size:
+            self._evict()
+
+    def watch(self, model: BaseModel):
+        """watch.
+
+        Collects the events of a model without caching it for lookups, for
+        models the session does not track.
+
+        Args:
+            model (BaseModel): model
+        """
+        events = getattr(model, "events", None)
+        if events is None:
+            return
+        if type(events) is not EventList:
+            model.events = events = EventList(events)
+        events.bind(model, self)
+        if events:
+            self.dirty[(type(model), model.id)] = model
+
+    def get(self, model_cls: Type[T], model_id: Any) -> T | None:
+        """get.
+
+        Args:
+            model_cls (Type[T]): model_cls
+            model_id (Any): model_id
+
+        Returns:
+            T | None: the cached model, None on a miss.
+        """
+        key = (model_cls, model_id)
+        model = self.models.get(key)
+        if model is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.models.move_to_end(key)
+        return model
+
+    def find(self, model_cls: Type[T], **filters) -> list[T]:
+        """find.
+
+        Args:
+            model_cls (Type[T]): model_cls
+            filters:
+
+        Returns:
+            list[T]: cached models of ``model_cls`` whose attributes equal ``filters``.
+        """
+        return [
+            model
+            for (cls, _), model in self.models.items()
+            if cls is model_cls
+            and all(getattr(model, key, None) == value for key, value in filters.items())
+        ]
+
+    def discard(self, model: BaseModel):
+        """discard.
+
+        Args:
+            model (BaseModel): model
+        """
+        key = (type(model), model.id)
+        self.models.pop(key, None)
+        self.dirty.pop(key, None)
+        self._forget(model)
+
+    def mark_dirty(self, model: BaseModel):
+        """mark_dirty.
+
+        Args:
+            model (BaseModel): a model that recorded an event.
+        """
+        self.dirty[(type(model), model.id)] = model
+
+    def drain_events(self) -> list[Any]:
+        """drain_events.
+
+        Returns:
+            list[Any]: the pending events of the dirty models, which are cleared.
+        """
+        dirty, self.dirty = self.dirty, {}
+        self.drains += 1
+        events = []
+        for model in dirty.values():
+            events.extend(model.events)
+            list.clear(model.events)
+        return events
+
+    def snapshot(self) -> tuple[Any, ...]:
+        """snapshot.
+
+        Returns:
+            tuple[Any, ...]: the cached models, the dirty ones and their pending
+                events, for ``restore``.
+        """
+        return (
+            collections.OrderedDict(self.models),
+            dict(self.ids),
+            dict(self.dirty),
+            {key: list(model.events) for key, model in self.dirty.items()},
+            self.drains,
+        )
+
+    def restore(self, snapshot: tuple[Any, ...]):
+        """restore.
+
+        Undoes the additions, removals and events since ``snapshot``, e.g. on a
+        savepoint rollback. Models added since then no longer report events.
+        Events drained since then were handed out already and stay drained.
+
+        Args:
+            snapshot (tuple[Any, ...]): as returned by ``snapshot``.
+        """
+        models, ids, dirty, events, drains = snapshot
+        for key, model in (*self.models.items(), *self.dirty.items()):
+            if key not in models and key not in dirty:
+                _unbind(model)
+        if drains != self.drains:
+            dirty, events = {}, {}
+        for key, model in self.dirty.items():
+            if key in models or key in dirty:
+                list.clear(model.events)
+                list.extend(model.events, events.get(key, ()))
+        self.models = collections.OrderedDict(models)
+        self.ids = dict(ids)
+        self.dirty = dict(dirty)
+
+    def values(self) -> Iterator[BaseModel]:
+        """values."""
+        return iter(self.models.values())
+
+    def clear(self):
+        """clear."""
+        self.models.clear()
+        self.dirty.clear()
+        self.ids.clear()
+
+    @property
+    def statistics(self) -> dict[str, int]:
+        """statistics."""
+        return {
+            "size": len(self.models),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def keys(self) -> Iterator[Any]:
+        """The ids of the cached models."""
+        return iter(self.ids)
+
+    def items(self) -> Iterator[tuple[Any, BaseModel]]:
+        """(id, model) pairs."""
+        return iter(self.ids.items())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, model_id: Any) -> BaseModel:
+        return self.ids[model_id]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.ids)
+
+    def __contains__(self, item: BaseModel | Any) -> bool:
+        if isinstance(item, BaseModel):
+            return (type(item), item.id) in self.models
+        return item in self.ids
+
+    def _forget(self, model: BaseModel):
+        if self.ids.get(model.id) is model:
+            del self.ids[model.id]
+
+    def _evict(self):
+        overflow = len(self.models) - self.max_size
+        evictable = []
+        for key, model in self.models.items():
+            if len(evictable) == overflow:
+                break
+            if not model.events:
+                evictable.append(key)
+        for key in evictable:
+            self._forget(self.models.pop(key))
+
+
+def _unbind(model: BaseModel):
+    events = getattr(model, "events", None)
+    if type(events) is EventList:
+        events.bind(model, None)
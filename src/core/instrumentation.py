@@ -0,0 +1,499 @@
+from __future__ import annotations
+
+import bisect
+import collections
+import http.server
+import math
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from typing import Any, Iterable
+
+__all__ = [
+    "Hook",
+    "Histogram",
+    "MetricsCollector",
+    "PrometheusExporter",
+    "RelayMetrics",
+]
+
+# Seconds, from sub-millisecond handlers to slow commits.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Hook:
+    """Hook.
+
+    Callbacks the MessageBus runs around every message. Override the ones of
+    interest; the others do nothing. Handlers fanned out to an executor call
+    their hooks from the worker threads, so hooks must be thread-safe, and
+    should not raise: an exception from a hook fails the message.
+    """
+
+    def before_handler(self, message: Any, handler: str):
+        """before_handler.
+
+        Args:
+            message (Any): the command or event about to be handled.
+            handler (str): the handler name.
+        """
+
+    def after_handler(self, message: Any, handler: str, duration: float):
+        """after_handler.
+
+        Args:
+            message (Any): message
+            handler (str): handler
+            duration (float): seconds spent in the handler, commit included.
+        """
+
+    def on_error(
+        self,
+        message: Any,
+        handler: str,
+        error: BaseException,
+        duration: float,
+    ):
+        """on_error.
+
+        Args:
+            message (Any): message
+            handler (str): handler
+            error (BaseException): what the handler raised.
+            duration (float): seconds spent in the handler until it raised.
+        """
+
+    def on_events_collected(self, message: Any, events: list[Any], duration: float):
+        """on_events_collected.
+
+        Args:
+            message (Any): the message whose handler recorded the events.
+            events (list[Any]): the collected events, about to be queued.
+            duration (float): seconds spent collecting them.
+        """
+
+    def after_message(self, message: Any, duration: float):
+        """after_message.
+
+        Args:
+            message (Any): the message passed to ``MessageBus.handle``.
+            duration (float): seconds until it and every event it led to were
+                handled.
+        """
+
+
+class Histogram:
+    """Histogram.
+
+    Cumulative-bucket histogram in the Prometheus layout.
+
+    Attributes:
+        buckets (tuple[float, ...]): Upper bounds, ascending; +Inf is implied.
+        counts (list[int]): Observations per bucket, not cumulative, the last
+            one counting those above every bound.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """observe.
+
+        Args:
+            value (float): value
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """(upper bound, observations at or below it) pairs, ending with +Inf."""
+        pairs = []
+        total = 0
+        for bound, count in zip((*self.buckets, math.inf), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q: float) -> float:
+        """quantile.
+
+        Args:
+            q (float): between 0 and 1.
+
+        Returns:
+            float: the estimate histogram_quantile would give, interpolating
+                linearly inside the bucket; nan without observations.
+        """
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        lower = 0.0
+        below = 0
+        for bound, total in self.cumulative():
+            if total >= rank:
+                if math.isinf(bound):
+                    return lower
+                inside = total - below
+                return lower + (bound - lower) * (rank - below) / inside
+            lower, below = bound, total
+        return lower
+
+
+class MetricsCollector(Hook):
+    """MetricsCollector.
+
+    Keeps latency histograms, counts and errors per message type and handler.
+
+    Attributes:
+        handlers (dict[tuple[str, str], Histogram]): Handler latency by
+            (message type, handler name).
+        errors (collections.Counter[tuple[str, str]]): Handler failures, same keys.
+        messages (dict[str, Histogram]): Latency of ``handle`` by the type of the
+            message it was given, every resulting event included.
+        collections (dict[str, Histogram]): Event collection latency by the type of
+            the message whose handler recorded the events.
+        events (collections.Counter[str]): Collected events, same keys.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.handlers: dict[tuple[str, str], Histogram] = {}
+        self.errors: collections.Counter[tuple[str, str]] = collections.Counter()
+        self.messages: dict[str, Histogram] = {}
+        self.collections: dict[str, Histogram] = {}
+        self.events: collections.Counter[str] = collections.Counter()
+        self.lock = threading.Lock()
+
+    def after_handler(self, message: Any, handler: str, duration: float):
+        self._observe(self.handlers, (type(message).__name__, handler), duration)
+
+    def on_error(
+        self,
+        message: Any,
+        handler: str,
+        error: BaseException,
+        duration: float,
+    ):
+        key = (type(message).__name__, handler)
+        self._observe(self.handlers, key, duration)
+        with self.lock:
+            self.errors[key] += 1
+
+    def on_events_collected(self, message: Any, events: list[Any], duration: float):
+        key = type(message).__name__
+        self._observe(self.collections, key, duration)
+        with self.lock:
+            self.events[key] += len(events)
+
+    def after_message(self, message: Any, duration: float):
+        self._observe(self.messages, type(message).__name__, duration)
+
+    def statistics(self) -> dict[tuple[str, str], dict[str, float]]:
+        """statistics.
+
+        Returns:
+            dict[tuple[str, str], dict[str, float]]: count, errors, error_rate,
+                mean, p50, p95 and p99 seconds by (message type, handler name).
+        """
+        with self.lock:
+            return {
+                key: {
+                    "count": histogram.count,
+                    "errors": self.errors[key],
+                    "error_rate": self.errors[key] / histogram.count,
+                    "mean": histogram.sum / histogram.count,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                }
+                for key, histogram in self.handlers.items()
+                if histogram.count
+            }
+
+    def reset(self):
+        """reset."""
+        with self.lock:
+            self.handlers.clear()
+            self.errors.clear()
+            self.messages.clear()
+            self.collections.clear()
+            self.events.clear()
+
+    def _observe(self, histograms: dict[Any, Histogram], key: Any, value: float):
+        with self.lock:
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+
+class RelayMetrics:
+    """RelayMetrics.
+
+    Throughput and lag of an outbox relay.
+
+    Attributes:
+        worker (str): Label of the relay in the exported metrics. Defaults to
+            the process id.
+        dispatched (int): Outbox rows handed to the MessageBus.
+        failed (int): Rows whose dispatch raised.
+        batches (int): Batches relayed.
+        lag (Histogram): Seconds from the commit that wrote a row to its dispatch.
+        batch_duration (Histogram): Seconds per batch, dispatch included.
+    """
+
+    def __init__(
+        self,
+        worker: str | None = None,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        self.worker = str(os.getpid()) if worker is None else worker
+        self.dispatched = 0
+        self.failed = 0
+        self.batches = 0
+        self.lag = Histogram(buckets)
+        self.batch_duration = Histogram(buckets)
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+
+    def observe_batch(self, lags: list[float], failed: int, duration: float):
+        """observe_batch.
+
+        Args:
+            lags (list[float]): lag of every dispatched row.
+            failed (int): rows that failed.
+            duration (float): seconds
+        """
+        with self.lock:
+            for lag in lags:
+                self.lag.observe(lag)
+            self.batch_duration.observe(duration)
+            self.dispatched += len(lags)
+            self.failed += failed
+            self.batches += 1
+
+    def throughput(self) -> float:
+        """Rows dispatched per second since the metrics were created."""
+        return self.dispatched / max(time.monotonic() - self.started, 1e-9)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class PrometheusExporter:
+    """PrometheusExporter.
+
+    Renders a MetricsCollector, and optionally the RelayMetrics of an outbox
+    relay, in the Prometheus text exposition format, to a file for the node
+    exporter's textfile collector or over HTTP.
+
+    Attributes:
+        namespace (str): Prefix of every metric name. Defaults to "core".
+    """
+
+    def __init__(
+        self,
+        collector: MetricsCollector,
+        namespace: str = "core",
+        relay: RelayMetrics | None = None,
+    ):
+        self.collector = collector
+        self.namespace = namespace
+        self.relay = relay
+
+    def render(self) -> str:
+        """render.
+
+        Returns:
+            str: the exposition text.
+        """
+        collector = self.collector
+        lines: list[str] = []
+        with collector.lock:
+            self._histogram(
+                lines,
+                "handler_duration_seconds",
+                "Time spent in a message handler, commit included.",
+                {
+                    _labels(message_type=message_type, handler=handler): histogram
+                    for (message_type, handler), histogram in collector.handlers.items()
+                },
+            )
+            self._counter(
+                lines,
+                "handler_errors_total",
+                "Exceptions raised by a message handler.",
+                {
+                    _labels(message_type=message_type, handler=handler): count
+                    for (message_type, handler), count in collector.errors.items()
+                },
+            )
+            self._histogram(
+                lines,
+                "message_duration_seconds",
+                "Time to handle a message and every event it led to.",
+                {
+                    _labels(message_type=message_type): histogram
+                    for message_type, histogram in collector.messages.items()
+                },
+            )
+            self._histogram(
+                lines,
+                "event_collection_duration_seconds",
+                "Time spent collecting the events recorded by a handler.",
+                {
+                    _labels(message_type=message_type): histogram
+                    for message_type, histogram in collector.collections.items()
+                },
+            )
+            self._counter(
+                lines,
+                "events_collected_total",
+                "Events recorded by the handlers of a message type.",
+                {
+                    _labels(message_type=message_type): count
+                    for message_type, count in collector.events.items()
+                },
+            )
+        if self.relay is not None:
+            self._relay(lines, self.relay)
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | os.PathLike):
+        """Replace ``path`` atomically with the current exposition text."""
+        path = pathlib.Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w") as file:
+                file.write(self.render())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def serve(self, port: int, host: str = "") -> http.server.ThreadingHTTPServer:
+        """serve.
+
+        Args:
+            port (int): port
+            host (str): host. Defaults to every interface.
+
+        Returns:
+            http.server.ThreadingHTTPServer: the server, answering ``GET /metrics``
+                from a daemon thread until its ``shutdown`` is called.
+        """
+        exporter = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), Handler)
+        thread = threading.Thread(
+            target=server.serve_forever, name="metrics-exporter", daemon=True
+        )
+        thread.start()
+        return server
+
+    def _relay(self, lines: list[str], relay: RelayMetrics):
+        labels = _labels(worker=relay.worker)
+        with relay.lock:
+            self._counter(
+                lines,
+                "outbox_dispatched_total",
+                "Outbox rows handed to the message bus.",
+                {labels: relay.dispatched},
+            )
+            self._counter(
+                lines,
+                "outbox_failed_total",
+                "Outbox rows whose dispatch raised.",
+                {labels: relay.failed},
+            )
+            self._histogram(
+                lines,
+                "outbox_lag_seconds",
+                "Time from the commit that wrote an outbox row to its dispatch.",
+                {labels: relay.lag},
+            )
+            self._histogram(
+                lines,
+                "outbox_batch_duration_seconds",
+                "Time to relay a batch of outbox rows.",
+                {labels: relay.batch_duration},
+            )
+
+    def _header(self, lines: list[str], name: str, help_: str, kind: str) -> str:
+        name = f"{self.namespace}_{name}"
+        lines.append(f"# HELP {name} {help_}")
+        lines.append(f"# TYPE {name} {kind}")
+        return name
+
+    def _counter(
+        self,
+        lines: list[str],
+        name: str,
+        help_: str,
+        samples: dict[str, int],
+    ):
+        name = self._header(lines, name, help_, "counter")
+        for labels, value in samples.items():
+            lines.append(f"{name}{{{labels}}} {value}")
+
+    def _histogram(
+        self,
+        lines: list[str],
+        name: str,
+        help_: str,
+        samples: dict[str, Histogram],
+    ):
+        name = self._header(lines, name, help_, "histogram")
+        for labels, histogram in samples.items():
+            for bound, total in histogram.cumulative():
+                le = _labels(le=_number(bound))
+                lines.append(f"{name}_bucket{{{labels},{le}}} {total}")
+            lines.append(f"{name}_sum{{{labels}}} {_number(histogram.sum)}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
@@ -1,16 +1,66 @@
 from __future__ import annotations
 
-from typing import Any, Callable
+import asyncio
+import collections
+import concurrent.futures
+import contextvars
+import functools
+import inspect
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable
 
 import utils
 
-from core import messages, unit_of_work
+from core import dependency_injection, instrumentation, messages, statements
+
+if TYPE_CHECKING:
+    from core import unit_of_work
 
 logger = utils.get_logger()
 
+Route = tuple[Callable[..., Any], str]
+
+# The messages left to handle by the current ``handle`` call, so that concurrent
+# calls, in threads or tasks, each keep their own.
+_QUEUE: contextvars.ContextVar[collections.deque | None] = contextvars.ContextVar(
+    "message_queue", default=None
+)
+
+# The event handler errors of the current ``handle(..., raise_errors=True)`` call.
+_ERRORS: contextvars.ContextVar[list[Exception] | None] = contextvars.ContextVar(
+    "event_handler_errors", default=None
+)
+
 
 class MessageBus:
-    """MessageBus."""
+    """MessageBus.
+
+    Attributes:
+        event_executor (concurrent.futures.Executor | None): When set, the handlers
+            of one event run in parallel on this executor, each in its own
+            dependency scope, so ``uow`` must then be a
+            ``dependency_injection.Scoped`` provider: every handler gets its own
+            unit of work. The events a handler records are collected when it
+            returns and queued in handler registration order. The executor is
+            not shut down by the bus. Defaults to None (serial).
+        hooks (list[instrumentation.Hook]): Called around every handler, event
+            collection and message. Defaults to none.
+        statements (statements.StatementStats | None): The SQL statements executed
+            by the last ``handle`` call of the current thread or asyncio task, its
+            events included.
+
+    Every call to ``handle`` opens a dependency scope, so ``uow`` may be a
+    ``dependency_injection.Scoped`` provider that builds one unit of work per
+    message. Concurrent ``handle`` calls, from threads or asyncio tasks, need
+    such a provider: a plain unit of work has a single session and repository.
+    A ``dependency_injection.Factory`` is refused: the bus would get a new unit
+    of work, without the recorded events, each time it reads ``uow``.
+
+    The routes are cached per message type. ``event_handlers`` and
+    ``command_handlers`` are copied into tables that drop the cache whenever
+    they, or a handler list, change.
+    """
 
     def __init__(
         self,
@@ -23,67 +73,545 @@ class MessageBus:
             type[messages.Event],
             list[Callable[[messages.Event], Any]],
         ],
+        event_executor: concurrent.futures.Executor | None = None,
+        hooks: list[instrumentation.Hook] | None = None,
     ):
+        # Dispatch tables, filled once per concrete message type.
+        self._dispatch: dict[type, Callable[[Any], None]] = {}
+        self._event_routes: dict[type, list[Route]] = {}
+        self._command_routes: dict[type, Route] = {}
+        if event_executor is not None and not isinstance(
+            uow, dependency_injection.Scoped
+        ):
+            raise ValueError(
+                "Concurrent event handlers need a dependency_injection.Scoped uow"
+            )
         self.uow = uow
         self.event_handlers = event_handlers
         self.command_handlers = command_handlers
-        self.queue: list[messages.Message] = []
+        self.event_executor = event_executor
+        self.hooks = list(hooks or [])
+        # Per bus, so that concurrent handle calls keep their own stats.
+        self._statements: contextvars.ContextVar[statements.StatementStats | None] = (
+            contextvars.ContextVar(f"bus_statements_{id(self)}", default=None)
+        )
         self.logger = logger
 
-    def handle(self, message: messages.Message):
+    @property
+    def queue(self) -> collections.deque[messages.Message]:
+        """The messages left to handle by the current ``handle`` call."""
+        queue = _QUEUE.get()
+        return collections.deque() if queue is None else queue
+
+    @queue.setter
+    def queue(self, queue: Iterable[messages.Message]):
+        current = _QUEUE.get()
+        if current is None:
+            _QUEUE.set(collections.deque(queue))
+            return
+        # Replaced in place: handle reads the deque it started with.
+        queue = list(queue)
+        current.clear()
+        current.extend(queue)
+
+    @property
+    def statements(self) -> statements.StatementStats | None:
+        """The statements of the last ``handle`` call in the current context."""
+        return self._statements.get()
+
+    @property
+    def uow(self) -> unit_of_work.BaseUnitOfWork:
+        """The unit of work of the current scope."""
+        return dependency_injection.resolve(self._uow)
+
+    @uow.setter
+    def uow(self, uow: unit_of_work.BaseUnitOfWork | dependency_injection.Provider):
+        if isinstance(uow, dependency_injection.Factory):
+            raise ValueError(
+                "uow must be a unit of work, or a Scoped or Singleton provider"
+            )
+        self._uow = uow
+
+    @property
+    def event_handlers(self) -> dict[type, list[Callable[..., Any]]]:
+        """The event handlers by event type."""
+        return self._event_handlers
+
+    @event_handlers.setter
+    def event_handlers(self, event_handlers: dict[type, list[Callable[..., Any]]]):
+        self._event_handlers = _HandlerTable(
+            self._reset_routes, event_handlers, lists=True
+        )
+        self._reset_routes()
+
+    @property
+    def command_handlers(self) -> dict[type, Callable[..., Any]]:
+        """The command handler by command type."""
+        return self._command_handlers
+
+    @command_handlers.setter
+    def command_handlers(self, command_handlers: dict[type, Callable[..., Any]]):
+        self._command_handlers = _HandlerTable(self._reset_routes, command_handlers)
+        self._reset_routes()
+
+    def _reset_routes(self):
+        self._dispatch.clear()
+        self._event_routes.clear()
+        self._command_routes.clear()
+
+    def handle(self, message: messages.Message, raise_errors: bool = False):
         """handle.
 
         Args:
             message (messages.Message): message
+            raise_errors (bool): Raise the first error of an event handler once
+                every message has been handled, instead of only logging it.
+                Defaults to False.
         """
-        self.queue = [message]
-        while self.queue:
-            message = self.queue.pop(0)
-            if isinstance(message, messages.Event):
-                self.handle_event(message)
-            elif isinstance(message, messages.Command):
-                self.handle_command(message)
-            else:
-                raise ValueError(f"{message} was not an Event or Command")
+        start = time.perf_counter()
+        root = message
+        stats = statements.StatementStats()
+        queue = collections.deque([message])
+        errors = [] if raise_errors else None
+        token = _QUEUE.set(queue)
+        errors_token = _ERRORS.set(errors)
+        try:
+            with dependency_injection.scope(), stats:
+                while queue:
+                    message = queue.popleft()
+                    dispatch = self._dispatch.get(type(message))
+                    if dispatch is None:
+                        dispatch = self._resolve_dispatch(message)
+                    dispatch(message)
+        finally:
+            _ERRORS.reset(errors_token)
+            _QUEUE.reset(token)
+            self._statements.set(stats)
+            self._after_message(root, start, stats)
+        if errors:
+            raise errors[0]
 
     def handle_event(self, event: messages.Event):
         """handle_event.
 
         Args:
             event (messages.Event): event
+
+        Raises:
+            KeyError: when no handler list is registered for the event type or
+                any of its base classes.
         """
-        for handler in self.event_handlers[type(event)]:
+        routes = self._event_routes.get(type(event))
+        if routes is None:
+            routes = self._resolve_event_routes(type(event))
+        debug = self._is_debug_enabled()
+        if self.event_executor is not None and len(routes) > 1:
+            self._fan_out_event(event, routes, debug)
+            return
+        for handler, name in routes:
             try:
+                if debug:
+                    self.logger.debug(
+                        "handling event %s with handler %s",
+                        event,
+                        name,
+                    )
+                self._call(handler, event, name)
+                self._collect(event)
+            except Exception as error:  # pylint: disable=broad-except
+                self._event_failed(event, name, error)
+                continue
+
+    def handle_command(self, command: messages.Command):
+        """handle_command.
+
+        Args:
+            command (messages.Command): command
+        """
+        route = self._command_routes.get(type(command))
+        if route is None:
+            route = self._resolve_command_route(type(command))
+        handler, name = route
+        if self._is_debug_enabled():
+            self.logger.debug(
+                "handling command %s with handler %s",
+                command,
+                name,
+            )
+        try:
+            self._call(handler, command, name)
+            self._collect(command)
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception("Exception handling command %s", command)
+            raise
+
+    def _fan_out_event(self, event: messages.Event, routes: list[Route], debug: bool):
+        futures = []
+        for handler, name in routes:
+            if debug:
                 self.logger.debug(
                     "handling event %s with handler %s",
                     event,
-                    handler.__name__,
-                )
-                handler(event)
-                self.queue.extend(self.uow.collect_event())
-            except Exception:  # pylint: disable=broad-except
-                self.logger.exception(
-                    "Exception handling event %s with handler %s",
-                    event,
-                    handler.__name__,
+                    name,
                 )
+            # Each handler runs in a copy of the caller's context, in which it
+            # opens its own dependency scope, hence its own unit of work.
+            context = contextvars.copy_context()
+            future = self.event_executor.submit(
+                context.run, self._call_isolated, handler, event, name
+            )
+            futures.append((future, name))
+        # Wait in registration order so that failures are logged, and events
+        # queued, deterministically.
+        for future, name in futures:
+            try:
+                events, duration = future.result()
+            except Exception as error:  # pylint: disable=broad-except
+                self._event_failed(event, name, error)
                 continue
+            self._queue_events(event, events, duration)
 
-    def handle_command(self, command: messages.Command):
+    def _event_failed(self, event: messages.Event, name: str, error: Exception):
+        self.logger.exception(
+            "Exception handling event %s with handler %s",
+            event,
+            name,
+            exc_info=error,
+        )
+        errors = _ERRORS.get()
+        if errors is not None:
+            errors.append(error)
+
+    def _call_isolated(
+        self,
+        handler: Callable[..., Any],
+        event: messages.Event,
+        name: str,
+    ) -> tuple[list[Any], float]:
+        """Call ``handler`` in a new dependency scope and collect its events."""
+        with dependency_injection.scope(isolated=True):
+            self._call(handler, event, name)
+            start = time.perf_counter()
+            events = list(self.uow.collect_event())
+            return events, time.perf_counter() - start
+
+    def _call(self, handler: Callable[..., Any], message: Any, name: str) -> Any:
+        if not self.hooks:
+            return handler(message)
+        for hook in self.hooks:
+            hook.before_handler(message, name)
+        start = time.perf_counter()
+        try:
+            result = handler(message)
+        except Exception as error:
+            duration = time.perf_counter() - start
+            for hook in self.hooks:
+                hook.on_error(message, name, error, duration)
+            raise
+        duration = time.perf_counter() - start
+        for hook in self.hooks:
+            hook.after_handler(message, name, duration)
+        return result
+
+    def _collect(self, message: Any):
+        """Queue the events recorded while handling ``message``."""
+        if not self.hooks:
+            self.queue.extend(self.uow.collect_event())
+            return
+        start = time.perf_counter()
+        events = list(self.uow.collect_event())
+        self._queue_events(message, events, time.perf_counter() - start)
+
+    def _queue_events(self, message: Any, events: list[Any], duration: float):
+        for hook in self.hooks:
+            hook.on_events_collected(message, events, duration)
+        self.queue.extend(events)
+
+    def _after_message(
+        self, message: Any, start: float, stats: statements.StatementStats
+    ):
+        if stats.count and self._is_debug_enabled():
+            self.logger.debug(
+                "message %s executed %d statements in %.6fs",
+                message,
+                stats.count,
+                stats.duration,
+            )
+        if self.hooks:
+            duration = time.perf_counter() - start
+            for hook in self.hooks:
+                hook.after_message(message, duration)
+
+    def _is_debug_enabled(self) -> bool:
+        is_enabled_for = getattr(self.logger, "isEnabledFor", None)
+        return is_enabled_for is None or bool(is_enabled_for(logging.DEBUG))
+
+    def _resolve_dispatch(self, message: Any) -> Callable[[Any], None]:
+        if isinstance(message, messages.EVENT_TYPES):
+            dispatch = self.handle_event
+        elif isinstance(message, messages.COMMAND_TYPES):
+            dispatch = self.handle_command
+        else:
+            raise ValueError(f"{message} was not an Event or Command")
+        self._dispatch[type(message)] = dispatch
+        return dispatch
+
+    def _resolve_event_routes(self, event_type: type) -> list[Route]:
+        """Routes to the handlers of the closest registered class in the MRO."""
+        for cls in event_type.__mro__:
+            if cls in self.event_handlers:
+                handlers = self.event_handlers[cls]
+                break
+        else:
+            raise KeyError(event_type)
+        routes = [(handler, _handler_name(handler)) for handler in handlers]
+        self._event_routes[event_type] = routes
+        return routes
+
+    def _resolve_command_route(self, command_type: type) -> Route:
+        """Routes to the handler of the closest registered class in the MRO."""
+        for cls in command_type.__mro__:
+            if cls in self.command_handlers:
+                handler = self.command_handlers[cls]
+                break
+        else:
+            raise KeyError(command_type)
+        route = (handler, _handler_name(handler))
+        self._command_routes[command_type] = route
+        return route
+
+
+class AsyncMessageBus(MessageBus):
+    """AsyncMessageBus.
+
+    Awaits coroutine handlers on the running event loop and offloads sync
+    handlers to ``executor`` (the loop's default executor when None).
+    """
+
+    def __init__(
+        self,
+        uow: unit_of_work.BaseUnitOfWork,
+        command_handlers: dict[
+            type[messages.Command],
+            Callable[[messages.Command], Any],
+        ],
+        event_handlers: dict[
+            type[messages.Event],
+            list[Callable[[messages.Event], Any]],
+        ],
+        executor: concurrent.futures.Executor | None = None,
+        hooks: list[instrumentation.Hook] | None = None,
+    ):
+        super().__init__(uow, command_handlers, event_handlers, hooks=hooks)
+        self.executor = executor
+
+    async def handle(self, message: messages.Message, raise_errors: bool = False):
+        """handle.
+
+        Args:
+            message (messages.Message): message
+            raise_errors (bool): see ``MessageBus.handle``.
+        """
+        start = time.perf_counter()
+        root = message
+        stats = statements.StatementStats()
+        queue = collections.deque([message])
+        errors = [] if raise_errors else None
+        token = _QUEUE.set(queue)
+        errors_token = _ERRORS.set(errors)
+        try:
+            with dependency_injection.scope(), stats:
+                while queue:
+                    message = queue.popleft()
+                    dispatch = self._dispatch.get(type(message))
+                    if dispatch is None:
+                        dispatch = self._resolve_dispatch(message)
+                    await dispatch(message)
+        finally:
+            _ERRORS.reset(errors_token)
+            _QUEUE.reset(token)
+            self._statements.set(stats)
+            self._after_message(root, start, stats)
+        if errors:
+            raise errors[0]
+
+    async def handle_event(self, event: messages.Event):
+        """handle_event.
+
+        Args:
+            event (messages.Event): event
+        """
+        routes = self._event_routes.get(type(event))
+        if routes is None:
+            routes = self._resolve_event_routes(type(event))
+        debug = self._is_debug_enabled()
+        for handler, name in routes:
+            try:
+                if debug:
+                    self.logger.debug(
+                        "handling event %s with handler %s",
+                        event,
+                        name,
+                    )
+                await self._call_async(handler, event, name)
+                self._collect(event)
+            except Exception as error:  # pylint: disable=broad-except
+                self._event_failed(event, name, error)
+                continue
+
+    async def handle_command(self, command: messages.Command):
         """handle_command.
 
         Args:
             command (messages.Command): command
         """
-        handler = self.command_handlers[type(command)]
-        self.logger.debug(
-            "handling command %s with handler %s",
-            command,
-            handler.__name__,
-        )
+        route = self._command_routes.get(type(command))
+        if route is None:
+            route = self._resolve_command_route(type(command))
+        handler, name = route
+        if self._is_debug_enabled():
+            self.logger.debug(
+                "handling command %s with handler %s",
+                command,
+                name,
+            )
         try:
-            handler(command)
-            self.queue.extend(self.uow.collect_event())
+            await self._call_async(handler, command, name)
+            self._collect(command)
         except Exception:  # pylint: disable=broad-except
             self.logger.exception("Exception handling command %s", command)
             raise
+
+    async def _call_async(
+        self,
+        handler: Callable[..., Awaitable[Any]],
+        message: Any,
+        name: str,
+    ) -> Any:
+        if not self.hooks:
+            return await handler(message)
+        for hook in self.hooks:
+            hook.before_handler(message, name)
+        start = time.perf_counter()
+        try:
+            result = await handler(message)
+        except Exception as error:
+            duration = time.perf_counter() - start
+            for hook in self.hooks:
+                hook.on_error(message, name, error, duration)
+            raise
+        duration = time.perf_counter() - start
+        for hook in self.hooks:
+            hook.after_handler(message, name, duration)
+        return result
+
+    def _resolve_event_routes(self, event_type: type) -> list[Route]:
+        routes = [
+            (self._as_coroutine(handler), name)
+            for handler, name in super()._resolve_event_routes(event_type)
+        ]
+        self._event_routes[event_type] = routes
+        return routes
+
+    def _resolve_command_route(self, command_type: type) -> Route:
+        handler, name = super()._resolve_command_route(command_type)
+        route = (self._as_coroutine(handler), name)
+        self._command_routes[command_type] = route
+        return route
+
+    def _as_coroutine(
+        self,
+        handler: Callable[..., Any],
+    ) -> Callable[..., Awaitable[Any]]:
+        if inspect.iscoroutinefunction(inspect.unwrap(handler)):
+            return handler
+
+        async def run_in_executor(message: messages.Message) -> Any:
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self.executor, functools.partial(context.run, handler, message)
+            )
+
+        return run_in_executor
+
+
+class _HandlerList(list):
+    """A handler list that calls ``on_change`` after every change."""
+
+    def __init__(self, on_change: Callable[[], None], handlers=()):
+        super().__init__(handlers)
+        self.on_change = on_change
+
+
+class _HandlerTable(dict):
+    """A handler table that calls ``on_change`` after every change, its handler
+    lists included when ``lists`` is set."""
+
+    def __init__(self, on_change: Callable[[], None], handlers=(), lists=False):
+        self.on_change = on_change
+        self.lists = lists
+        super().__init__()
+        for key, value in dict(handlers).items():
+            dict.__setitem__(self, key, self._wrap(value))
+
+    def _wrap(self, value: Any) -> Any:
+        if self.lists and not isinstance(value, _HandlerList):
+            return _HandlerList(self.on_change, value)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, self._wrap(value))
+        self.on_change()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            dict.__setitem__(self, key, self._wrap(value))
+        self.on_change()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+
+def _notify_after(cls: type, base: type, names: tuple[str, ...]):
+    for name in names:
+        method = getattr(base, name)
+
+        def mutator(self, *args, _method=method, **kwargs):
+            result = _method(self, *args, **kwargs)
+            self.on_change()
+            return result
+
+        mutator.__name__ = name
+        setattr(cls, name, mutator)
+
+
+_notify_after(
+    _HandlerList,
+    list,
+    (
+        "__setitem__",
+        "__delitem__",
+        "__iadd__",
+        "__imul__",
+        "append",
+        "extend",
+        "insert",
+        "remove",
+        "pop",
+        "clear",
+        "sort",
+        "reverse",
+    ),
+)
+_notify_after(_HandlerTable, dict, ("__delitem__", "pop", "popitem", "clear"))
+
+
+def _handler_name(handler: Callable[..., Any]) -> str:
+    return getattr(handler, "__name__", repr(handler))
@@ -1,3 +1,7 @@
+import dataclasses
+import itertools
+import os
+import time
 import uuid
 from datetime import UTC, datetime
 
@@ -17,3 +21,59 @@ class Command(Message):
 
 class Event(Message):
     """Event."""
+
+
+def _reset_id_source():
+    global _ID_PREFIX, _ID_COUNTER  # pylint: disable=global-statement
+    _ID_PREFIX = uuid.uuid4().hex
+    _ID_COUNTER = itertools.count()
+
+
+_ID_PREFIX: str
+_ID_COUNTER: itertools.count
+_reset_id_source()
+# A forked child must not hand out the ids of its parent.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_id_source)
+
+
+@dataclasses.dataclass(slots=True)
+class LightMessage:
+    """LightMessage.
+
+    A slotted alternative to Message for high volume internal messages. Subclasses
+    are declared as ``@dataclasses.dataclass(slots=True)``. The id is only built on
+    first access, from a per-process prefix and a counter, and the creation time is
+    kept as an integer until it is read.
+    """
+
+    _message_id: str | None = dataclasses.field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _created_ns: int = dataclasses.field(
+        default_factory=time.time_ns, init=False, repr=False, compare=False
+    )
+
+    @property
+    def _id(self) -> str:
+        if self._message_id is None:
+            self._message_id = f"{_ID_PREFIX}-{next(_ID_COUNTER):x}"
+        return self._message_id
+
+    @property
+    def _created_time(self) -> datetime:
+        return datetime.fromtimestamp(self._created_ns / 1e9, UTC)
+
+
+@dataclasses.dataclass(slots=True)
+class LightCommand(LightMessage):
+    """LightCommand."""
+
+
+@dataclasses.dataclass(slots=True)
+class LightEvent(LightMessage):
+    """LightEvent."""
+
+
+COMMAND_TYPES = (Command, LightCommand)
+EVENT_TYPES = (Event, LightEvent)
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import dataclasses
-import json
 import uuid
+import weakref
 from datetime import datetime
 from datetime import date
 from typing import Any, override
 
 import pydantic
+import pydantic_core
 
 from core import messages
 
@@ -20,6 +21,65 @@ def is_serializable(field: str):
     return True
 
 
+class EventList(list):
+    """EventList.
+
+    The events list of a model. Once the model is in an identity map, recording
+    an event marks the model as dirty there, so collecting events only visits
+    the models that have new ones. The identity map is only weakly referenced,
+    so a model outliving its unit of work does not keep the map alive.
+    """
+
+    __slots__ = ("owner", "_journal")
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.owner = None
+        self._journal = None
+
+    @property
+    def journal(self) -> Any:
+        """The identity map notified of new events, None once it is gone."""
+        return None if self._journal is None else self._journal()
+
+    def bind(self, owner: BaseModel, journal: Any):
+        """bind.
+
+        Args:
+            owner (BaseModel): the model the events belong to.
+            journal (Any): notified through ``mark_dirty(owner)`` on new events.
+        """
+        self.owner = owner
+        self._journal = None if journal is None else weakref.ref(journal)
+
+    def append(self, event: messages.Event):
+        super().append(event)
+        self._mark_dirty()
+
+    def extend(self, events):
+        super().extend(events)
+        if self:
+            self._mark_dirty()
+
+    def insert(self, index, event: messages.Event):
+        super().insert(index, event)
+        self._mark_dirty()
+
+    def __iadd__(self, events):
+        self.extend(events)
+        return self
+
+    def __reduce__(self):
+        # Pickled unbound: the identity map is local to the process.
+        return (EventList, (), None, iter(self))
+
+    def _mark_dirty(self):
+        if self._journal is not None:
+            journal = self._journal()
+            if journal is not None:
+                journal.mark_dirty(self.owner)
+
+
 @dataclasses.dataclass
 class BaseModel:
     """BaseModel."""
@@ -27,7 +87,7 @@ class BaseModel:
     id: str = dataclasses.field(default_factory=lambda: str(uuid.uuid4()))
     created_time: datetime = dataclasses.field(default_factory=datetime.now)
     updated_time: datetime = dataclasses.field(default_factory=datetime.now)
-    events: list[messages.Event] = dataclasses.field(default_factory=list)
+    events: list[messages.Event] = dataclasses.field(default_factory=EventList)
     message_id: str | None = None
     ignore_keys: set[str] = dataclasses.field(default_factory=lambda: {"password"})
 
@@ -57,12 +117,24 @@ class BaseModel:
     @property
     def json(self):
         """json."""
-        data = {
-            key: val
-            for key, val in self.__dict__.items()
-            if key not in self.ignore_keys and is_serializable(key)
-        }
-        return BaseModel.dict_json(data)
+        attributes = self.__dict__
+        layout = (type(self), tuple(attributes))
+        keys = _SERIALIZABLE_KEYS.get(layout)
+        if keys is None:
+            keys = tuple(key for key in layout[1] if is_serializable(key))
+            _SERIALIZABLE_KEYS[layout] = keys
+
+        ignore_keys = self.ignore_keys
+        data = {}
+        for key in keys:
+            if key in ignore_keys:
+                continue
+            value = attributes[key]
+            converter = _CONVERTERS.get(type(value), _UNRESOLVED)
+            if converter is _UNRESOLVED:
+                converter = _resolve_converter(type(value))
+            data[key] = value if converter is None else converter(value)
+        return data
 
     @override
     def __repr__(self) -> str:
@@ -71,7 +143,7 @@ class BaseModel:
 
     def load_from_database(self):
         """load_from_database."""
-        self.events = []
+        self.events = EventList()
         self._immutable_atributes = set()
         self.ignore_keys = set()
 
@@ -85,7 +157,7 @@ class BaseModel:
         if isinstance(l[0], BaseModel):
             return [item.json for item in l]
         if isinstance(l[0], pydantic.BaseModel):
-            return [json.loads(item.model_dump_json()) for item in l]
+            return [_dump_pydantic(item) for item in l]
         if isinstance(l[0], dict):
             return [BaseModel.dict_json(item) for item in l]
         return l
@@ -106,3 +178,116 @@ class BaseModel:
             if isinstance(value, dict):
                 d[attr] = BaseModel.dict_json(value)
         return d
+
+
+def _get_events(model: BaseModel) -> EventList:
+    try:
+        return model.__dict__["events"]
+    except KeyError:
+        raise AttributeError("events") from None
+
+
+def _set_events(model: BaseModel, events: list[messages.Event]):
+    previous = model.__dict__.get("events")
+    if type(events) is not EventList:
+        events = EventList(events)
+    if previous is not None and previous is not events:
+        journal = previous.journal
+        if journal is not None:
+            events.bind(model, journal)
+            if events:
+                journal.mark_dirty(model)
+    model.__dict__["events"] = events
+
+
+# Set once the dataclass is built, which dropped the class attribute of the
+# field, so that assigning a plain list keeps the model tracked by its identity
+# map. The list is still kept in the instance __dict__ under "events".
+BaseModel.events = property(
+    _get_events,
+    _set_events,
+    doc="The recorded events, an EventList whatever list is assigned.",
+)
+
+# Serializable attribute names per (model class, attribute layout). Instances of
+# one class nearly always share a layout, so the filter runs once per class.
+_SERIALIZABLE_KEYS: dict[tuple[type, tuple[str, ...]], tuple[str, ...]] = {}
+
+_UNRESOLVED = object()
+
+
+def _convert_datetime(value: datetime) -> str:
+    return value.strftime(BaseModel._datetime_format)
+
+
+def _convert_date(value: date) -> str:
+    return value.strftime(BaseModel._date_format)
+
+
+def _convert_model(value: BaseModel) -> dict[str, Any]:
+    return value.json
+
+
+def _convert_value(value: Any) -> Any:
+    converter = _CONVERTERS.get(type(value), _UNRESOLVED)
+    if converter is _UNRESOLVED:
+        converter = _resolve_converter(type(value))
+    return value if converter is None else converter(value)
+
+
+def _convert_dict(value: dict[str, Any]) -> dict[str, Any]:
+    return {key: _convert_value(item) for key, item in value.items()}
+
+
+def _dump_pydantic(value: pydantic.BaseModel) -> Any:
+    # What json.loads(value.model_dump_json()) returns, non-finite floats turned
+    # into None included, which model_dump(mode="json") does not do.
+    return pydantic_core.from_json(value.__pydantic_serializer__.to_json(value))
+
+
+def _convert_list(value: list[Any]) -> list[Any]:
+    if len(value) == 0:
+        return []
+    first = value[0]
+    if isinstance(first, BaseModel):
+        return [item.json for item in value]
+    if isinstance(first, pydantic.BaseModel):
+        return [_dump_pydantic(item) for item in value]
+    if isinstance(first, dict):
+        return [_convert_dict(item) for item in value]
+    return value
+
+
+# Converter per value type, None for values that are serialized as is. Mirrors
+# the isinstance chain of BaseModel.dict_json.
+_CONVERTERS: dict[type, Any] = {
+    str: None,
+    int: None,
+    float: None,
+    bool: None,
+    type(None): None,
+    datetime: _convert_datetime,
+    date: _convert_date,
+    set: list,
+    list: _convert_list,
+    dict: _convert_dict,
+}
+
+
+def _resolve_converter(value_type: type) -> Any:
+    if issubclass(value_type, datetime):
+        converter = _convert_datetime
+    elif issubclass(value_type, date):
+        converter = _convert_date
+    elif issubclass(value_type, set):
+        converter = list
+    elif issubclass(value_type, list):
+        converter = _convert_list
+    elif issubclass(value_type, BaseModel):
+        converter = _convert_model
+    elif issubclass(value_type, dict):
+        converter = _convert_dict
+    else:
+        converter = None
+    _CONVERTERS[value_type] = converter
+    return converter
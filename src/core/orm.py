@@ -27,6 +27,8 @@ def map_once(mapper_function: Callable[..., None]):
 
 
 class PyDict(types.TypeDecorator):
+    # The stored text stays on the stdlib encoder whatever encoders picks: ASCII
+    # only, and the same bytes on every deployment.
     impl = Text
 
     def process_bind_param(self, value: dict[Any, Any], dialect) -> str | None:
@@ -0,0 +1,327 @@
+"""Transactional outbox.
+
+Events recorded by the models of a unit of work with an Outbox are inserted
+into the outbox table by ``commit``, in the transaction of the changes that
+recorded them, instead of being handled in process. OutboxRelay workers read
+the table in batches and hand the events to a MessageBus, so an event is
+dispatched at least once even when the process dies right after the commit.
+"""
+
+from __future__ import annotations
+
+import importlib
+import multiprocessing
+import threading
+import time
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+import pydantic
+import sqlalchemy
+import utils
+
+from core import encoders, instrumentation, messages
+from core.adapters import sqlalchemy_adapter
+
+if TYPE_CHECKING:
+    from core.message_bus import MessageBus
+
+__all__ = [
+    "Outbox",
+    "OutboxRelay",
+    "run_workers",
+]
+
+logger = utils.get_logger()
+
+# Dialects that lock the selected batch and let concurrent relays skip it.
+SKIP_LOCKED_DIALECTS = {"postgresql", "mysql", "mariadb", "oracle"}
+
+_TYPES: dict[str, type] = {}
+
+
+def _now() -> datetime:
+    """Naive UTC, the way DateTime columns without a time zone store it."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def _type_name(message_type: type) -> str:
+    return f"{message_type.__module__}:{message_type.__qualname__}"
+
+
+def _resolve(name: str) -> type:
+    message_type = _TYPES.get(name)
+    if message_type is None:
+        module, _, qualname = name.partition(":")
+        message_type = importlib.import_module(module)
+        for attr in qualname.split("."):
+            message_type = getattr(message_type, attr)
+        _TYPES[name] = message_type
+    return message_type
+
+
+class Outbox:
+    """Outbox.
+
+    Attributes:
+        table (sqlalchemy.Table): The outbox table, in ``metadata``; create it
+            with ``metadata.create_all`` or the migrations of that metadata.
+        types (tuple[type, ...] | None): Event types written to the outbox. The
+            others are still collected by the MessageBus in process. Defaults to
+            None (every event).
+    """
+
+    def __init__(
+        self,
+        metadata: sqlalchemy.MetaData | None = None,
+        table_name: str = "outbox",
+        types: Iterable[type] | None = None,
+    ):
+        metadata = sqlalchemy.MetaData() if metadata is None else metadata
+        self.table = sqlalchemy.Table(
+            table_name,
+            metadata,
+            sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("message_id", sqlalchemy.String(200), nullable=False),
+            sqlalchemy.Column("type", sqlalchemy.String(400), nullable=False),
+            sqlalchemy.Column("payload", sqlalchemy.Text, nullable=False),
+            sqlalchemy.Column("created_time", sqlalchemy.DateTime, nullable=False),
+            sqlalchemy.Column("processed_time", sqlalchemy.DateTime, index=True),
+            sqlalchemy.Column(
+                "attempts", sqlalchemy.Integer, nullable=False, default=0
+            ),
+            sqlalchemy.Column("error", sqlalchemy.Text),
+        )
+        self.types = None if types is None else tuple(types)
+
+    def accepts(self, event: Any) -> bool:
+        """Whether ``event`` goes through the outbox."""
+        return self.types is None or isinstance(event, self.types)
+
+    def rows(self, events: list[Any]) -> list[dict[str, Any]]:
+        """rows.
+
+        Args:
+            events (list[Any]): events
+
+        Returns:
+            list[dict[str, Any]]: the outbox rows of the events.
+        """
+        now = _now()
+        return [
+            {
+                "message_id": event._id,
+                "type": _type_name(type(event)),
+                "payload": encoders.dumps(event).decode(),
+                "created_time": now,
+                "attempts": 0,
+            }
+            for event in events
+        ]
+
+    def write(self, session: sqlalchemy_adapter.Session, events: list[Any]):
+        """write.
+
+        Args:
+            session (sqlalchemy_adapter.Session): the session of the unit of work,
+                whose transaction the rows are inserted in.
+            events (list[Any]): events
+        """
+        session.core_session.execute(sqlalchemy.insert(self.table), self.rows(events))
+
+    async def write_async(self, session: Any, events: list[Any]):
+        """write_async.
+
+        Args:
+            session (Any): a sqlalchemy_async_adapter.AsyncSession.
+            events (list[Any]): events
+        """
+        await session.core_session.execute(
+            sqlalchemy.insert(self.table), self.rows(events)
+        )
+
+    def decode(self, row: Any) -> Any:
+        """decode.
+
+        Args:
+            row (Any): an outbox row.
+
+        Returns:
+            Any: the event, with the id it had when it was written.
+        """
+        message_type = _resolve(row.type)
+        if issubclass(message_type, pydantic.BaseModel):
+            event = message_type.model_validate_json(row.payload)
+            event._id = row.message_id
+        else:
+            event = message_type(**encoders.loads(row.payload))
+            if isinstance(event, messages.LightMessage):
+                event._message_id = row.message_id
+        return event
+
+
+class OutboxRelay:
+    """OutboxRelay.
+
+    Dispatches the pending outbox rows through a MessageBus, oldest first, a
+    batch per transaction. Where the database supports it the batch is selected
+    ``FOR UPDATE SKIP LOCKED``, so relays in other processes take the next rows
+    instead of waiting. Elsewhere, such as SQLite, concurrent relays may select
+    the same rows: run one, or keep the handlers idempotent, which at-least-once
+    delivery asks for anyway.
+
+    A row is marked processed once every handler of its event succeeded: it is
+    handled with ``raise_errors=True``. When a handler raises, or the row cannot
+    be decoded, its attempts are counted and the error kept; rows that failed
+    ``max_attempts`` times are no longer selected.
+
+    Attributes:
+        batch_size (int): Rows per transaction. Defaults to 100.
+        poll_interval (float): Seconds ``run`` waits after a partial batch.
+            Defaults to 1.
+        max_attempts (int): Defaults to 5.
+        metrics (instrumentation.RelayMetrics): Throughput and lag.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        bus: MessageBus,
+        config: dict[str, Any] | None = None,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        max_attempts: int = 5,
+        metrics: instrumentation.RelayMetrics | None = None,
+    ):
+        self.outbox = outbox
+        self.bus = bus
+        config = config or utils.get_config()["database"]
+        self.engine = sqlalchemy_adapter.ComponentFactory(config).engine
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.metrics = metrics or instrumentation.RelayMetrics()
+        self.skip_locked = self.engine.dialect.name in SKIP_LOCKED_DIALECTS
+
+    def run_once(self) -> int:
+        """run_once.
+
+        Returns:
+            int: the number of rows handled, processed or failed.
+        """
+        start = time.perf_counter()
+        table = self.outbox.table
+        query = (
+            sqlalchemy.select(table)
+            .where(
+                table.c.processed_time.is_(None),
+                table.c.attempts < self.max_attempts,
+            )
+            .order_by(table.c.id)
+            .limit(self.batch_size)
+        )
+        if self.skip_locked:
+            query = query.with_for_update(skip_locked=True)
+
+        with self.engine.begin() as connection:
+            rows = connection.execute(query).all()
+            if not rows:
+                return 0
+            processed, failed, lags = [], [], []
+            for row in rows:
+                try:
+                    self.bus.handle(self.outbox.decode(row), raise_errors=True)
+                except Exception as error:  # pylint: disable=broad-except
+                    logger.exception("Exception relaying outbox row %s", row.id)
+                    failed.append({"row_id": row.id, "row_error": repr(error)})
+                    continue
+                now = _now()
+                processed.append(row.id)
+                lags.append((now - row.created_time).total_seconds())
+            if processed:
+                connection.execute(
+                    sqlalchemy.update(table)
+                    .where(table.c.id.in_(processed))
+                    .values(processed_time=_now(), attempts=table.c.attempts + 1)
+                )
+            if failed:
+                connection.execute(
+                    sqlalchemy.update(table)
+                    .where(table.c.id == sqlalchemy.bindparam("row_id"))
+                    .values(
+                        attempts=table.c.attempts + 1,
+                        error=sqlalchemy.bindparam("row_error"),
+                    ),
+                    failed,
+                )
+        self.metrics.observe_batch(lags, len(failed), time.perf_counter() - start)
+        return len(rows)
+
+    def run(self, stop: threading.Event | None = None):
+        """Relay batches until ``stop`` is set, waiting after partial ones."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            if self.run_once() < self.batch_size:
+                stop.wait(self.poll_interval)
+
+    def pending(self) -> int:
+        """The number of rows left to relay."""
+        table = self.outbox.table
+        query = (
+            sqlalchemy.select(sqlalchemy.func.count())
+            .select_from(table)
+            .where(
+                table.c.processed_time.is_(None),
+                table.c.attempts < self.max_attempts,
+            )
+        )
+        with self.engine.connect() as connection:
+            return connection.execute(query).scalar_one()
+
+
+def _work(create_relay: Callable[[int], OutboxRelay], index: int, stop: Any):
+    # Connections pooled by the parent must not be shared with the child.
+    sqlalchemy_adapter.dispose_all(close=False)
+    create_relay(index).run(stop)
+
+
+def run_workers(
+    create_relay: Callable[[int], OutboxRelay],
+    processes: int,
+    stop: Any = None,
+    start_method: str = "spawn",
+):
+    """run_workers.
+
+    Args:
+        create_relay (Callable[[int], OutboxRelay]): builds the relay of the
+            worker with the given index, in the worker process; a module level
+            function, so that it can be sent to the workers.
+        processes (int): processes
+        stop (Any): an Event of ``multiprocessing.get_context(start_method)``
+            the workers stop on. Defaults to a new one; the workers run until
+            interrupted then.
+        start_method (str): Defaults to "spawn": a fork would copy the locks
+            held by the parent's other threads, such as bus executors or a
+            metrics server. Spawned workers start from a fresh interpreter, so
+            ``create_relay`` sets up whatever its relay needs, mappers included.
+    """
+    context = multiprocessing.get_context(start_method)
+    stop = stop or context.Event()
+    workers = [
+        context.Process(
+            target=_work,
+            args=(create_relay, index, stop),
+            name=f"outbox-relay-{index}",
+        )
+        for index in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for worker in workers:
+            worker.join()
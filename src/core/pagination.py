@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Iterable
+
+import sqlalchemy
+
+__all__ = [
+    "Page",
+    "InvalidCursorException",
+]
+
+NEXT = "next"
+PREV = "prev"
+TIEBREAKER = "id"
+
+SORT_DIRECTION = {
+    "+": sqlalchemy.asc,
+    "-": sqlalchemy.desc,
+}
+
+
+class InvalidCursorException(Exception):
+    """InvalidCursorException."""
+
+
+class Page(list):
+    """Page.
+
+    A list of models together with the opaque cursors of the neighbouring pages.
+
+    Attributes:
+        next_cursor (str | None): Cursor of the following page, None on the last page.
+        prev_cursor (str | None): Cursor of the preceding page, None on the first page.
+    """
+
+    def __init__(
+        self,
+        models: Iterable[Any] = (),
+        next_cursor: str | None = None,
+        prev_cursor: str | None = None,
+    ):
+        super().__init__(models)
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+
+def parse_orders(
+    orders: str | None,
+    tiebreaker: bool = True,
+) -> list[tuple[str, str]]:
+    """parse_orders.
+
+    Args:
+        orders (str | None): orders in the "+created_time,-id" syntax.
+        tiebreaker (bool): end the keys with the ``id`` tiebreaker, so that every
+            key is unique, as keyset pagination requires. Defaults to True.
+
+    Returns:
+        list[tuple[str, str]]: (attribute, direction) pairs.
+    """
+    keys = [(order[1:], order[0]) for order in orders.split(",")] if orders else []
+    if tiebreaker and TIEBREAKER not in (attr for attr, _ in keys):
+        direction = keys[-1][1] if keys else "+"
+        keys.append((TIEBREAKER, direction))
+    return keys
+
+
+def order_by(model_cls: type, keys: list[tuple[str, str]]) -> list[Any]:
+    """order_by.
+
+    Args:
+        model_cls (type): model_cls
+        keys (list[tuple[str, str]]): (attribute, "+" or "-") pairs.
+
+    Returns:
+        list[Any]: the ORDER BY clauses of the keys.
+    """
+    return [SORT_DIRECTION[sign](getattr(model_cls, attr)) for attr, sign in keys]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$datetime" in value:
+            return datetime.fromisoformat(value["$datetime"])
+        if "$date" in value:
+            return date.fromisoformat(value["$date"])
+    return value
+
+
+def encode_cursor(
+    model: Any,
+    keys: list[tuple[str, str]],
+    direction: str,
+) -> str:
+    """encode_cursor.
+
+    Args:
+        model (Any): the boundary model of the current page.
+        keys (list[tuple[str, str]]): keys
+        direction (str): ``next`` or ``prev``.
+
+    Returns:
+        str: an opaque, url-safe cursor.
+    """
+    payload = {
+        "direction": direction,
+        "keys": [f"{sign}{attr}" for attr, sign in keys],
+        "values": [_encode_value(getattr(model, attr)) for attr, _ in keys],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(
+    cursor: str,
+    keys: list[tuple[str, str]],
+) -> tuple[str, list[Any]]:
+    """decode_cursor.
+
+    Args:
+        cursor (str): cursor
+        keys (list[tuple[str, str]]): keys the cursor must have been built with.
+
+    Returns:
+        tuple[str, list[Any]]: the direction and the boundary values.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        direction = payload["direction"]
+        cursor_keys = payload["keys"]
+        values = [_decode_value(value) for value in payload["values"]]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorException(f"Malformed cursor: {cursor}") from e
+
+    if direction not in (NEXT, PREV):
+        raise InvalidCursorException(f"Invalid cursor direction: {direction}")
+    if cursor_keys != [f"{sign}{attr}" for attr, sign in keys]:
+        raise InvalidCursorException("Cursor was issued for different orders")
+    if len(values) != len(keys):
+        raise InvalidCursorException(
+            f"Cursor has {len(values)} values for {len(keys)} orders"
+        )
+    return direction, values
+
+
+def seek_condition(
+    model_cls: type,
+    keys: list[tuple[str, str]],
+    values: list[Any],
+    backwards: bool = False,
+) -> sqlalchemy.ColumnElement[bool]:
+    """seek_condition.
+
+    Args:
+        model_cls (type): model_cls
+        keys (list[tuple[str, str]]): keys
+        values (list[Any]): boundary values, one per key.
+        backwards (bool): seek towards the previous page.
+
+    NULL sorts before any other value, as in ``SortKey`` and as SQLite and MySQL
+    order it, so rows with NULL keys are kept on their pages. Databases sorting
+    NULL last in ascending order, such as PostgreSQL, need keys that cannot be
+    NULL.
+
+    Returns:
+        sqlalchemy.ColumnElement[bool]: ``(col1, col2) > (v1, v2)`` when every key
+            is ascending and no value is None, the equivalent expanded form with
+            the NULL cases spelled out otherwise.
+    """
+    columns = [getattr(model_cls, attr) for attr, _ in keys]
+    ascending = [(sign == "+") != backwards for _, sign in keys]
+
+    if all(ascending) and all(value is not None for value in values):
+        return sqlalchemy.tuple_(*columns) > sqlalchemy.tuple_(*values)
+
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        seek = _beyond(column, value, ascending[i])
+        if seek is not None:
+            equals = [_equals(columns[j], values[j]) for j in range(i)]
+            clauses.append(sqlalchemy.and_(*equals, seek))
+    return sqlalchemy.or_(*clauses) if clauses else sqlalchemy.false()
+
+
+def _nullable(column: Any) -> bool:
+    return getattr(getattr(column, "expression", column), "nullable", True)
+
+
+def _equals(column: Any, value: Any) -> sqlalchemy.ColumnElement[bool]:
+    return column.is_(None) if value is None else column == value
+
+
+def _beyond(
+    column: Any,
+    value: Any,
+    ascending: bool,
+) -> sqlalchemy.ColumnElement[bool] | None:
+    """The rows past ``value`` on ``column``, None when none can be."""
+    if ascending:
+        return column.is_not(None) if value is None else column > value
+    if value is None:
+        return None
+    if _nullable(column):
+        return sqlalchemy.or_(column < value, column.is_(None))
+    return column < value
+
+
+class SortKey:
+    """Orders models by several attributes, each ascending or descending, in Python.
+
+    None sorts before any other value, as NULL does in SQLite and MySQL, and is
+    equal to None.
+    """
+
+    __slots__ = ("values", "ascending")
+
+    def __init__(self, values: tuple[Any, ...], ascending: tuple[bool, ...]):
+        self.values = values
+        self.ascending = ascending
+
+    def __lt__(self, other: SortKey) -> bool:
+        for value, other_value, ascending in zip(
+            self.values, other.values, self.ascending
+        ):
+            if value == other_value:
+                continue
+            if value is None:
+                return ascending
+            if other_value is None:
+                return not ascending
+            return value < other_value if ascending else value > other_value
+        return False
+
+
+def sort_key(keys: list[tuple[str, str]]) -> Callable[[Any], SortKey]:
+    """sort_key.
+
+    Args:
+        keys (list[tuple[str, str]]): (attribute, "+" or "-") pairs.
+
+    Returns:
+        Callable[[Any], SortKey]: a ``key`` function for sorted and heapq.merge.
+    """
+    ascending = tuple(sign == "+" for _, sign in keys)
+    return lambda model: SortKey(
+        tuple(getattr(model, attr) for attr, _ in keys), ascending
+    )
+
+
+def is_after(
+    model: Any,
+    keys: list[tuple[str, str]],
+    values: list[Any],
+    backwards: bool = False,
+) -> bool:
+    """The in-memory counterpart of seek_condition.
+
+    Args:
+        model (Any): model
+        keys (list[tuple[str, str]]): keys
+        values (list[Any]): boundary values, one per key.
+        backwards (bool): seek towards the previous page.
+
+    Returns:
+        bool: whether the model lies beyond the boundary.
+    """
+    ascending = tuple((sign == "+") != backwards for _, sign in keys)
+    current = SortKey(tuple(getattr(model, attr) for attr, _ in keys), ascending)
+    return SortKey(tuple(values), ascending) < current
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import collections
+import contextvars
+import heapq
+import itertools
+import re
+import threading
+from typing import Any
+
+import utils
+
+__all__ = [
+    "StatementStats",
+    "NPlusOneDetector",
+    "NPlusOneDetected",
+    "get_detector",
+    "set_detector",
+]
+
+logger = utils.get_logger()
+
+# The statistics every statement executed in the current context is added to,
+# innermost last: a unit of work inside a MessageBus.handle call feeds both.
+_ACTIVE: contextvars.ContextVar[tuple[StatementStats, ...]] = contextvars.ContextVar(
+    "active_statement_stats", default=()
+)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![\w:]):\w+|\?")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """fingerprint.
+
+    Args:
+        statement (str): SQL as sent to the driver.
+
+    Returns:
+        str: the statement with literals and bound parameters replaced by ``?``
+            and parameter lists collapsed, equal for structurally identical
+            statements.
+    """
+    statement = _STRING.sub("?", statement)
+    statement = _PARAMETER.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _LIST.sub("(?)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+class StatementStats:
+    """StatementStats.
+
+    Statements executed through the instrumented engines while the stats are
+    entered, in this context and in the contexts copied from it.
+
+    Attributes:
+        count (int): Statements executed.
+        duration (float): Seconds spent executing them.
+        fingerprints (collections.Counter[str]): Executions per fingerprint.
+        keep (int): Number of slowest statements kept. Defaults to 5.
+    """
+
+    def __init__(self, keep: int = 5):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: collections.Counter[str] = collections.Counter()
+        self.keep = keep
+        self._slowest: list[tuple[float, int, str]] = []
+        self._order = itertools.count()
+        self._tokens: list[contextvars.Token] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> StatementStats:
+        self._tokens.append(_ACTIVE.set((*_ACTIVE.get(), self)))
+        return self
+
+    def __exit__(self, *_):
+        if not self._tokens:
+            return
+        token = self._tokens.pop()
+        try:
+            _ACTIVE.reset(token)
+        except ValueError:
+            # Entered in another context, e.g. by a unit of work entered in one
+            # thread or task and exited in another: the token cannot be reset
+            # here. These stats are removed from the current context, and are
+            # skipped by the one they were entered in once no longer entered.
+            _ACTIVE.set(tuple(stats for stats in _ACTIVE.get() if stats is not self))
+
+    def add(self, statement: str, duration: float):
+        """add.
+
+        Args:
+            statement (str): statement
+            duration (float): seconds
+        """
+        key = fingerprint(statement)
+        entry = (duration, next(self._order), statement)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.fingerprints[key] += 1
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            elif duration > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self) -> list[tuple[str, float]]:
+        """(statement, seconds) pairs, slowest first."""
+        with self._lock:
+            entries = sorted(self._slowest, reverse=True)
+        return [(statement, duration) for duration, _, statement in entries]
+
+    def summary(self) -> dict[str, Any]:
+        """summary.
+
+        Returns:
+            dict[str, Any]: count, duration and the slowest statements.
+        """
+        return {
+            "count": self.count,
+            "duration": self.duration,
+            "slowest": self.slowest,
+        }
+
+
+def tracking() -> bool:
+    """Whether any StatementStats is entered in the current context."""
+    return any(stats._tokens for stats in _ACTIVE.get())
+
+
+def record(statement: str, duration: float):
+    """Add an executed statement to every StatementStats of the current context."""
+    for stats in _ACTIVE.get():
+        if stats._tokens:
+            stats.add(statement, duration)
+
+
+class NPlusOneDetected(Exception):
+    """NPlusOneDetected."""
+
+
+class NPlusOneDetector:
+    """NPlusOneDetector.
+
+    Flags statements a unit of work repeated with only their parameters changed,
+    typically ``repo.get`` in a loop.
+
+    Attributes:
+        threshold (int): Executions of one fingerprint that count as repeated.
+            Defaults to 5.
+        strict (bool): Raise NPlusOneDetected instead of logging a warning, for
+            tests. Defaults to False.
+        prefixes (tuple[str, ...]): Statement kinds checked. Defaults to SELECT.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        strict: bool = False,
+        prefixes: tuple[str, ...] = ("SELECT",),
+    ):
+        self.threshold = threshold
+        self.strict = strict
+        self.prefixes = tuple(prefix.upper() for prefix in prefixes)
+
+    def find(self, stats: StatementStats) -> list[tuple[str, int]]:
+        """find.
+
+        Args:
+            stats (StatementStats): stats
+
+        Returns:
+            list[tuple[str, int]]: the repeated fingerprints and their counts.
+        """
+        return [
+            (key, count)
+            for key, count in stats.fingerprints.most_common()
+            if count >= self.threshold and key.upper().startswith(self.prefixes)
+        ]
+
+    def check(self, stats: StatementStats, owner: Any = None):
+        """check.
+
+        Args:
+            stats (StatementStats): stats
+            owner (Any): what executed the statements, for the report.
+
+        Raises:
+            NPlusOneDetected: in strict mode, when a statement was repeated.
+        """
+        repeated = self.find(stats)
+        if not repeated:
+            return
+        report = "; ".join(f"{count}x {key}" for key, count in repeated)
+        if self.strict:
+            raise NPlusOneDetected(f"Repeated statements in {owner}: {report}")
+        logger.warning("Repeated statements in %s: %s", owner, report)
+
+
+# Off by default, since legitimate repeated reads, such as the chunks of
+# get_many, would be reported too; enable it with set_detector, e.g. in tests.
+DETECTOR: NPlusOneDetector | None = None
+
+
+def get_detector() -> NPlusOneDetector | None:
+    """The detector units of work check on exit, None when disabled."""
+    return DETECTOR
+
+
+def set_detector(detector: NPlusOneDetector | None):
+    """Replace the detector units of work check on exit; None disables it."""
+    global DETECTOR
+    DETECTOR = detector
@@ -1,23 +1,127 @@
-from typing import Any
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
 
 import utils
 
-from core import abstract, adapters
+from core import abstract, adapters, caching, statements
+
+if TYPE_CHECKING:
+    from core.outbox import Outbox
 
 
 class UnsupportedDatabaseFrameworkException(Exception):
     """UnsupportedDatabaseFrameworkException."""
 
 
-class UnitOfWork:
-    """UnitOfWork."""
+class BaseUnitOfWork:
+    """BaseUnitOfWork.
+
+    Event collection and statement tracking shared by the sync and async units
+    of work.
+
+    A ``with`` block entered inside another one reuses the outer session and
+    runs in a savepoint: ``commit`` releases the savepoint into the enclosing
+    transaction, ``rollback``, an exception or leaving the block without a
+    commit undo the inner work only, in the database and in the identity map of
+    the repository: the models added and the events recorded in the block are
+    dropped. Work done in a nested block after its commit or rollback belongs to
+    the enclosing block.
+
+    Attributes:
+        statements (statements.StatementStats | None): The SQL statements executed
+            in the last outermost ``with`` block: count, time and the slowest ones.
+            Checked by ``statements.get_detector()`` on exit.
+        depth (int): Number of ``with`` blocks currently entered.
+        outbox (Outbox | None): When set, the outermost ``commit`` writes the
+            events the outbox accepts to its table, in the committed transaction,
+            and ``collect_event`` no longer yields them.
+    """
+
+    repo: abstract.BaseRepository | None = None
+    statements: statements.StatementStats | None = None
+    depth: int = 0
+    outbox: Outbox | None = None
+    _savepoints: list[Any]
+    _snapshots: list[Any]
+
+    def collect_event(self):
+        """collect_event.
+
+        Drains the events recorded since the last call and drops the cached
+        View results of the model classes that recorded them.
+        """
+        if self.repo is None:
+            return
+
+        if caching.CACHES:
+            for model_cls in {type(model) for model in self.repo.cached.dirty.values()}:
+                caching.invalidate(model_cls)
+        yield from self.repo.cached.drain_events()
+
+    def _invalidate_written(self):
+        """Drop the cached View results of the model classes written since the
+        last commit, once it succeeded."""
+        if self.repo is None:
+            return
+        written, self.repo.written = self.repo.written, set()
+        if caching.CACHES:
+            for model_cls in written:
+                caching.invalidate(model_cls)
+
+    def _outbox_events(self) -> list[Any]:
+        """The events of the dirty models bound for the outbox."""
+        if self.outbox is None or self.repo is None:
+            return []
+        return [
+            event
+            for model in self.repo.cached.dirty.values()
+            for event in model.events
+            if self.outbox.accepts(event)
+        ]
+
+    def _drop_outbox_events(self, events: list[Any]):
+        """Remove ``events``, committed to the outbox, from the dirty models."""
+        written = {id(event) for event in events}
+        for model in self.repo.cached.dirty.values():
+            kept = [event for event in model.events if id(event) not in written]
+            if len(kept) != len(model.events):
+                model.events[:] = kept
+
+    def _track_statements(self):
+        self.statements = statements.StatementStats()
+        self.statements.__enter__()
+
+    def _check_statements(self, failed: bool):
+        if self.statements is None:
+            return
+        self.statements.__exit__()
+        detector = statements.get_detector()
+        if detector is not None and not failed:
+            detector.check(self.statements, self)
+
+
+class UnitOfWork(BaseUnitOfWork):
+    """UnitOfWork.
+
+    Attributes:
+        read_only (bool): Read from a replica when the database config has some.
+            Defaults to False (primary).
+    """
 
     factory: abstract.ComponentFactory
     repo: abstract.Repository | None = None
     session: abstract.Session | None = None
 
-    def __init__(self, config: dict[str, Any] | None = None):
+    def __init__(
+        self,
+        config: dict[str, Any] | None = None,
+        read_only: bool = False,
+        outbox: Outbox | None = None,
+    ):
         self.config = config or utils.get_config()
+        self.read_only = read_only
+        self.outbox = outbox
         self.factory = adapters.create_component_factory(self.config)
 
     def __enter__(self):
@@ -27,39 +131,165 @@ class UnitOfWork:
         Returns:
             SqlAlchemyUnitOfWork: The current instance of the unit of work.
         """
-        self.session = self.factory.create_session()
+        if self.depth:
+            self._savepoints.append(self.session.begin_nested())
+            self._snapshots.append(self.repo.cached.snapshot())
+            self.depth += 1
+            return self
+        if self.read_only:
+            self.session = self.factory.create_session(read_only=True)
+        else:
+            self.session = self.factory.create_session()
         self.repo = self.factory.create_repository(session=self.session)
+        self._savepoints = []
+        self._snapshots = []
+        self.depth = 1
+        self._track_statements()
         return self
 
-    def __exit__(self, *_):
+    def __exit__(self, exc_type=None, *_):
         """
         Exits the unit of work context.
 
         Args:
             *args: A variable-length list of positional arguments.
         """
-        if self.session:
-            self.session.close()
+        if self.depth > 1:
+            self.depth -= 1
+            savepoint = self._savepoints.pop()
+            snapshot = self._snapshots.pop()
+            if savepoint is not None:
+                savepoint.rollback()
+                self.repo.cached.restore(snapshot)
+            return
+        self.depth = 0
+        try:
+            if self.session:
+                self.session.close()
+        finally:
+            self._check_statements(failed=exc_type is not None)
 
     def commit(self):
         """
-        Commits the session's transaction.
+        Commits the session's transaction, or releases the savepoint of a nested
+        block.
+
+        Raises:
+            RuntimeError: when the unit of work is read-only.
         """
-        if self.session:
+        if self.read_only:
+            raise RuntimeError("A read-only unit of work cannot commit")
+        if self.depth > 1:
+            if self._savepoints[-1] is not None:
+                self._savepoints[-1].commit()
+                self._savepoints[-1] = None
+        elif self.session:
+            events = self._outbox_events()
+            if events:
+                self.outbox.write(self.session, events)
             self.session.commit()
+            if events:
+                self._drop_outbox_events(events)
+            self._invalidate_written()
+            self.factory.stick_to_primary()
 
     def rollback(self):
         """
-        Rollback the session's transaction.
+        Rollback the session's transaction, or the savepoint of a nested block.
         """
-        if self.session:
+        if self.depth > 1:
+            if self._savepoints[-1] is not None:
+                self._savepoints[-1].rollback()
+                self._savepoints[-1] = None
+                self.repo.cached.restore(self._snapshots[-1])
+        elif self.session:
             self.session.rollback()
 
-    def collect_event(self):
-        """collect_event."""
-        if self.repo is None:
+
+class AsyncUnitOfWork(BaseUnitOfWork):
+    """AsyncUnitOfWork."""
+
+    factory: abstract.AsyncComponentFactory
+    repo: abstract.AsyncRepository | None = None
+    session: abstract.AsyncSession | None = None
+
+    def __init__(
+        self,
+        config: dict[str, Any] | None = None,
+        outbox: Outbox | None = None,
+    ):
+        self.config = config or utils.get_config()
+        self.outbox = outbox
+        self.factory = adapters.create_async_component_factory(self.config)
+
+    async def __aenter__(self):
+        """
+        Enters the unit of work context.
+
+        Returns:
+            AsyncUnitOfWork: The current instance of the unit of work.
+        """
+        if self.depth:
+            self._savepoints.append(await self.session.begin_nested())
+            self._snapshots.append(self.repo.cached.snapshot())
+            self.depth += 1
+            return self
+        self.session = self.factory.create_session()
+        self.repo = self.factory.create_repository(session=self.session)
+        self._savepoints = []
+        self._snapshots = []
+        self.depth = 1
+        self._track_statements()
+        return self
+
+    async def __aexit__(self, exc_type=None, *_):
+        """
+        Exits the unit of work context.
+
+        Args:
+            *args: A variable-length list of positional arguments.
+        """
+        if self.depth > 1:
+            self.depth -= 1
+            savepoint = self._savepoints.pop()
+            snapshot = self._snapshots.pop()
+            if savepoint is not None:
+                await savepoint.rollback()
+                self.repo.cached.restore(snapshot)
             return
+        self.depth = 0
+        try:
+            if self.session:
+                await self.session.close()
+        finally:
+            self._check_statements(failed=exc_type is not None)
+
+    async def commit(self):
+        """
+        Commits the session's transaction, or releases the savepoint of a nested
+        block.
+        """
+        if self.depth > 1:
+            if self._savepoints[-1] is not None:
+                await self._savepoints[-1].commit()
+                self._savepoints[-1] = None
+        elif self.session:
+            events = self._outbox_events()
+            if events:
+                await self.outbox.write_async(self.session, events)
+            await self.session.commit()
+            if events:
+                self._drop_outbox_events(events)
+            self._invalidate_written()
 
-        for model in self.repo.cached.values():
-            while model.events:
-                yield model.events.pop(0)
+    async def rollback(self):
+        """
+        Rollback the session's transaction, or the savepoint of a nested block.
+        """
+        if self.depth > 1:
+            if self._savepoints[-1] is not None:
+                await self._savepoints[-1].rollback()
+                self._savepoints[-1] = None
+                self.repo.cached.restore(self._snapshots[-1])
+        elif self.session:
+            await self.session.rollback()
@@ -1,11 +1,14 @@
 import contextlib
-from typing import Any, TypeVar, Type, Generator
+import threading
+from typing import Any, Callable, TypeVar, Type, Generator, Iterator
 
 import sqlalchemy.orm
 import utils
 
 import core
-from core import bootstrap
+from core import adapters, bootstrap, caching, pagination
+from core.adapters import memory_adapter, sqlalchemy_sharded_adapter
+from core.configurations import DEFAULT_DATABASE_FRAMEWORK
 
 __all__ = [
     "View",
@@ -15,10 +18,7 @@ __all__ = [
 ]
 T = TypeVar("T", bound=core.BaseModel)
 
-SORT_DIRECTION = {
-    "+": sqlalchemy.asc,
-    "-": sqlalchemy.desc,
-}
+SORT_DIRECTION = pagination.SORT_DIRECTION
 
 
 class View:
@@ -26,12 +26,38 @@ class View:
 
     Attributes:
         config (dict[str, Any]): A dictionary indicating configurations of the application. Defaults to utils database.
+        cache (caching.ResultCache | None): Read-through cache for fetch_model and fetch_models. Results are shared
+            between callers and must be treated as read-only; they are dropped when a unit of work commits writes
+            to their model class, when the MessageBus collects events from models of their class, or when they
+            expire. A fetch_model that found nothing is not cached. Defaults to None (no caching).
+
+    Reads go to a read replica when the database config lists some, except right after a commit in the same context.
+    With the "memory" framework, fetches read the committed models of the in-memory database instead.
     """
 
     config: dict[str, Any]
 
-    def __init__(self, config: dict[str, Any] = None):
+    def __init__(
+        self,
+        config: dict[str, Any] = None,
+        cache: caching.ResultCache | None = None,
+    ):
         self.config = config or utils.get_config()["database"]
+        self._factory: core.sqlalchemy_adapter.ComponentFactory | None = None
+        self.cache = cache
+        if cache is not None:
+            caching.register(cache)
+
+    @property
+    def factory(self) -> core.sqlalchemy_adapter.ComponentFactory:
+        """The component factory, created once and reused by every fetch."""
+        if self._factory is None:
+            framework = self.config.get("framework", DEFAULT_DATABASE_FRAMEWORK)
+            if framework == DEFAULT_DATABASE_FRAMEWORK:
+                self._factory = core.sqlalchemy_adapter.ComponentFactory(self.config)
+            else:
+                self._factory = adapters.create_component_factory(self.config)
+        return self._factory
 
     @contextlib.contextmanager
     def fetch_model(self, model_cls: Type[T], **identities) -> Generator[T, Any, None]:
@@ -44,12 +70,32 @@ class View:
         Returns:
             T: An instance of the BaseModel.
         """
-        factory = core.sqlalchemy_adapter.ComponentFactory(self.config)
-        session = factory.create_session()
+        key = None
+        if self.cache is not None:
+            key = caching.make_key(model_cls, "fetch_model", **identities)
+            model = self.cache.get(key)
+            if model is not caching.MISSING:
+                yield model
+                return
+
+        if self._in_memory():
+            models = self.factory.create_repository().get_models(
+                model_cls, **identities
+            )
+            model = models[0] if models else None
+            if key is not None and model is not None:
+                self.cache.set(key, model, model_cls)
+            yield model
+            return
+
+        session = self.factory.create_session(read_only=True)
         with session.core_session:
             query = session.core_session.query(model_cls).filter_by(**identities)
             models = [model for model in query.all() if model]
-            yield models[0] if len(models) else None
+            model = models[0] if len(models) else None
+            if key is not None and model is not None:
+                self.cache.set(key, model, model_cls)
+            yield model
 
     @contextlib.contextmanager
     def fetch_models(
@@ -60,6 +106,8 @@ class View:
         orders: str | None = None,
         limit: int | None = 20,
         offset: int | None = 0,
+        mode: str = "offset",
+        cursor: str | None = None,
         **filters,
     ) -> Generator[list[T], Any, None]:
         """fetch_models
@@ -70,52 +118,270 @@ class View:
             exclude_relationships (list[str], optional): Defaults to None.
             orders (str, optional): Defaults to None.
             limit (int, optional): Defaults to 20.
-            offset (int, optional): Defaults to 0.
+            offset (int, optional): Defaults to 0. Ignored in keyset pagination.
+            mode (str, optional): Pagination mode, "offset" or "keyset". Defaults to
+                "offset".
+            cursor (str, optional): Cursor of the page to fetch in keyset pagination,
+                as returned by a previous Page. Defaults to None (first page).
             filters (kwargs): Filters of the query.
 
         Returns:
-            list[T]: A list of instances of the BaseModel.
+            list[T]: A list of instances of the BaseModel. In keyset pagination a
+                core.Page carrying the next and previous cursors.
         """
+        if mode not in ("offset", "keyset"):
+            raise ValueError(f"Unsupported pagination mode: {mode}")
+
         filters = filters or {}
-        if orders is None:
-            orders = []
-        else:
-            orders = orders.split(",")
-            orders = [
-                SORT_DIRECTION[order[0]](getattr(model_cls, order[1:]))
-                for order in orders
-            ]
+        key = None
+        if self.cache is not None:
+            key = caching.make_key(
+                model_cls,
+                "fetch_models",
+                load_strategy=load_strategy,
+                exclude_relationships=exclude_relationships,
+                orders=orders,
+                limit=limit,
+                offset=offset,
+                mode=mode,
+                cursor=cursor,
+                filters=filters,
+            )
+            models = self.cache.get(key)
+            if models is not caching.MISSING:
+                yield models
+                return
+
+        if self._in_memory():
+            models = self._fetch_from_memory(
+                model_cls,
+                orders,
+                limit,
+                offset,
+                mode == "keyset",
+                cursor,
+                filters,
+            )
+            if key is not None:
+                self.cache.set(key, models, model_cls)
+            yield models
+            return
+
         strategy = {
             "noload": sqlalchemy.orm.noload,
             "subquery": sqlalchemy.orm.subqueryload,
         }
-        config = utils.get_config()
-        factory = core.sqlalchemy_adapter.ComponentFactory(config["database"])
-        session = factory.create_session()
+        session = self.factory.create_session(read_only=True)
         with session.core_session:
             exclude_relationships = exclude_relationships or []
-            query = (
-                session.core_session.query(model_cls)
-                .filter_by(**filters)
-                .order_by(*orders)
-                .limit(limit)
-                .offset(offset)
-            )
+            query = session.core_session.query(model_cls).filter_by(**filters)
             for relationship in exclude_relationships:
                 query = query.options(
                     strategy[load_strategy](getattr(model_cls, relationship))
                 )
-            yield query.all()
+            shard_ids = self._shard_ids(model_cls, filters)
+            if mode == "keyset":
+                read = self._query_reader(query, model_cls, limit, shard_ids)
+                models = self._fetch_page(read, orders, limit, cursor)
+            else:
+                keys = pagination.parse_orders(orders, tiebreaker=False)
+                models = self._all(query, model_cls, keys, limit, offset, shard_ids)
+            if key is not None:
+                self.cache.set(key, models, model_cls)
+            yield models
+
+    @contextlib.contextmanager
+    def stream_models(
+        self,
+        model_cls: Type[T],
+        batch_size: int = 1000,
+        orders: str | None = None,
+        **filters,
+    ) -> Generator[Iterator[T], Any, None]:
+        """stream_models
+
+        Iterates over every matching model through a server-side cursor, holding at
+        most ``batch_size`` rows in memory at a time.
+
+        Args:
+            model_cls (Type[T]): The class of the models.
+            batch_size (int, optional): Rows fetched per round-trip. Defaults to 1000.
+            orders (str, optional): Defaults to None.
+            filters (kwargs): Filters of the query.
+
+        Returns:
+            Iterator[T]: An iterator over instances of the BaseModel, valid inside
+                the context only.
+        """
+        if self._in_memory():
+            repo = self.factory.create_repository()
+            keys = pagination.parse_orders(orders, tiebreaker=False)
+            yield iter(repo.select(model_cls, keys, **filters))
+            return
+
+        session = self.factory.create_session(read_only=True)
+        with session.core_session:
+            query = (
+                session.core_session.query(model_cls)
+                .filter_by(**filters)
+                .order_by(
+                    *pagination.order_by(
+                        model_cls, pagination.parse_orders(orders, tiebreaker=False)
+                    )
+                )
+                .yield_per(batch_size)
+            )
+            yield iter(query)
+
+    def _in_memory(self) -> bool:
+        return isinstance(self.factory, memory_adapter.ComponentFactory)
+
+    def _fetch_from_memory(
+        self,
+        model_cls: Type[T],
+        orders: str | None,
+        limit: int | None,
+        offset: int | None,
+        keyset: bool,
+        cursor: str | None,
+        filters: dict[str, Any],
+    ) -> list[T] | pagination.Page:
+        repo = self.factory.create_repository()
+        if keyset:
+
+            def read(keys: list[tuple[str, str]], values: list[Any] | None) -> list[T]:
+                models = repo.select(model_cls, keys, **filters)
+                if values is not None:
+                    models = [
+                        model
+                        for model in models
+                        if pagination.is_after(model, keys, values)
+                    ]
+                return models[: limit + 1]
+
+            return self._fetch_page(read, orders, limit, cursor)
+
+        keys = pagination.parse_orders(orders, tiebreaker=False)
+        start = offset or 0
+        stop = None if limit is None else start + limit
+        return repo.select(model_cls, keys, **filters)[start:stop]
+
+    def _shard_ids(self, model_cls: Type[T], filters: dict[str, Any]) -> list[str]:
+        """Shards a query has to visit, empty when the database is not sharded."""
+        factory = self.factory
+        if not isinstance(factory, sqlalchemy_sharded_adapter.ShardedComponentFactory):
+            return []
+        return factory.shards_for(model_cls, **filters)
 
+    def _all(
+        self,
+        query: sqlalchemy.orm.Query,
+        model_cls: Type[T],
+        keys: list[tuple[str, str]],
+        limit: int | None,
+        offset: int | None,
+        shard_ids: list[str],
+    ) -> list[T]:
+        query = query.order_by(*pagination.order_by(model_cls, keys))
+        if len(shard_ids) <= 1:
+            return query.limit(limit).offset(offset).all()
+
+        # Scatter-gather: every shard returns its first offset + limit models,
+        # which are merged in order before the page is cut.
+        window = None if limit is None else (offset or 0) + limit
+        results = [
+            query.options(sqlalchemy_sharded_adapter.set_shard_id(shard_id))
+            .limit(window)
+            .all()
+            for shard_id in shard_ids
+        ]
+        return sqlalchemy_sharded_adapter.merge_sorted(results, keys, offset, limit)
+
+    def _query_reader(
+        self,
+        query: sqlalchemy.orm.Query,
+        model_cls: Type[T],
+        limit: int | None,
+        shard_ids: list[str],
+    ) -> Callable[[list[tuple[str, str]], list[Any] | None], list[T]]:
+        def read(keys: list[tuple[str, str]], values: list[Any] | None) -> list[T]:
+            seek = query
+            if values is not None:
+                seek = query.filter(pagination.seek_condition(model_cls, keys, values))
+            return self._all(seek, model_cls, keys, limit + 1, None, shard_ids)
 
-VIEW: View = View(config=utils.get_config()["database"])
+        return read
+
+    def _fetch_page(
+        self,
+        read: Callable[[list[tuple[str, str]], list[Any] | None], list[T]],
+        orders: str | None,
+        limit: int | None,
+        cursor: str | None,
+    ) -> pagination.Page:
+        """Cut a keyset page; ``read(keys, values)`` returns up to ``limit + 1``
+        models sorted by ``keys`` and past ``values`` when those are given."""
+        if not limit:
+            raise ValueError("Keyset pagination requires a limit")
+
+        keys = pagination.parse_orders(orders)
+        backwards = False
+        values = None
+        if cursor is not None:
+            direction, values = pagination.decode_cursor(cursor, keys)
+            backwards = direction == pagination.PREV
+
+        # A backwards page is read in reverse order and flipped afterwards.
+        flipped = {"+": "-", "-": "+"}
+        read_keys = [
+            (attr, flipped[sign] if backwards else sign) for attr, sign in keys
+        ]
+        models = read(read_keys, values)
+        has_more = len(models) > limit
+        models = models[:limit]
+        if backwards:
+            models.reverse()
+
+        if not models:
+            return pagination.Page()
+        has_next = has_more if not backwards else True
+        has_prev = has_more if backwards else cursor is not None
+        return pagination.Page(
+            models,
+            next_cursor=(
+                pagination.encode_cursor(models[-1], keys, pagination.NEXT)
+                if has_next
+                else None
+            ),
+            prev_cursor=(
+                pagination.encode_cursor(models[0], keys, pagination.PREV)
+                if has_prev
+                else None
+            ),
+        )
+
+
+_VIEW: View | None = None
+_VIEW_LOCK = threading.Lock()
 
 
 def get_view() -> View:
-    global VIEW
-    return VIEW
+    """The default View, built from the database config on first use."""
+    global _VIEW
+    if _VIEW is None:
+        with _VIEW_LOCK:
+            if _VIEW is None:
+                _VIEW = View()
+    return _VIEW
 
 
 def set_view(new_view: View):
-    global VIEW
-    VIEW = new_view
+    global _VIEW
+    _VIEW = new_view
+
+
+def __getattr__(name: str) -> Any:
+    # VIEW is resolved on access so that importing this module reads no config.
+    if name == "VIEW":
+        return get_view()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
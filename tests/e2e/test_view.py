@@ -1,3 +1,5 @@
+import base64
+import json
 import uuid
 from typing import Any, Callable, Generator
 
@@ -5,7 +7,7 @@ import pytest
 import utils
 
 import core
-from core import orm
+from core import caching, orm
 from tests.double import fake
 
 
@@ -85,3 +87,197 @@ class TestView:
         """Test that the default view can fetch models correctly."""
         with view.fetch_model(fake.Model, **identities) as model:
             assert model == expected_model
+
+
+@pytest.mark.usefixtures("start_orm")
+class TestKeysetPagination:
+
+    @pytest.fixture
+    def message_id(self, bus: core.MessageBus) -> Generator[str, None, None]:
+        message_id = str(uuid.uuid4())
+        with bus.uow as uow:
+            uow.repo.add(
+                [fake.Model(name=f"model-{i}", message_id=message_id) for i in range(5)]
+            )
+            uow.commit()
+        yield message_id
+
+    def test_fetch_pages(self, message_id: str) -> None:
+        view = core.View()
+        names = []
+        cursor = None
+        while True:
+            with view.fetch_models(
+                fake.Model,
+                orders="-name",
+                limit=2,
+                mode="keyset",
+                cursor=cursor,
+                message_id=message_id,
+            ) as page:
+                names.extend(model.name for model in page)
+                cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert names == [f"model-{i}" for i in reversed(range(5))]
+
+    def test_fetch_previous_page(self, message_id: str) -> None:
+        view = core.View()
+        kwargs = {"orders": "+name", "limit": 2, "mode": "keyset"}
+        with view.fetch_models(fake.Model, message_id=message_id, **kwargs) as first:
+            assert first.prev_cursor is None
+        with view.fetch_models(
+            fake.Model, cursor=first.next_cursor, message_id=message_id, **kwargs
+        ) as second:
+            assert [model.name for model in second] == ["model-2", "model-3"]
+        with view.fetch_models(
+            fake.Model, cursor=second.prev_cursor, message_id=message_id, **kwargs
+        ) as previous:
+            assert [model.name for model in previous] == ["model-0", "model-1"]
+            assert previous.prev_cursor is None
+
+    @pytest.mark.parametrize(
+        "orders, expected",
+        [
+            pytest.param("+name", [None, None, "a", "b", "c"], id="success:ascending"),
+            pytest.param("-name", ["c", "b", "a", None, None], id="success:descending"),
+        ],
+    )
+    def test_fetch_pages_with_nulls(
+        self, bus: core.MessageBus, orders: str, expected: list[str | None]
+    ) -> None:
+        message_id = str(uuid.uuid4())
+        with bus.uow as uow:
+            uow.repo.add(
+                [
+                    fake.Model(name=name, message_id=message_id)
+                    for name in ["b", None, "c", None, "a"]
+                ]
+            )
+            uow.commit()
+        view = core.View()
+        names = []
+        cursor = None
+        while True:
+            with view.fetch_models(
+                fake.Model,
+                orders=orders,
+                limit=2,
+                mode="keyset",
+                cursor=cursor,
+                message_id=message_id,
+            ) as page:
+                names.extend(model.name for model in page)
+                cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert names == expected
+
+    def test_fetch_with_invalid_cursor(self, message_id: str) -> None:
+        with pytest.raises(core.InvalidCursorException):
+            with core.View().fetch_models(
+                fake.Model, mode="keyset", cursor="not-a-cursor"
+            ):
+                pass
+
+    def test_fetch_with_truncated_cursor(self, message_id: str) -> None:
+        payload = {"direction": "next", "keys": ["+id"], "values": []}
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        with pytest.raises(core.InvalidCursorException):
+            with core.View().fetch_models(fake.Model, mode="keyset", cursor=cursor):
+                pass
+
+
+@pytest.mark.usefixtures("start_orm")
+class TestStreamModels:
+
+    def test_stream_models(self, bus: core.MessageBus) -> None:
+        message_id = str(uuid.uuid4())
+        with bus.uow as uow:
+            uow.repo.add(
+                [fake.Model(name=f"model-{i}", message_id=message_id) for i in range(5)]
+            )
+            uow.commit()
+
+        with core.View().stream_models(
+            fake.Model, batch_size=2, orders="+name", message_id=message_id
+        ) as models:
+            assert [model.name for model in models] == [f"model-{i}" for i in range(5)]
+
+
+@pytest.mark.usefixtures("start_orm")
+class TestResultCache:
+
+    def test_fetch_models(self, bus: core.MessageBus) -> None:
+        message_id = str(uuid.uuid4())
+        view = core.View(cache=caching.LRUCache())
+
+        with view.fetch_models(fake.Model, message_id=message_id) as models:
+            assert models == []
+        with view.fetch_models(fake.Model, message_id=message_id) as cached:
+            assert cached is models
+
+        with bus.uow as uow:
+            uow.repo.add(fake.Model(name="test", message_id=message_id))
+            uow.commit()
+        list(bus.uow.collect_event())
+
+        with view.fetch_models(fake.Model, message_id=message_id) as models:
+            assert [model.name for model in models] == ["test"]
+        assert view.cache.statistics == {"size": 1, "hits": 1, "misses": 2}
+
+    def test_fetch_model_miss(self, bus: core.MessageBus) -> None:
+        message_id = str(uuid.uuid4())
+        view = core.View(cache=caching.LRUCache())
+
+        with view.fetch_model(fake.Model, message_id=message_id) as model:
+            assert model is None
+        with bus.uow as uow:
+            uow.repo.add(fake.Model(name="test", message_id=message_id))
+            uow.commit()
+
+        with view.fetch_model(fake.Model, message_id=message_id) as model:
+            assert model.name == "test"
+        assert len(view.cache) == 1
+
+    def test_write_without_events(self, bus: core.MessageBus) -> None:
+        message_id = str(uuid.uuid4())
+        with bus.uow as uow:
+            uow.repo.add(fake.Model(name="test", message_id=message_id))
+            uow.commit()
+        list(bus.uow.collect_event())
+        view = core.View(cache=caching.LRUCache())
+        with view.fetch_models(fake.Model, message_id=message_id) as models:
+            assert [model.name for model in models] == ["test"]
+
+        with bus.uow as uow:
+            uow.repo.update_where(
+                fake.Model, {"name": "updated"}, message_id=message_id
+            )
+            uow.commit()
+        with view.fetch_models(fake.Model, message_id=message_id) as models:
+            assert [model.name for model in models] == ["updated"]
+
+        with bus.uow as uow:
+            uow.repo.remove_where(fake.Model, message_id=message_id)
+            uow.commit()
+        with view.fetch_models(fake.Model, message_id=message_id) as models:
+            assert models == []
+
+    def test_update_without_events(self, bus: core.MessageBus) -> None:
+        message_id = str(uuid.uuid4())
+        with bus.uow as uow:
+            uow.repo.add(fake.Model(name="test", message_id=message_id))
+            uow.commit()
+        list(bus.uow.collect_event())
+        view = core.View(cache=caching.LRUCache())
+        with view.fetch_models(fake.Model, message_id=message_id) as models:
+            assert [model.name for model in models] == ["test"]
+
+        with bus.uow as uow:
+            model = uow.repo.get_model(fake.Model, message_id=message_id)
+            model.name = "updated"
+            uow.commit()
+            assert list(uow.collect_event()) == []
+        with view.fetch_models(fake.Model, message_id=message_id) as models:
+            assert [model.name for model in models] == ["updated"]
@@ -0,0 +1,57 @@
+import asyncio
+import pathlib
+
+import pytest
+import sqlalchemy
+
+import core
+from tests.double import fake
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def async_config(tmp_path: pathlib.Path, bootstrapper: core.Bootstrapper):
+    path = tmp_path / "core.db"
+    engine = sqlalchemy.create_engine(f"sqlite:///{path}")
+    sqlalchemy.inspect(fake.Model).local_table.metadata.create_all(engine)
+    engine.dispose()
+    yield {
+        "framework": "sqlalchemy",
+        "connection": {
+            "url": f"sqlite+aiosqlite:///{path}",
+            "args": {"poolclass": sqlalchemy.pool.NullPool},
+        },
+    }
+
+
+class TestAsyncUnitOfWork:
+
+    def test_commit(self, async_config):
+        model = fake.Model(name="test")
+
+        async def run():
+            uow = core.AsyncUnitOfWork(async_config)
+            async with uow:
+                uow.repo.add(model)
+                await uow.commit()
+                assert len(list(uow.collect_event())) == 1
+            async with uow:
+                stored = await uow.repo.get_model(fake.Model, name="test")
+                assert stored.id == model.id
+                found, missing = await uow.repo.get_many(fake.Model, [model.id, "x"])
+                assert [m.id for m in found] == [model.id]
+                assert missing == ["x"]
+
+        asyncio.run(run())
+
+    def test_rollback(self, async_config):
+        async def run():
+            uow = core.AsyncUnitOfWork(async_config)
+            async with uow:
+                uow.repo.add(fake.Model(name="rollback"))
+                await uow.rollback()
+            async with uow:
+                assert await uow.repo.get_model(fake.Model, name="rollback") is None
+
+        asyncio.run(run())
@@ -0,0 +1,60 @@
+from typing import Any
+
+import pytest
+
+from core.adapters import sqlalchemy_adapter as saa
+from core.configurations import DatabaseConfig
+
+
+@pytest.fixture
+def registry() -> saa.EngineRegistry:
+    registry = saa.EngineRegistry()
+    yield registry
+    registry.dispose_all()
+
+
+@pytest.fixture
+def sqlite_config() -> dict[str, Any]:
+    return {
+        "framework": "sqlalchemy",
+        "connection": {
+            "url": "sqlite://",
+        },
+    }
+
+
+class TestEngineRegistry:
+    """TestEngineRegistry."""
+
+    def test_get_engine_same_config(
+        self,
+        registry: saa.EngineRegistry,
+        sqlite_config: dict[str, Any],
+    ):
+        engine = registry.get_engine(DatabaseConfig(**sqlite_config))
+        assert registry.get_engine(DatabaseConfig(**sqlite_config)) is engine
+        assert len(registry.engines) == 1
+
+    def test_get_engine_different_args(
+        self,
+        registry: saa.EngineRegistry,
+        sqlite_config: dict[str, Any],
+    ):
+        engine = registry.get_engine(DatabaseConfig(**sqlite_config))
+        sqlite_config["connection"]["args"] = {"echo": True}
+        assert registry.get_engine(DatabaseConfig(**sqlite_config)) is not engine
+
+    def test_pool_statistics(
+        self,
+        registry: saa.EngineRegistry,
+        sqlite_config: dict[str, Any],
+    ):
+        registry.get_engine(DatabaseConfig(**sqlite_config))
+        (statistics,) = registry.pool_statistics()
+        assert statistics["url"] == "sqlite://"
+        assert "status" in statistics
+
+    def test_factories_share_engine(self, sqlite_config: dict[str, Any]):
+        first = saa.ComponentFactory(sqlite_config)
+        second = saa.ComponentFactory(DatabaseConfig(**sqlite_config))
+        assert first.engine is second.engine
@@ -0,0 +1,69 @@
+import pathlib
+import time
+from typing import Any
+
+import pytest
+import sqlalchemy
+
+import core
+from core import dependency_injection
+from tests.double import fake
+
+
+@pytest.fixture
+def sqlite_config(
+    tmp_path: pathlib.Path,
+    bootstrapper: core.Bootstrapper,
+) -> dict[str, Any]:
+    url = f"sqlite:///{tmp_path / 'core.db'}"
+    engine = sqlalchemy.create_engine(url)
+    sqlalchemy.inspect(fake.Model).local_table.metadata.create_all(engine)
+    engine.dispose()
+    return {"framework": "sqlalchemy", "connection": {"url": url}}
+
+
+class TestConcurrentMessageBus:
+
+    def test_handle_event(self, sqlite_config: dict[str, Any]):
+        written: dict[str, list[str]] = {}
+        handled = []
+
+        def writer(name: str, delay: float):
+            def write(event: fake.CreatedModelErrorEvent, uow: core.UnitOfWork):
+                time.sleep(delay)
+                with uow:
+                    models = [fake.Model(name=f"{name}-{i}") for i in range(5)]
+                    uow.repo.add(models)
+                    uow.commit()
+                written[name] = [model.events[0]._id for model in models]
+
+            return write
+
+        def created_model(event: fake.CreatedModelEvent):
+            handled.append(event._id)
+
+        bootstrapper = core.Bootstrapper(
+            event_router={
+                fake.CreatedModelErrorEvent: [
+                    writer("first", 0.05),
+                    writer("second", 0),
+                ],
+                fake.CreatedModelEvent: [created_model],
+            },
+            dependencies={
+                "uow": dependency_injection.Scoped(
+                    lambda: core.UnitOfWork(sqlite_config)
+                )
+            },
+            concurrent_events=True,
+        )
+        try:
+            bus = bootstrapper.bootstrap()
+            bus.handle(fake.CreatedModelErrorEvent(model=fake.Model(name="event")))
+        finally:
+            bootstrapper.shutdown()
+
+        assert handled == written["first"] + written["second"]
+        uow = core.UnitOfWork(sqlite_config)
+        with uow:
+            assert len(list(uow.repo.iter(fake.Model))) == 10
@@ -0,0 +1,117 @@
+import asyncio
+import pathlib
+from typing import Any, Callable
+
+import pytest
+import sqlalchemy
+
+import core
+from tests.double import fake
+
+
+@pytest.fixture
+def sqlite_config(
+    tmp_path: pathlib.Path,
+    bootstrapper: core.Bootstrapper,
+) -> dict[str, Any]:
+    url = f"sqlite:///{tmp_path / 'core.db'}"
+    engine = sqlalchemy.create_engine(url)
+    sqlalchemy.inspect(fake.Model).local_table.metadata.create_all(engine)
+    engine.dispose()
+    return {"framework": "sqlalchemy", "connection": {"url": url}}
+
+
+def raise_value_error(uow: core.UnitOfWork):
+    raise ValueError
+
+
+def names(config: dict[str, Any]) -> list[str]:
+    with core.UnitOfWork(config) as uow:
+        return sorted(model.name for model in uow.repo.get_models(fake.Model))
+
+
+class TestNestedUnitOfWork:
+
+    def test_commit(self, sqlite_config: dict[str, Any]):
+        uow = core.UnitOfWork(sqlite_config)
+        with uow:
+            uow.repo.add(fake.Model(name="outer"))
+            session = uow.session
+            with uow:
+                assert uow.session is session
+                assert uow.depth == 2
+                uow.repo.add(fake.Model(name="inner"))
+                uow.commit()
+            assert names(sqlite_config) == []
+            uow.commit()
+        assert uow.depth == 0
+        assert names(sqlite_config) == ["inner", "outer"]
+
+    @pytest.mark.parametrize(
+        "exit_",
+        [
+            pytest.param(lambda uow: uow.rollback(), id="success:rollback"),
+            pytest.param(raise_value_error, id="success:exception"),
+            pytest.param(lambda uow: None, id="success:no-commit"),
+        ],
+    )
+    def test_rollback(
+        self,
+        sqlite_config: dict[str, Any],
+        exit_: Callable[[core.UnitOfWork], None],
+    ):
+        uow = core.UnitOfWork(sqlite_config)
+        with uow:
+            outer = fake.Model(name="outer")
+            uow.repo.add(outer)
+            [created] = outer.events
+            inner = fake.Model(name="inner")
+            try:
+                with uow:
+                    uow.repo.add(inner)
+                    outer.events.append(fake.CreatedModelEvent(model=outer))
+                    exit_(uow)
+            except ValueError:
+                pass
+            assert uow.repo.get(fake.Model, id=inner.id) == []
+            assert uow.repo.get_model(fake.Model, id=outer.id) is outer
+            assert list(uow.collect_event()) == [created]
+            uow.commit()
+        assert names(sqlite_config) == ["outer"]
+
+    def test_rollback_after_collect(self, sqlite_config: dict[str, Any]):
+        uow = core.UnitOfWork(sqlite_config)
+        with uow:
+            outer = fake.Model(name="outer")
+            uow.repo.add(outer)
+            [created] = outer.events
+            with uow:
+                assert list(uow.collect_event()) == [created]
+            assert list(uow.collect_event()) == []
+
+    def test_async(self, sqlite_config: dict[str, Any]):
+        pytest.importorskip("aiosqlite")
+        url = sqlite_config["connection"]["url"].replace("sqlite", "sqlite+aiosqlite")
+        uow = core.AsyncUnitOfWork(
+            {
+                "framework": "sqlalchemy",
+                "connection": {
+                    "url": url,
+                    "args": {"poolclass": sqlalchemy.pool.NullPool},
+                },
+            }
+        )
+
+        async def run():
+            async with uow:
+                uow.repo.add(fake.Model(name="outer"))
+                async with uow:
+                    uow.repo.add(fake.Model(name="kept"))
+                    await uow.commit()
+                async with uow:
+                    uow.repo.add(fake.Model(name="undone"))
+                    await uow.rollback()
+                await uow.commit()
+
+        asyncio.run(run())
+        assert names(sqlite_config) == ["kept", "outer"]
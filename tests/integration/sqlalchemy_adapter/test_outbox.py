@@ -0,0 +1,200 @@
+import functools
+import multiprocessing
+import pathlib
+import threading
+import time
+from typing import Any
+from unittest import mock
+
+import pytest
+import sqlalchemy
+
+import core
+from core import instrumentation, outbox
+from tests.double import fake
+
+HANDLED: list[Any] = []
+
+
+def handle(event: fake.CreatedModelEvent):
+    HANDLED.append(event)
+
+
+def create_relay(url: str, index: int) -> outbox.OutboxRelay:
+    config = {"framework": "sqlalchemy", "connection": {"url": url}}
+    bus = core.MessageBus(core.UnitOfWork(config), {}, {fake.CreatedModelEvent: []})
+    return outbox.OutboxRelay(
+        core.Outbox(), bus, config, batch_size=2, poll_interval=0.01
+    )
+
+
+@pytest.fixture
+def sqlite_config(
+    tmp_path: pathlib.Path,
+    bootstrapper: core.Bootstrapper,
+) -> dict[str, Any]:
+    url = f"sqlite:///{tmp_path / 'core.db'}"
+    engine = sqlalchemy.create_engine(url)
+    sqlalchemy.inspect(fake.Model).local_table.metadata.create_all(engine)
+    core.Outbox().table.metadata.create_all(engine)
+    engine.dispose()
+    HANDLED.clear()
+    return {"framework": "sqlalchemy", "connection": {"url": url}}
+
+
+def rows(config: dict[str, Any]) -> list[Any]:
+    engine = sqlalchemy.create_engine(config["connection"]["url"])
+    try:
+        with engine.connect() as connection:
+            return connection.execute(sqlalchemy.text("SELECT * FROM outbox")).all()
+    finally:
+        engine.dispose()
+
+
+def write(config: dict[str, Any], count: int) -> list[fake.Model]:
+    models = [fake.Model(name=f"model-{i}") for i in range(count)]
+    uow = core.UnitOfWork(config, outbox=core.Outbox())
+    with uow:
+        uow.repo.add(models)
+        uow.commit()
+        assert list(uow.collect_event()) == []
+    return models
+
+
+class TestUnitOfWork:
+
+    def test_commit(self, sqlite_config: dict[str, Any]):
+        models = write(sqlite_config, 2)
+        stored = rows(sqlite_config)
+        assert [row.type for row in stored] == [
+            "tests.double.fake.schemas:CreatedModelEvent"
+        ] * 2
+        assert all(row.processed_time is None for row in stored)
+        assert not any(model.events for model in models)
+
+    def test_rollback(self, sqlite_config: dict[str, Any]):
+        uow = core.UnitOfWork(sqlite_config, outbox=core.Outbox())
+        with uow:
+            uow.repo.add(fake.Model(name="rollback"))
+        assert rows(sqlite_config) == []
+
+    def test_commit_failure(self, sqlite_config: dict[str, Any]):
+        model = fake.Model(name="failure")
+        uow = core.UnitOfWork(sqlite_config, outbox=core.Outbox())
+        with uow:
+            uow.repo.add(model)
+            with mock.patch.object(uow.session, "commit", side_effect=RuntimeError):
+                with pytest.raises(RuntimeError):
+                    uow.commit()
+            assert len(model.events) == 1
+        assert rows(sqlite_config) == []
+
+    def test_types(self, sqlite_config: dict[str, Any]):
+        uow = core.UnitOfWork(sqlite_config, outbox=core.Outbox(types=[core.Command]))
+        with uow:
+            uow.repo.add(fake.Model(name="in-process"))
+            uow.commit()
+            assert len(list(uow.collect_event())) == 1
+        assert rows(sqlite_config) == []
+
+
+class TestOutboxRelay:
+
+    @pytest.fixture
+    def relay(self, sqlite_config: dict[str, Any]) -> outbox.OutboxRelay:
+        bus = core.MessageBus(
+            core.UnitOfWork(sqlite_config), {}, {fake.CreatedModelEvent: [handle]}
+        )
+        return outbox.OutboxRelay(core.Outbox(), bus, sqlite_config, batch_size=2)
+
+    def test_run_once(self, sqlite_config: dict[str, Any], relay: outbox.OutboxRelay):
+        write(sqlite_config, 3)
+        stored = rows(sqlite_config)
+        assert relay.pending() == 3
+        assert relay.run_once() == 2
+        assert relay.run_once() == 1
+        assert relay.run_once() == 0
+        assert [event._id for event in HANDLED] == [row.message_id for row in stored]
+        assert all(row.processed_time is not None for row in rows(sqlite_config))
+        assert relay.metrics.dispatched == 3
+        assert relay.metrics.batches == 2
+        assert relay.metrics.lag.count == 3
+
+    def test_failure(self, sqlite_config: dict[str, Any], relay: outbox.OutboxRelay):
+        relay.max_attempts = 2
+        engine = sqlalchemy.create_engine(sqlite_config["connection"]["url"])
+        with engine.begin() as connection:
+            connection.execute(
+                sqlalchemy.insert(relay.outbox.table),
+                {
+                    "message_id": "missing",
+                    "type": "tests.double.fake:MissingEvent",
+                    "payload": "{}",
+                    "created_time": outbox._now(),
+                    "attempts": 0,
+                },
+            )
+        engine.dispose()
+        assert relay.run_once() == 1
+        assert relay.run_once() == 1
+        assert relay.run_once() == 0
+        [row] = rows(sqlite_config)
+        assert row.attempts == 2
+        assert "MissingEvent" in row.error
+        assert relay.metrics.failed == 2
+
+    def test_handler_failure(self, sqlite_config: dict[str, Any]):
+        def fail(event: fake.CreatedModelEvent):
+            raise ValueError("handler failed")
+
+        bus = core.MessageBus(
+            core.UnitOfWork(sqlite_config),
+            {},
+            {fake.CreatedModelEvent: [handle, fail]},
+        )
+        relay = outbox.OutboxRelay(core.Outbox(), bus, sqlite_config)
+        write(sqlite_config, 1)
+        assert relay.run_once() == 1
+        [row] = rows(sqlite_config)
+        assert row.processed_time is None
+        assert row.attempts == 1
+        assert "handler failed" in row.error
+        assert len(HANDLED) == 1
+        assert relay.metrics.failed == 1
+        assert relay.pending() == 1
+
+    def test_export(self, sqlite_config: dict[str, Any], relay: outbox.OutboxRelay):
+        write(sqlite_config, 1)
+        relay.run_once()
+        relay.metrics.worker = "0"
+        text = instrumentation.PrometheusExporter(
+            instrumentation.MetricsCollector(), relay=relay.metrics
+        ).render()
+        assert 'core_outbox_dispatched_total{worker="0"} 1' in text
+        assert 'core_outbox_lag_seconds_count{worker="0"} 1' in text
+
+
+class TestRunWorkers:
+
+    def test_run_workers(self, sqlite_config: dict[str, Any]):
+        write(sqlite_config, 6)
+        stop = multiprocessing.get_context("spawn").Event()
+        runner = threading.Thread(
+            target=outbox.run_workers,
+            args=(
+                functools.partial(create_relay, sqlite_config["connection"]["url"]),
+                2,
+                stop,
+            ),
+        )
+        runner.start()
+        try:
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                if all(row.processed_time for row in rows(sqlite_config)):
+                    break
+                time.sleep(0.05)
+        finally:
+            stop.set()
+            runner.join()
+        assert all(row.processed_time for row in rows(sqlite_config))
@@ -0,0 +1,144 @@
+import contextvars
+import pathlib
+from typing import Any
+
+import pytest
+import sqlalchemy
+
+import core
+from core.adapters import sqlalchemy_adapter as saa
+from core.configurations import DatabaseConfig
+
+
+@pytest.fixture
+def registry() -> saa.EngineRegistry:
+    registry = saa.EngineRegistry()
+    yield registry
+    registry.dispose_all()
+
+
+@pytest.fixture
+def replica_config(tmp_path: pathlib.Path) -> dict[str, Any]:
+    return {
+        "framework": "sqlalchemy",
+        "connection": {"url": f"sqlite:///{tmp_path / 'primary.db'}"},
+        "replicas": [
+            {"url": f"sqlite:///{tmp_path / 'replica-1.db'}"},
+            {"url": f"sqlite:///{tmp_path / 'replica-2.db'}"},
+        ],
+    }
+
+
+@pytest.fixture
+def router(
+    registry: saa.EngineRegistry,
+    replica_config: dict[str, Any],
+) -> saa.ReplicaRouter:
+    return registry.get_replica_router(DatabaseConfig(**replica_config))
+
+
+class TestReplicaRouter:
+
+    def test_shared(
+        self,
+        registry: saa.EngineRegistry,
+        replica_config: dict[str, Any],
+        router: saa.ReplicaRouter,
+    ):
+        assert registry.get_replica_router(DatabaseConfig(**replica_config)) is router
+        assert len(registry.engines) == 3
+
+    def test_round_robin(self, router: saa.ReplicaRouter):
+        chosen = [router.choose() for _ in range(4)]
+        assert chosen == router.replicas * 2
+
+    def test_least_connections(self, router: saa.ReplicaRouter):
+        router.strategy = "least_connections"
+        with router.replicas[0].connect():
+            assert router.choose() is router.replicas[1]
+
+    def test_skip_unhealthy(self, router: saa.ReplicaRouter):
+        router.mark_unhealthy(router.replicas[0])
+        assert {router.choose() for _ in range(2)} == {router.replicas[1]}
+        router.mark_unhealthy(router.replicas[1])
+        assert router.choose() is router.primary
+
+    def test_retry_unhealthy(self, router: saa.ReplicaRouter):
+        router.retry_interval = 0
+        router.mark_unhealthy(router.replicas[0])
+        assert router.replicas[0] in {router.choose() for _ in range(2)}
+
+    def test_connection_failure(self, tmp_path: pathlib.Path):
+        primary = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+        broken = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'missing' / 'x.db'}")
+        router = saa.ReplicaRouter(primary, [broken])
+        with pytest.raises(sqlalchemy.exc.OperationalError):
+            with router.choose().connect():
+                pass
+        assert router.choose() is primary
+
+    def test_stick_to_primary(self, router: saa.ReplicaRouter):
+        def read_after_write() -> sqlalchemy.Engine:
+            saa.stick_to_primary(60)
+            return router.choose()
+
+        assert contextvars.copy_context().run(read_after_write) is router.primary
+        assert router.choose() is not router.primary
+
+    def test_stick_to_primary_clock(self, tmp_path: pathlib.Path):
+        now = [1e9]
+        router = saa.ReplicaRouter(
+            sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'primary.db'}"),
+            [sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'replica.db'}")],
+            clock=lambda: now[0],
+        )
+
+        def read_after_write() -> list[sqlalchemy.Engine]:
+            router.stick_to_primary(60)
+            chosen = [router.choose()]
+            now[0] += 61
+            return chosen + [router.choose()]
+
+        chosen = contextvars.copy_context().run(read_after_write)
+        assert chosen == [router.primary, router.replicas[0]]
+
+
+class TestComponentFactory:
+
+    def test_create_session(self, replica_config: dict[str, Any]):
+        factory = saa.ComponentFactory(replica_config)
+        replicas = factory.replica_router.replicas
+
+        with factory.create_session().core_session as session:
+            assert session.get_bind() is factory.engine
+        with factory.create_session(read_only=True).core_session as session:
+            assert session.get_bind() in replicas
+
+    def test_replica_failure(self, tmp_path: pathlib.Path):
+        primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+        engine = sqlalchemy.create_engine(primary_url)
+        with engine.begin() as connection:
+            connection.execute(sqlalchemy.text("CREATE TABLE t (x INTEGER)"))
+            connection.execute(sqlalchemy.text("INSERT INTO t VALUES (1)"))
+        engine.dispose()
+        factory = saa.ComponentFactory(
+            {
+                "framework": "sqlalchemy",
+                "connection": {"url": primary_url},
+                "replicas": [{"url": f"sqlite:///{tmp_path / 'missing' / 'x.db'}"}],
+            }
+        )
+        router = factory.replica_router
+
+        with factory.create_session(read_only=True).core_session as session:
+            assert session.get_bind() is router.replicas[0]
+            assert session.execute(sqlalchemy.text("SELECT x FROM t")).all() == [(1,)]
+            assert session.get_bind() is router.primary
+        assert router.replicas[0] in router.unhealthy
+        assert router.choose() is router.primary
+
+    def test_read_only_commit(self, replica_config: dict[str, Any]):
+        uow = core.UnitOfWork(replica_config, read_only=True)
+        with uow:
+            with pytest.raises(RuntimeError, match="read-only"):
+                uow.commit()
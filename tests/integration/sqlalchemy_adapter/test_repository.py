@@ -1,3 +1,5 @@
+import uuid
+
 import pytest
 
 from core.adapters import sqlalchemy_adapter
@@ -6,7 +8,9 @@ from tests.double import fake
 
 @pytest.fixture
 def repository(component_factory: sqlalchemy_adapter.ComponentFactory):
-    return component_factory.create_repository()
+    session = component_factory.create_session()
+    yield component_factory.create_repository(session=session)
+    session.close()
 
 
 @pytest.mark.usefixtures("start_orm")
@@ -14,3 +18,98 @@ class TestRepository:
     def test_add(self, repository: sqlalchemy_adapter.Repository):
         repository.add(fake.Model(name="test"))
         assert repository.get_model(fake.Model, name="test") is not None
+
+    def test_iter(self, repository: sqlalchemy_adapter.Repository):
+        message_id = str(uuid.uuid4())
+        repository.add(
+            [fake.Model(name=f"test-{i}", message_id=message_id) for i in range(5)]
+        )
+        models = list(repository.iter(fake.Model, batch_size=2, message_id=message_id))
+        assert sorted(model.name for model in models) == [f"test-{i}" for i in range(5)]
+
+    def test_get_many(self, repository: sqlalchemy_adapter.Repository):
+        models = [fake.Model(name=f"test-{i}") for i in range(3)]
+        repository.add(models)
+        repository.session.flush()
+        repository.cached.clear()
+        ids = [models[2].id, "missing", models[0].id]
+
+        found, missing = repository.get_many(fake.Model, ids)
+
+        assert [model.id for model in found] == [models[2].id, models[0].id]
+        assert missing == ["missing"]
+
+    def test_add_bulk(self, repository: sqlalchemy_adapter.Repository):
+        message_id = str(uuid.uuid4())
+        models = [fake.Model(name=f"test-{i}", message_id=message_id) for i in range(3)]
+
+        repository.add(models, bulk=True)
+        repository.cached.clear()
+
+        assert len(repository.get(fake.Model, message_id=message_id)) == 3
+
+    def test_add_bulk_not_cached(self, repository: sqlalchemy_adapter.Repository):
+        model = fake.Model(name="test", message_id=str(uuid.uuid4()))
+
+        repository.add(model, bulk=True)
+
+        assert model not in repository.cached
+        assert list(repository.cached.dirty.values()) == [model]
+        stored = repository.get_model(fake.Model, id=model.id)
+        assert stored is not model
+        assert stored in repository.session
+
+    def test_add_upsert(self, repository: sqlalchemy_adapter.Repository):
+        model = fake.Model(name="test", message_id=str(uuid.uuid4()))
+        repository.add(model, bulk=True)
+        model.name = "updated"
+
+        repository.add(model, upsert=True)
+        assert repository.cached.get(type(model), model.id) is not model
+        events = list(model.events)
+        assert events
+        assert repository.cached.drain_events() == events
+        repository.cached.clear()
+
+        (stored,) = repository.get(fake.Model, message_id=model.message_id)
+        assert stored.name == "updated"
+
+    def test_remove_where(self, repository: sqlalchemy_adapter.Repository):
+        message_id = str(uuid.uuid4())
+        models = [fake.Model(name=f"test-{i}", message_id=message_id) for i in range(3)]
+        repository.add(models)
+
+        assert repository.remove_where(fake.Model, message_id=message_id) == 3
+        assert len(repository.cached.find(fake.Model, message_id=message_id)) == 0
+        assert repository.get(fake.Model, message_id=message_id) == []
+
+    def test_update_where(self, repository: sqlalchemy_adapter.Repository):
+        message_id = str(uuid.uuid4())
+        models = [fake.Model(name=f"test-{i}", message_id=message_id) for i in range(3)]
+        repository.add(models)
+
+        count = repository.update_where(
+            fake.Model, {"name": "updated"}, message_id=message_id
+        )
+
+        assert count == 3
+        assert all(model.name == "updated" for model in models)
+        repository.cached.clear()
+        stored = repository.get(fake.Model, message_id=message_id)
+        assert [model.name for model in stored] == ["updated"] * 3
+
+    def test_update_where_expression(self, repository: sqlalchemy_adapter.Repository):
+        message_id = str(uuid.uuid4())
+        model = fake.Model(name="test", message_id=message_id)
+        repository.add(model)
+
+        repository.update_where(
+            fake.Model, {"name": fake.Model.name + "-updated"}, message_id=message_id
+        )
+        repository.session.flush()
+
+        assert model.name == "test-updated"
+        repository.cached.clear()
+        repository.session.expire_all()
+        [stored] = repository.get(fake.Model, message_id=message_id)
+        assert stored.name == "test-updated"
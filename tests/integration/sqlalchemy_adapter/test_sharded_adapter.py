@@ -0,0 +1,149 @@
+import pathlib
+import types
+import uuid
+from typing import Any
+
+import pytest
+import sqlalchemy
+
+import core
+from core.adapters import sqlalchemy_sharded_adapter as ssa
+from tests.double import fake
+
+SHARD_IDS = ["shard-1", "shard-2", "shard-3"]
+
+
+@pytest.fixture
+def sharded_config(
+    tmp_path: pathlib.Path,
+    bootstrapper: core.Bootstrapper,
+) -> dict[str, Any]:
+    urls = {
+        shard_id: f"sqlite:///{tmp_path / f'{shard_id}.db'}"
+        for shard_id in ["default", *SHARD_IDS]
+    }
+    metadata = sqlalchemy.inspect(fake.Model).local_table.metadata
+    for url in urls.values():
+        engine = sqlalchemy.create_engine(url)
+        metadata.create_all(engine)
+        engine.dispose()
+
+    ssa.register_shard_key(fake.Model, "id")
+    yield {
+        "framework": "sqlalchemy_sharded",
+        "connection": {"url": urls.pop("default")},
+        "shards": {shard_id: {"url": url} for shard_id, url in urls.items()},
+    }
+    ssa.SHARD_KEYS.pop(fake.Model)
+
+
+@pytest.fixture
+def message_id(sharded_config: dict[str, Any]) -> str:
+    message_id = str(uuid.uuid4())
+    uow = core.UnitOfWork(sharded_config)
+    with uow:
+        uow.repo.add(
+            [fake.Model(name=f"model-{i:02}", message_id=message_id) for i in range(12)]
+        )
+        uow.commit()
+    return message_id
+
+
+class TestShardedComponentFactory:
+
+    def test_add(self, sharded_config: dict[str, Any], message_id: str):
+        factory = ssa.ShardedComponentFactory(sharded_config)
+        counts = {}
+        for shard_id, engine in factory.shard_engines.items():
+            with engine.connect() as connection:
+                counts[shard_id] = connection.execute(
+                    sqlalchemy.text("SELECT count(*) FROM models")
+                ).scalar()
+        assert counts["default"] == 0
+        assert sum(counts.values()) == 12
+        assert all(counts[shard_id] > 0 for shard_id in SHARD_IDS)
+
+    def test_get(self, sharded_config: dict[str, Any], message_id: str):
+        uow = core.UnitOfWork(sharded_config)
+        with uow:
+            models = uow.repo.get_models(fake.Model, message_id=message_id)
+            assert len(models) == 12
+        with uow:
+            model = uow.repo.get_model(fake.Model, id=models[0].id)
+            assert model.name == models[0].name
+            assert uow.factory.shards_for(fake.Model, id=model.id) == [
+                ssa.hash_shard(model.id, SHARD_IDS)
+            ]
+
+    def test_bulk_add_and_remove_where(self, sharded_config: dict[str, Any]):
+        message_id = str(uuid.uuid4())
+        uow = core.UnitOfWork(sharded_config)
+        with uow:
+            uow.repo.add(
+                [fake.Model(name=f"bulk-{i}", message_id=message_id) for i in range(6)],
+                bulk=True,
+            )
+            uow.commit()
+        with uow:
+            assert uow.repo.remove_where(fake.Model, message_id=message_id) == 6
+            uow.commit()
+        with uow:
+            assert uow.repo.get_models(fake.Model, message_id=message_id) == []
+
+
+class TestShardedView:
+
+    @pytest.mark.parametrize(
+        "orders, offset, limit, expected",
+        [
+            pytest.param("+name", 3, 5, range(3, 8), id="success:ascending"),
+            pytest.param("-name", 0, 4, range(11, 7, -1), id="success:descending"),
+            pytest.param("+name", 10, 20, range(10, 12), id="success:last-page"),
+        ],
+    )
+    def test_fetch_models(
+        self,
+        sharded_config: dict[str, Any],
+        message_id: str,
+        orders: str,
+        offset: int,
+        limit: int,
+        expected: range,
+    ):
+        view = core.View(sharded_config)
+        with view.fetch_models(
+            fake.Model, orders=orders, limit=limit, offset=offset, message_id=message_id
+        ) as models:
+            assert [model.name for model in models] == [f"model-{i:02}" for i in expected]
+
+    def test_fetch_pages(self, sharded_config: dict[str, Any], message_id: str):
+        view = core.View(sharded_config)
+        names = []
+        cursor = None
+        while True:
+            with view.fetch_models(
+                fake.Model,
+                orders="+name",
+                limit=5,
+                mode="keyset",
+                cursor=cursor,
+                message_id=message_id,
+            ) as page:
+                names.extend(model.name for model in page)
+                cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert names == [f"model-{i:02}" for i in range(12)]
+
+    def test_merge_sorted_with_nulls(self):
+        def shard(*names: str | None) -> list[types.SimpleNamespace]:
+            return [types.SimpleNamespace(name=name) for name in names]
+
+        merged = ssa.merge_sorted(
+            [shard(None, "b", "d"), shard(None, "a", "c")], [("name", "+")]
+        )
+        assert [model.name for model in merged] == [None, None, "a", "b", "c", "d"]
+        merged = ssa.merge_sorted(
+            [shard("d", "b", None), shard("c", None)], [("name", "-")], limit=3
+        )
+        assert [model.name for model in merged] == ["d", "c", "b"]
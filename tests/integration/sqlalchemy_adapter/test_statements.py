@@ -0,0 +1,153 @@
+import asyncio
+import concurrent.futures
+import logging
+import pathlib
+import threading
+from typing import Any
+
+import pytest
+import sqlalchemy
+
+import core
+from core import dependency_injection, statements
+from tests.double import fake
+
+
+@pytest.fixture
+def sqlite_config(
+    tmp_path: pathlib.Path,
+    bootstrapper: core.Bootstrapper,
+) -> dict[str, Any]:
+    url = f"sqlite:///{tmp_path / 'core.db'}"
+    engine = sqlalchemy.create_engine(url)
+    sqlalchemy.inspect(fake.Model).local_table.metadata.create_all(engine)
+    engine.dispose()
+    config = {"framework": "sqlalchemy", "connection": {"url": url}}
+    uow = core.UnitOfWork(config)
+    with uow:
+        uow.repo.add([fake.Model(name=f"model-{i}") for i in range(5)])
+        uow.commit()
+    return config
+
+
+@pytest.fixture
+def detector() -> statements.NPlusOneDetector:
+    previous = statements.get_detector()
+    detector = statements.NPlusOneDetector(threshold=3)
+    statements.set_detector(detector)
+    yield detector
+    statements.set_detector(previous)
+
+
+def get_each(uow: core.UnitOfWork, count: int):
+    for i in range(count):
+        uow.repo.get_model(fake.Model, name=f"model-{i}")
+
+
+class TestUnitOfWork:
+
+    def test_statements(self, sqlite_config: dict[str, Any]):
+        uow = core.UnitOfWork(sqlite_config)
+        with uow:
+            get_each(uow, 2)
+        assert uow.statements.count == 2
+        assert uow.statements.duration > 0
+        assert len(uow.statements.slowest) == 2
+        assert list(uow.statements.fingerprints.values()) == [2]
+
+        with uow:
+            pass
+        assert uow.statements.count == 0
+
+    def test_warn(
+        self,
+        sqlite_config: dict[str, Any],
+        detector: statements.NPlusOneDetector,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        uow = core.UnitOfWork(sqlite_config)
+        with caplog.at_level(logging.WARNING):
+            with uow:
+                get_each(uow, 3)
+        assert "3x SELECT" in caplog.text
+
+    def test_strict(
+        self,
+        sqlite_config: dict[str, Any],
+        detector: statements.NPlusOneDetector,
+    ):
+        detector.strict = True
+        uow = core.UnitOfWork(sqlite_config)
+        with uow:
+            get_each(uow, 2)
+        with pytest.raises(statements.NPlusOneDetected):
+            with uow:
+                get_each(uow, 3)
+
+    def test_exit(self, sqlite_config: dict[str, Any]):
+        uow = core.UnitOfWork(sqlite_config)
+        uow.__exit__()
+        uow.__enter__()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(uow.__exit__).result()
+        assert not statements.tracking()
+        assert statements.get_detector() is None
+
+    def test_async(self, sqlite_config: dict[str, Any]):
+        pytest.importorskip("aiosqlite")
+        url = sqlite_config["connection"]["url"].replace("sqlite", "sqlite+aiosqlite")
+        uow = core.AsyncUnitOfWork(
+            {
+                "framework": "sqlalchemy",
+                "connection": {
+                    "url": url,
+                    "args": {"poolclass": sqlalchemy.pool.NullPool},
+                },
+            }
+        )
+
+        async def run():
+            async with uow:
+                await uow.repo.get_model(fake.Model, name="model-0")
+
+        asyncio.run(run())
+        assert uow.statements.count == 1
+
+
+class TestMessageBus:
+
+    def test_statements(self, sqlite_config: dict[str, Any]):
+        def read(command: fake.CreateModelCommand, uow: core.UnitOfWork):
+            with uow:
+                get_each(uow, 2)
+
+        bus = core.Bootstrapper(
+            command_router={fake.CreateModelCommand: read},
+            dependencies={"uow": core.UnitOfWork(sqlite_config)},
+        ).bootstrap()
+        bus.handle(fake.CreateModelCommand(name="a"))
+        assert bus.statements.count == 2
+
+    def test_concurrent_statements(self, sqlite_config: dict[str, Any]):
+        barrier = threading.Barrier(2)
+
+        def read(command: fake.CreateModelCommand, uow: core.UnitOfWork):
+            with uow:
+                get_each(uow, int(command.name))
+            barrier.wait(timeout=5)
+
+        bus = core.Bootstrapper(
+            command_router={fake.CreateModelCommand: read},
+            dependencies={
+                "uow": dependency_injection.Scoped(
+                    lambda: core.UnitOfWork(sqlite_config)
+                )
+            },
+        ).bootstrap()
+
+        def handle(count: int) -> int:
+            bus.handle(fake.CreateModelCommand(name=str(count)))
+            return bus.statements.count
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            assert list(executor.map(handle, [1, 3])) == [1, 3]
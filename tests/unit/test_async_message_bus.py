@@ -0,0 +1,146 @@
+import asyncio
+from typing import Any, Generator
+from unittest import mock
+
+import pytest
+
+import core
+from core import dependency_injection, orm
+from tests.double import fake
+
+
+@pytest.fixture
+def start_orm_func(config: dict[str, Any]):
+    yield mock.MagicMock(orm.map_once(lambda: None))
+
+
+@pytest.fixture
+def dependencies(
+    mock_uow: mock.MagicMock,
+) -> Generator[core.Dependencies, Any, None]:
+    yield {
+        "uow": mock_uow,
+    }
+
+
+@pytest.fixture
+def command_router() -> core.CommandRouter:
+    return {
+        fake.CreateModelCommand: mock.AsyncMock(),
+        fake.CreateModelErrorCommand: mock.AsyncMock(side_effect=ValueError),
+    }
+
+
+@pytest.fixture
+def event_router() -> core.EventRouter:
+    return {
+        fake.CreatedModelEvent: [
+            mock.AsyncMock(),
+            mock.Mock(),
+        ],
+        fake.CreatedModelErrorEvent: [
+            mock.Mock(side_effect=ValueError),
+        ],
+    }
+
+
+@pytest.fixture
+def bootstrapper_kwargs(
+    start_orm_func: Any,
+    command_router: core.CommandRouter,
+    event_router: core.EventRouter,
+    dependencies: core.Dependencies,
+):
+    yield {
+        "start_orm_func": start_orm_func,
+        "command_router": command_router,
+        "event_router": event_router,
+        "dependencies": dependencies,
+    }
+
+
+@pytest.fixture
+def message_bus(
+    bootstrapper: core.Bootstrapper,
+) -> Generator[core.AsyncMessageBus, Any, None]:
+    yield bootstrapper.bootstrap_async()
+
+
+class TestAsyncMessageBus:
+
+    def test_handle_command(
+        self,
+        message_bus: core.AsyncMessageBus,
+        command_router: core.CommandRouter,
+    ):
+        command = fake.CreateModelCommand(name="test")
+        asyncio.run(message_bus.handle(command))
+        command_router[fake.CreateModelCommand].assert_awaited_once_with(command)
+
+    def test_handle_command_error(self, message_bus: core.AsyncMessageBus):
+        with pytest.raises(ValueError):
+            asyncio.run(message_bus.handle(fake.CreateModelErrorCommand(name="test")))
+
+    @pytest.mark.parametrize(
+        "event_type",
+        [
+            pytest.param(fake.CreatedModelEvent, id="success"),
+            pytest.param(fake.CreatedModelErrorEvent, id="error"),
+        ],
+    )
+    def test_handle_event(
+        self,
+        message_bus: core.AsyncMessageBus,
+        event_router: core.EventRouter,
+        event_type: type[core.Event],
+    ):
+        event = event_type(model=fake.Model(name="test"))
+        asyncio.run(message_bus.handle(event))
+        for handler in event_router[event_type]:
+            handler.assert_called_once_with(event)
+
+    def test_handle_object_is_not_message(self, message_bus: core.AsyncMessageBus):
+        with pytest.raises(ValueError, match="test was not an Event or Command"):
+            asyncio.run(message_bus.handle("test"))
+
+    def test_handle_concurrently(self, start_orm_func: Any):
+        created, handled = [], []
+
+        class UnitOfWork:
+            def __init__(self):
+                self.events = []
+
+            def collect_event(self):
+                while self.events:
+                    yield self.events.pop(0)
+
+        async def create_model(command: fake.CreateModelCommand, uow: UnitOfWork):
+            await asyncio.sleep(0)
+            for _ in range(2):
+                event = fake.CreatedModelEvent(model=fake.Model(command.name))
+                created.append((event._id, id(uow)))
+                uow.events.append(event)
+            await asyncio.sleep(0)
+
+        async def created_model(event: fake.CreatedModelEvent, uow: UnitOfWork):
+            await asyncio.sleep(0)
+            handled.append((event._id, id(uow)))
+
+        message_bus = core.Bootstrapper(
+            start_orm_func=start_orm_func,
+            command_router={fake.CreateModelCommand: create_model},
+            event_router={fake.CreatedModelEvent: [created_model]},
+            dependencies={"uow": dependency_injection.Scoped(UnitOfWork)},
+        ).bootstrap_async()
+
+        async def run():
+            await asyncio.gather(
+                *(
+                    message_bus.handle(fake.CreateModelCommand(name=str(i)))
+                    for i in range(10)
+                )
+            )
+
+        asyncio.run(run())
+        assert sorted(handled) == sorted(created)
+        assert not message_bus.queue
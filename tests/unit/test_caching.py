@@ -0,0 +1,60 @@
+import pytest
+
+from core import caching
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ModelA:
+    pass
+
+
+class ModelB:
+    pass
+
+
+class TestLRUCache:
+
+    @pytest.fixture
+    def clock(self) -> FakeClock:
+        return FakeClock()
+
+    @pytest.fixture
+    def cache(self, clock: FakeClock) -> caching.LRUCache:
+        return caching.LRUCache(max_size=2, ttl=10, clock=clock)
+
+    def test_get(self, cache: caching.LRUCache):
+        key = caching.make_key(ModelA, "fetch_models", filters={"tags": ["a"]}, limit=20)
+        cache.set(key, ["a"], ModelA)
+        assert cache.get(key) == ["a"]
+        other = caching.make_key(ModelA, "fetch_models", limit=20)
+        assert cache.get(other) is caching.MISSING
+        assert cache.statistics == {"size": 1, "hits": 1, "misses": 1}
+
+    def test_expire(self, cache: caching.LRUCache, clock: FakeClock):
+        cache.set("key", "value", ModelA)
+        clock.now = 10
+        assert cache.get("key") is caching.MISSING
+        assert len(cache) == 0
+
+    def test_evict_least_recently_used(self, cache: caching.LRUCache):
+        cache.set("first", 1, ModelA)
+        cache.set("second", 2, ModelA)
+        cache.get("first")
+        cache.set("third", 3, ModelA)
+        assert cache.get("second") is caching.MISSING
+        assert cache.get("first") == 1
+
+    def test_invalidate(self, cache: caching.LRUCache):
+        caching.register(cache)
+        cache.set("a", 1, ModelA)
+        cache.set("b", 2, ModelB)
+        caching.invalidate(ModelA)
+        assert cache.get("a") is caching.MISSING
+        assert cache.get("b") == 2
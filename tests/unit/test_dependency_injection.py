@@ -0,0 +1,131 @@
+import itertools
+from unittest import mock
+
+import pytest
+
+import core
+from core import dependency_injection
+from tests.double import fake
+
+
+def handler(message, uow, repo=None, *, logger=None):
+    return message, uow, repo, logger
+
+
+class TestInjectDependencies:
+
+    @pytest.mark.parametrize(
+        "dependencies, args, expected",
+        [
+            pytest.param(
+                {},
+                ("m", "uow"),
+                ("m", "uow", None, None),
+                id="success:no-dependencies",
+            ),
+            pytest.param(
+                {"uow": "uow", "repo": "repo"},
+                ("m",),
+                ("m", "uow", "repo", None),
+                id="success:positional",
+            ),
+            pytest.param(
+                {"uow": "uow", "logger": "logger", "unused": "unused"},
+                ("m",),
+                ("m", "uow", None, "logger"),
+                id="success:keyword",
+            ),
+        ],
+    )
+    def test_inject(self, dependencies: dict, args: tuple, expected: tuple):
+        injected = dependency_injection.inject_dependencies(handler, dependencies)
+        assert injected(*args) == expected
+        assert injected.__wrapped__ is handler
+
+    @pytest.mark.parametrize(
+        "dependencies",
+        [
+            pytest.param({}, id="success:no-dependencies"),
+            pytest.param({"uow": "uow"}, id="success:positional"),
+            pytest.param({"uow": "uow", "logger": "logger"}, id="success:keyword"),
+            pytest.param(
+                {"uow": dependency_injection.Factory(lambda: "uow")},
+                id="success:provider",
+            ),
+        ],
+    )
+    def test_inject_kwargs(self, dependencies: dict):
+        injected = dependency_injection.inject_dependencies(handler, dependencies)
+        args = () if dependencies else ("uow",)
+        assert injected("m", *args, repo="repo") == (
+            "m",
+            "uow",
+            "repo",
+            dependencies.get("logger"),
+        )
+
+    def test_factory(self):
+        counter = itertools.count()
+        injected = dependency_injection.inject_dependencies(
+            handler, {"uow": dependency_injection.Factory(lambda: next(counter))}
+        )
+        assert injected("m")[1] == 0
+        assert injected("m")[1] == 1
+
+    def test_singleton(self):
+        factory = mock.Mock(return_value="uow")
+        provider = dependency_injection.Singleton(factory)
+        injected = dependency_injection.inject_dependencies(
+            handler, {"uow": provider, "logger": provider}
+        )
+        assert injected("m") == ("m", "uow", None, "uow")
+        injected("m")
+        factory.assert_called_once_with()
+
+    def test_scoped(self):
+        counter = itertools.count()
+        provider = dependency_injection.Scoped(lambda: next(counter))
+        injected = dependency_injection.inject_dependencies(handler, {"uow": provider})
+        with dependency_injection.scope():
+            assert injected("m")[1] == injected("m")[1] == 0
+            with dependency_injection.scope():
+                assert injected("m")[1] == 0
+        with dependency_injection.scope():
+            assert injected("m")[1] == 1
+        with pytest.raises(RuntimeError):
+            injected("m")
+
+
+class TestScopedUnitOfWork:
+
+    def test_handle(self):
+        uows = []
+
+        def create_uow():
+            uow = mock.MagicMock()
+            uow.collect_event.return_value = []
+            uows.append(uow)
+            return uow
+
+        def create_model(command, uow):
+            uow.repo.add(command.name)
+
+        bootstrapper = core.Bootstrapper(
+            command_router={fake.CreateModelCommand: create_model},
+            dependencies={"uow": dependency_injection.Scoped(create_uow)},
+        )
+        bus = bootstrapper.bootstrap()
+        bus.handle(fake.CreateModelCommand(name="first"))
+        bus.handle(fake.CreateModelCommand(name="second"))
+
+        assert len(uows) == 2
+        for uow, name in zip(uows, ["first", "second"]):
+            uow.repo.add.assert_called_once_with(name)
+            uow.collect_event.assert_called_once_with()
+
+    def test_factory(self):
+        bootstrapper = core.Bootstrapper(
+            dependencies={"uow": dependency_injection.Factory(mock.MagicMock)},
+        )
+        with pytest.raises(ValueError, match="Scoped or Singleton"):
+            bootstrapper.bootstrap()
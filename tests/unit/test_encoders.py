@@ -0,0 +1,76 @@
+import json
+from typing import Any
+
+import pytest
+
+from core import encoders, orm
+from tests.double import fake
+
+
+@pytest.fixture(
+    params=[
+        pytest.param("json", id="success:json"),
+        pytest.param("orjson", id="success:orjson"),
+    ]
+)
+def encoder(request: pytest.FixtureRequest) -> encoders.Encoder:
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+        return encoders.OrjsonEncoder()
+    return encoders.JsonEncoder()
+
+
+class TestEncoder:
+
+    def test_dumps_model(self, encoder: encoders.Encoder):
+        model = fake.Model(name="test")
+        assert json.loads(encoder.dumps(model)) == model.json
+
+    def test_dumps_models(self, encoder: encoders.Encoder):
+        models = [fake.Model(name=f"test-{i}") for i in range(3)]
+        assert json.loads(encoder.dumps(models)) == [model.json for model in models]
+
+    def test_dumps_message(self, encoder: encoders.Encoder):
+        command = fake.CreateModelCommand(name="test")
+        data = encoder.dumps(command)
+        assert isinstance(data, bytes)
+        assert json.loads(data) == {"name": "test"}
+
+    def test_dumps_nested_message(self, encoder: encoders.Encoder):
+        value = {"command": fake.CreateModelCommand(name="test"), "tags": {"a"}}
+        assert encoder.loads(encoder.dumps(value)) == {
+            "command": {"name": "test"},
+            "tags": ["a"],
+        }
+
+    def test_dumps_unsupported(self, encoder: encoders.Encoder):
+        with pytest.raises(TypeError):
+            encoder.dumps(object())
+
+
+class TestPyDict:
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            pytest.param({"a": 1, "b": [1, 2]}, id="success:dict"),
+            pytest.param({"name": "caf\u00e9"}, id="success:non-ascii"),
+            pytest.param({"big": 2**70}, id="success:big-int"),
+            pytest.param(None, id="success:none"),
+        ],
+    )
+    def test_round_trip(self, value: dict[str, Any] | None):
+        column_type = orm.PyDict()
+        stored = column_type.process_bind_param(value, None)
+        assert stored is None or isinstance(stored, str)
+        assert column_type.process_result_value(stored, None) == value
+
+    def test_stored_text(self, encoder: encoders.Encoder):
+        value = {"name": "caf\u00e9", "big": 2**70}
+        encoders.set_encoder(encoder)
+        try:
+            stored = orm.PyDict().process_bind_param(value, None)
+        finally:
+            encoders.set_encoder(None)
+        assert stored == json.dumps(value)
+        assert stored.isascii()
@@ -0,0 +1,202 @@
+import pickle
+from typing import Any
+from unittest import mock
+
+import pytest
+
+from core import abstract
+from core.identity_map import IdentityMap
+from core.models import EventList
+from tests.double import fake
+
+
+class FakeRepository(abstract.Repository):
+    def __init__(self, cache_size: int | None = None):
+        super().__init__(cache_size=cache_size)
+        self.backend = mock.MagicMock()
+        self.backend.get.return_value = []
+
+    def _get(self, model_cls, **identities):
+        return self.backend.get(model_cls, **identities)
+
+    def _add(self, models, *args, **kwargs):
+        return self.backend.add(models, *args, **kwargs)
+
+    def _remove(self, model, *args, **kwargs):
+        return self.backend.remove(model, *args, **kwargs)
+
+
+class TestIdentityMap:
+
+    def test_get(self):
+        model = fake.Model(name="test")
+        identity_map = IdentityMap()
+        identity_map.add(model)
+        assert identity_map.get(fake.Model, model.id) is model
+        assert identity_map.get(fake.Model, "missing") is None
+        assert identity_map.statistics == {"size": 1, "hits": 1, "misses": 1}
+
+    def test_dict_interface(self):
+        model = fake.Model(name="test")
+        identity_map = IdentityMap()
+        identity_map.add(model)
+        assert identity_map[model.id] is model
+        assert model.id in identity_map
+        assert list(identity_map) == list(identity_map.keys()) == [model.id]
+        assert list(identity_map.items()) == [(model.id, model)]
+        identity_map.discard(model)
+        assert model.id not in identity_map
+        with pytest.raises(KeyError):
+            identity_map[model.id]
+
+    def test_shared_id(self):
+        class OtherModel(fake.Model):
+            pass
+
+        model = fake.Model(name="test")
+        other = OtherModel(name="other", id=model.id)
+        identity_map = IdentityMap()
+        identity_map.add(model)
+        identity_map.add(other)
+        assert len(identity_map) == len(list(identity_map)) == 1
+        assert identity_map[model.id] is other
+        assert identity_map.get(fake.Model, model.id) is model
+        assert identity_map.statistics["size"] == 2
+
+    def test_evict_least_recently_used(self):
+        identity_map = IdentityMap(max_size=2)
+        models = [fake.Model(name=f"test-{i}") for i in range(3)]
+        for model in models:
+            model.events.clear()
+            identity_map.add(model)
+        assert models[0] not in identity_map
+        assert models[1] in identity_map
+        assert models[2] in identity_map
+
+    def test_keep_models_with_pending_events(self):
+        identity_map = IdentityMap(max_size=1)
+        models = [fake.Model(name=f"test-{i}") for i in range(2)]
+        for model in models:
+            identity_map.add(model)
+        assert len(identity_map) == 2
+
+    def test_drain_events(self):
+        identity_map = IdentityMap()
+        models = [fake.Model(name=f"test-{i}") for i in range(3)]
+        for model in models:
+            identity_map.add(model)
+        assert len(identity_map.drain_events()) == 3
+        assert identity_map.drain_events() == []
+
+        event = fake.CreatedModelEvent(model=models[1])
+        models[1].events.append(event)
+        assert list(identity_map.dirty.values()) == [models[1]]
+        assert identity_map.drain_events() == [event]
+        assert models[1].events == []
+
+    def test_add_binds_plain_event_list(self):
+        model = fake.Model(name="test")
+        model.events = []
+        IdentityMap().add(model)
+        assert isinstance(model.events, EventList)
+
+    def test_assign_event_list(self):
+        identity_map = IdentityMap()
+        model = fake.Model(name="test")
+        identity_map.add(model)
+        identity_map.drain_events()
+
+        event = fake.CreatedModelEvent(model=model)
+        model.events = [event]
+        assert isinstance(model.events, EventList)
+        assert identity_map.drain_events() == [event]
+        model.events = []
+        model.events.append(event)
+        assert identity_map.drain_events() == [event]
+
+    def test_restore(self):
+        identity_map = IdentityMap()
+        kept = fake.Model(name="kept")
+        identity_map.add(kept)
+        [created] = kept.events
+        snapshot = identity_map.snapshot()
+
+        added = fake.Model(name="added")
+        identity_map.add(added)
+        kept.events.append(fake.CreatedModelEvent(model=kept))
+        identity_map.restore(snapshot)
+
+        assert identity_map.get(fake.Model, added.id) is None
+        assert added.events.journal is None
+        assert identity_map.drain_events() == [created]
+
+    def test_journal_is_weak(self):
+        identity_map = IdentityMap()
+        model = fake.Model(name="test")
+        identity_map.add(model)
+        assert model.events.journal is identity_map
+        del identity_map
+        assert model.events.journal is None
+        model.events.append(fake.CreatedModelEvent(model=model))
+
+    def test_pickle(self):
+        identity_map = IdentityMap()
+        model = fake.Model(name="test")
+        identity_map.add(model)
+        model.events.append(fake.CreatedModelEvent(model=model))
+        loaded = pickle.loads(pickle.dumps(model))
+        assert loaded.name == model.name
+        assert [event._id for event in loaded.events] == [
+            event._id for event in model.events
+        ]
+        assert loaded.events.journal is None
+
+
+class TestRepository:
+
+    @pytest.fixture
+    def repository(self) -> FakeRepository:
+        return FakeRepository()
+
+    @pytest.fixture
+    def model(self) -> fake.Model:
+        return fake.Model(name="test")
+
+    @pytest.mark.parametrize(
+        "identities, hit",
+        [
+            pytest.param({"id": True}, True, id="success:by-id"),
+            pytest.param({"id": True, "name": "test"}, False, id="success:by-id-and-name"),
+            pytest.param({"name": "test"}, False, id="success:by-name"),
+        ],
+    )
+    def test_get_model(
+        self,
+        repository: FakeRepository,
+        model: fake.Model,
+        identities: dict[str, Any],
+        hit: bool,
+    ):
+        repository.add(model)
+        identities = {
+            key: model.id if key == "id" else value for key, value in identities.items()
+        }
+        repository.backend.get.return_value = [model]
+
+        assert repository.get_model(fake.Model, **identities) is model
+        assert repository.backend.get.called is not hit
+
+    def test_remove(self, repository: FakeRepository, model: fake.Model):
+        repository.add(model)
+        repository.remove(model)
+        assert repository.get_model(fake.Model, id=model.id) is None
+        repository.backend.get.assert_called_once_with(fake.Model, id=model.id)
+
+    def test_get_many(self, repository: FakeRepository, model: fake.Model):
+        repository.add(model)
+
+        models, missing = repository.get_many(fake.Model, ["missing", model.id])
+
+        assert models == [model]
+        assert missing == ["missing"]
+        repository.backend.get.assert_called_once_with(fake.Model, id="missing")
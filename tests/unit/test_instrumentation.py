@@ -0,0 +1,157 @@
+import math
+import pathlib
+import urllib.request
+import uuid
+from typing import Any
+
+import pytest
+
+import core
+from core import instrumentation
+from tests.double import fake
+
+
+class RecordingHook(instrumentation.Hook):
+    def __init__(self):
+        self.calls = []
+
+    def before_handler(self, message: Any, handler: str):
+        self.calls.append(("before", type(message).__name__, handler))
+
+    def after_handler(self, message: Any, handler: str, duration: float):
+        self.calls.append(("after", type(message).__name__, handler))
+
+    def on_error(
+        self,
+        message: Any,
+        handler: str,
+        error: BaseException,
+        duration: float,
+    ):
+        self.calls.append(("error", type(message).__name__, handler))
+
+    def on_events_collected(self, message: Any, events: list[Any], duration: float):
+        self.calls.append(("collected", type(message).__name__, len(events)))
+
+    def after_message(self, message: Any, duration: float):
+        self.calls.append(("message", type(message).__name__))
+
+
+def created(event: fake.CreatedModelEvent):
+    pass
+
+
+def failed(event: fake.CreatedModelEvent):
+    raise ValueError
+
+
+@pytest.fixture
+def collector() -> instrumentation.MetricsCollector:
+    return instrumentation.MetricsCollector()
+
+
+@pytest.fixture
+def hook() -> RecordingHook:
+    return RecordingHook()
+
+
+@pytest.fixture
+def bus(hook: RecordingHook, collector: instrumentation.MetricsCollector):
+    config = {"framework": "memory", "connection": {"url": f"memory://{uuid.uuid4()}"}}
+    return core.Bootstrapper(
+        command_router={fake.CreateModelCommand: fake.create_model},
+        event_router={fake.CreatedModelEvent: [created, failed]},
+        dependencies={"uow": core.UnitOfWork(config)},
+        hooks=[hook, collector],
+    ).bootstrap()
+
+
+class TestHistogram:
+
+    def test_observe(self):
+        histogram = instrumentation.Histogram([1, 2, 4])
+        for value in [0.5, 1, 1.5, 3, 10]:
+            histogram.observe(value)
+        assert histogram.cumulative() == [(1, 2), (2, 3), (4, 4), (math.inf, 5)]
+        assert histogram.count == 5
+        assert histogram.sum == 16
+        assert histogram.quantile(0.5) == pytest.approx(1.5)
+        assert histogram.quantile(1) == 4
+        assert math.isnan(instrumentation.Histogram().quantile(0.5))
+
+
+class TestHooks:
+
+    def test_handle(self, bus: core.MessageBus, hook: RecordingHook):
+        bus.handle(fake.CreateModelCommand(name="a"))
+        assert hook.calls == [
+            ("before", "CreateModelCommand", "create_model"),
+            ("after", "CreateModelCommand", "create_model"),
+            ("collected", "CreateModelCommand", 1),
+            ("before", "CreatedModelEvent", "created"),
+            ("after", "CreatedModelEvent", "created"),
+            ("collected", "CreatedModelEvent", 0),
+            ("before", "CreatedModelEvent", "failed"),
+            ("error", "CreatedModelEvent", "failed"),
+            ("message", "CreateModelCommand"),
+        ]
+
+
+class TestMetricsCollector:
+
+    def test_statistics(
+        self,
+        bus: core.MessageBus,
+        collector: instrumentation.MetricsCollector,
+    ):
+        for name in ["a", "b"]:
+            bus.handle(fake.CreateModelCommand(name=name))
+        statistics = collector.statistics()
+        assert statistics[("CreateModelCommand", "create_model")]["count"] == 2
+        assert statistics[("CreatedModelEvent", "failed")]["error_rate"] == 1
+        assert statistics[("CreatedModelEvent", "created")]["errors"] == 0
+        assert collector.events["CreateModelCommand"] == 2
+        assert collector.messages["CreateModelCommand"].count == 2
+
+
+class TestPrometheusExporter:
+
+    @pytest.fixture
+    def exporter(
+        self,
+        bus: core.MessageBus,
+        collector: instrumentation.MetricsCollector,
+    ) -> instrumentation.PrometheusExporter:
+        bus.handle(fake.CreateModelCommand(name="a"))
+        return instrumentation.PrometheusExporter(collector)
+
+    def test_render(self, exporter: instrumentation.PrometheusExporter):
+        text = exporter.render()
+        labels = 'message_type="CreatedModelEvent",handler="failed"'
+        assert "# TYPE core_handler_duration_seconds histogram" in text
+        assert f'core_handler_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+        assert f"core_handler_duration_seconds_count{{{labels}}} 1" in text
+        assert f"core_handler_errors_total{{{labels}}} 1" in text
+        assert (
+            'core_events_collected_total{message_type="CreateModelCommand"} 1' in text
+        )
+
+    def test_write(
+        self,
+        exporter: instrumentation.PrometheusExporter,
+        tmp_path: pathlib.Path,
+    ):
+        path = tmp_path / "core.prom"
+        exporter.write(path)
+        assert path.read_text() == exporter.render()
+        assert [file.name for file in tmp_path.iterdir()] == ["core.prom"]
+
+    def test_serve(self, exporter: instrumentation.PrometheusExporter):
+        server = exporter.serve(0, host="127.0.0.1")
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url) as response:
+                assert response.read().decode() == exporter.render()
+        finally:
+            server.shutdown()
+            server.server_close()
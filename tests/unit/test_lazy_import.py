@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+import pytest
+
+import core
+
+
+def run(statement: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+
+
+class TestLazyImport:
+
+    @pytest.mark.parametrize(
+        "statement, unloaded",
+        [
+            pytest.param("import core", "core.messages", id="success:import"),
+            pytest.param(
+                "import core; core.Command", "sqlalchemy", id="success:messages"
+            ),
+            pytest.param(
+                "import core; core.MessageBus", "sqlalchemy", id="success:message-bus"
+            ),
+        ],
+    )
+    def test_import(self, statement: str, unloaded: str):
+        loaded = run(f"{statement}; import sys; print(sorted(sys.modules))")
+        assert f"'{unloaded}'" not in loaded
+
+    def test_config_not_read(self):
+        statement = (
+            "import utils; utils.get_config = None; "
+            "import core.views, core.unit_of_work; print(core.View)"
+        )
+        assert run(statement) == "<class 'core.views.View'>"
+
+    def test_public_names(self):
+        for name in core.__all__:
+            assert getattr(core, name) is not None
+        assert "View" in dir(core)
+        with pytest.raises(AttributeError):
+            core.missing
+
+    def test_view(self):
+        view = core.View({"connection": {"url": "sqlite://"}})
+        previous = core.get_view()
+        try:
+            core.set_view(view)
+            assert core.VIEW is view
+        finally:
+            core.set_view(previous)
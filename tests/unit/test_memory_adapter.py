@@ -0,0 +1,207 @@
+import uuid
+from typing import Any
+
+import pytest
+
+import core
+from core.adapters import memory_adapter
+from tests.double import fake
+
+
+@pytest.fixture
+def config() -> dict[str, Any]:
+    return {"framework": "memory", "connection": {"url": f"memory://{uuid.uuid4()}"}}
+
+
+@pytest.fixture
+def models(config: dict[str, Any]) -> list[fake.Model]:
+    models = [fake.Model(name=name) for name in ["c", "a", "b", "a"]]
+    with core.UnitOfWork(config) as uow:
+        uow.repo.add(models)
+        uow.commit()
+    return models
+
+
+class TestUnitOfWork:
+
+    def test_commit(self, config: dict[str, Any], models: list[fake.Model]):
+        with core.UnitOfWork(config) as uow:
+            model = uow.repo.get_model(fake.Model, id=models[0].id)
+            assert model is not models[0]
+            assert model.name == "c"
+            model.update(password="secret")
+            uow.commit()
+
+        with core.UnitOfWork(config) as uow:
+            assert uow.repo.get_model(fake.Model, id=models[0].id).password == "secret"
+
+    def test_rollback(self, config: dict[str, Any], models: list[fake.Model]):
+        with core.UnitOfWork(config) as uow:
+            model = uow.repo.get_model(fake.Model, id=models[0].id)
+            model.update(password="secret")
+            uow.repo.remove(uow.repo.get_model(fake.Model, id=models[1].id))
+            uow.repo.add(fake.Model(name="d"))
+            uow.rollback()
+            assert model.password == "password"
+            uow.commit()
+
+        with core.UnitOfWork(config) as uow:
+            names = sorted(model.name for model in uow.repo.get_models(fake.Model))
+            assert names == ["a", "a", "b", "c"]
+
+    def test_nested(self, config: dict[str, Any], models: list[fake.Model]):
+        uow = core.UnitOfWork(config)
+        with uow:
+            uow.repo.add(fake.Model(name="d"))
+            with uow:
+                uow.repo.add(fake.Model(name="e"))
+                uow.commit()
+            with uow:
+                uow.repo.get_model(fake.Model, id=models[0].id).update(name="x")
+                uow.repo.add(fake.Model(name="f"))
+                uow.rollback()
+            with uow:
+                uow.repo.add(fake.Model(name="g"))
+            uow.commit()
+
+        with core.UnitOfWork(config) as uow:
+            names = sorted(model.name for model in uow.repo.get_models(fake.Model))
+            assert names == ["a", "a", "b", "c", "d", "e"]
+
+    def test_remove_where(self, config: dict[str, Any], models: list[fake.Model]):
+        with core.UnitOfWork(config) as uow:
+            assert uow.repo.remove_where(fake.Model, name="a") == 2
+            uow.commit()
+
+        with core.UnitOfWork(config) as uow:
+            assert uow.repo.get_models(fake.Model, name="a") == []
+
+    def test_update_where(self, config: dict[str, Any], models: list[fake.Model]):
+        with core.UnitOfWork(config) as uow:
+            loaded = uow.repo.get_models(fake.Model, name="a")
+            assert uow.repo.update_where(fake.Model, {"name": "d"}, name="a") == 2
+            assert [model.name for model in loaded] == ["d", "d"]
+            uow.commit()
+
+        with core.UnitOfWork(config) as uow:
+            assert len(uow.repo.get_models(fake.Model, name="d")) == 2
+
+    def test_collect_event(self, config: dict[str, Any]):
+        with core.UnitOfWork(config) as uow:
+            uow.repo.add(fake.Model(name="a"))
+            uow.commit()
+        assert [type(event) for event in uow.collect_event()] == [
+            fake.CreatedModelEvent
+        ]
+
+
+class TestMemoryTable:
+
+    def test_index(self, config: dict[str, Any], models: list[fake.Model]):
+        table = memory_adapter.get_database(config["connection"]["url"]).table(
+            fake.Model
+        )
+        assert {model.id for model in table.find(name="a")} == {
+            models[1].id,
+            models[3].id,
+        }
+        assert "name" in table.indexes
+
+        with core.UnitOfWork(config) as uow:
+            uow.repo.get_model(fake.Model, id=models[1].id).name = "b"
+            uow.commit()
+        assert [model.id for model in table.find(name="a")] == [models[3].id]
+        assert len(table.find(name="b")) == 2
+
+    def test_unhashable(self):
+        table = memory_adapter.MemoryTable()
+        model = fake.Model(name="a")
+        model.tags = ["x"]
+        table.put(model)
+        assert table.find(tags=["x"]) == [model]
+        assert "tags" in table.unindexable
+
+
+class TestView:
+
+    @pytest.fixture
+    def view(self, config: dict[str, Any]) -> core.View:
+        return core.View(config)
+
+    def test_fetch_model(self, view: core.View, models: list[fake.Model]):
+        with view.fetch_model(fake.Model, id=models[2].id) as model:
+            assert model.name == "b"
+        with view.fetch_model(fake.Model, name="z") as model:
+            assert model is None
+
+    def test_fetch_models(self, view: core.View, models: list[fake.Model]):
+        with view.fetch_models(fake.Model, orders="-name", limit=2, offset=1) as page:
+            assert [model.name for model in page] == ["b", "a"]
+        with view.fetch_models(fake.Model, name="a") as page:
+            assert len(page) == 2
+
+    def test_keyset(self, view: core.View, models: list[fake.Model]):
+        with view.fetch_models(
+            fake.Model, orders="+name", limit=3, mode="keyset"
+        ) as first:
+            assert [model.name for model in first] == ["a", "a", "b"]
+        with view.fetch_models(
+            fake.Model,
+            orders="+name",
+            limit=3,
+            mode="keyset",
+            cursor=first.next_cursor,
+        ) as second:
+            assert [model.name for model in second] == ["c"]
+            assert second.next_cursor is None
+        with view.fetch_models(
+            fake.Model,
+            orders="+name",
+            limit=3,
+            mode="keyset",
+            cursor=second.prev_cursor,
+        ) as previous:
+            assert [model.id for model in previous] == [model.id for model in first]
+
+    def test_stream_models(self, view: core.View, models: list[fake.Model]):
+        with view.stream_models(fake.Model, orders="-name") as stream:
+            assert [model.name for model in stream] == ["c", "b", "a", "a"]
+
+    @pytest.mark.parametrize(
+        "orders, expected",
+        [
+            pytest.param("+password", [None, None, "x", "y"], id="success:ascending"),
+            pytest.param("-password", ["y", "x", None, None], id="success:descending"),
+        ],
+    )
+    def test_fetch_models_with_nulls(
+        self,
+        config: dict[str, Any],
+        view: core.View,
+        orders: str,
+        expected: list[str | None],
+    ):
+        with core.UnitOfWork(config) as uow:
+            uow.repo.add(
+                [
+                    fake.Model(name=str(i), password=password)
+                    for i, password in enumerate(["y", None, "x", None])
+                ]
+            )
+            uow.commit()
+        with view.fetch_models(fake.Model, orders=orders) as page:
+            assert [model.password for model in page] == expected
+
+
+class TestMessageBus:
+
+    def test_handle(self, config: dict[str, Any]):
+        bus = core.Bootstrapper(
+            command_router={fake.CreateModelCommand: fake.create_model},
+            event_router={fake.CreatedModelEvent: []},
+            dependencies={"uow": core.UnitOfWork(config)},
+        ).bootstrap()
+        bus.handle(fake.CreateModelCommand(name="a"))
+
+        with core.View(config).fetch_model(fake.Model, name="a") as model:
+            assert model is not None
@@ -7,7 +7,7 @@ from icecream import ic
 from sqlalchemy import Column, DateTime, String, Table
 
 import core
-from core import orm
+from core import dependency_injection, orm
 from tests.double import fake
 
 logger = utils.get_logger()
@@ -190,3 +190,135 @@ class TestMessageBus:
         message = "test"
         with pytest.raises(ValueError, match=f"{message} was not an Event or Command"):
             message_bus.handle(message)
+
+    def test_handle_raise_errors(
+        self,
+        message_bus: core.MessageBus,
+    ):
+        message = fake.CreatedModelErrorEvent(model=fake.Model(name="test"))
+        message_bus.handle(message)
+        with pytest.raises(ValueError):
+            message_bus.handle(message, raise_errors=True)
+        message_bus.handle(message)
+
+    def test_handle_event_subclass(
+        self,
+        message_bus: core.MessageBus,
+    ):
+        class CreatedSubModelEvent(fake.CreatedModelEvent):
+            pass
+
+        message = CreatedSubModelEvent(model=fake.Model(name="test"))
+        message_bus.handle(message)
+        for handler in message_bus.event_handlers[fake.CreatedModelEvent]:
+            handler.__wrapped__.assert_called_once_with(message)
+
+    def test_handle_event_without_handlers(
+        self,
+        message_bus: core.MessageBus,
+    ):
+        class UnhandledEvent(core.Event):
+            pass
+
+        with pytest.raises(KeyError):
+            message_bus.handle(UnhandledEvent())
+
+    def test_set_queue(
+        self,
+        message_bus: core.MessageBus,
+    ):
+        event = fake.CreatedModelEvent(model=fake.Model(name="test"))
+
+        def replace_queue(command: fake.CreateModelCommand):
+            message_bus.queue = [event]
+
+        message_bus.command_handlers[fake.CreateModelCommand] = replace_queue
+        message_bus.handle(fake.CreateModelCommand(name="test"))
+        for handler in message_bus.event_handlers[fake.CreatedModelEvent]:
+            handler.__wrapped__.assert_called_once_with(event)
+
+    def test_handle_skips_debug_logging_when_disabled(
+        self,
+        message_bus: core.MessageBus,
+    ):
+        with mock.patch.object(message_bus, "logger") as mock_logger:
+            mock_logger.isEnabledFor.return_value = False
+            message_bus.handle(fake.CreatedModelEvent(model=fake.Model(name="test")))
+            mock_logger.debug.assert_not_called()
+
+
+class TestConcurrentMessageBus:
+
+    @pytest.fixture
+    def dependencies(
+        self,
+        mock_uow: mock.MagicMock,
+    ) -> Generator[core.Dependencies, Any, None]:
+        yield {
+            "uow": dependency_injection.Scoped(lambda: mock_uow),
+        }
+
+    @pytest.fixture
+    def bootstrapper_kwargs(
+        self,
+        start_orm_func: Any,
+        command_router: core.CommandRouter,
+        event_router: core.EventRouter,
+        dependencies: core.Dependencies,
+    ):
+        yield {
+            "start_orm_func": start_orm_func,
+            "command_router": command_router,
+            "event_router": event_router,
+            "dependencies": dependencies,
+            "concurrent_events": True,
+            "max_event_workers": 2,
+        }
+
+    def test_bootstrap_shares_executor(self, bootstrapper: core.Bootstrapper):
+        first, second = bootstrapper.bootstrap(), bootstrapper.bootstrap()
+        assert first.event_executor is not None
+        assert first.event_executor is second.event_executor
+
+    def test_shutdown(self, bootstrapper: core.Bootstrapper):
+        executor = bootstrapper.bootstrap().event_executor
+        bootstrapper.shutdown()
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
+        assert bootstrapper.bootstrap().event_executor is not executor
+        bootstrapper.shutdown()
+
+    def test_init_requires_scoped_uow(self, mock_uow: mock.MagicMock):
+        with pytest.raises(ValueError, match="Scoped uow"):
+            core.MessageBus(mock_uow, {}, {}, event_executor=mock.Mock())
+
+    @pytest.mark.parametrize(
+        "message, assert_func, collect_count",
+        [
+            pytest.param(
+                fake.CreatedModelEvent(model=fake.Model(name="test")),
+                "handle_created_model_event",
+                2,
+                id="handle_event_success",
+            ),
+            pytest.param(
+                fake.CreatedModelErrorEvent(model=fake.Model(name="test")),
+                "handle_created_model_error_event",
+                0,
+                id="handle_event_error",
+            ),
+        ],
+        indirect=["assert_func"],
+    )
+    def test_handle_event(
+        self,
+        message_bus: core.MessageBus,
+        mock_uow: mock.MagicMock,
+        message,
+        assert_func,
+        collect_count: int,
+    ):
+        assert_func(message, message_bus)
+        for handler in message_bus.event_handlers[type(message)]:
+            handler.__wrapped__.assert_called_once_with(message)
+        assert mock_uow.collect_event.call_count == collect_count
@@ -0,0 +1,69 @@
+import dataclasses
+from datetime import UTC, datetime
+from unittest import mock
+
+import pytest
+
+import core
+from core import encoders
+
+
+@dataclasses.dataclass(slots=True)
+class PingCommand(core.LightCommand):
+    name: str
+
+
+@dataclasses.dataclass(slots=True)
+class PingedEvent(core.LightEvent):
+    name: str
+    count: int = 1
+
+
+class TestLightMessage:
+
+    def test_slots(self):
+        assert not hasattr(PingCommand(name="test"), "__dict__")
+
+    def test_id(self):
+        first, second = PingCommand(name="test"), PingCommand(name="test")
+        assert first._id == first._id
+        assert first._id != second._id
+        assert first == second
+
+    def test_created_time(self):
+        before = datetime.now(UTC)
+        event = PingedEvent(name="test")
+        assert before <= event._created_time <= datetime.now(UTC)
+
+    def test_encode(self):
+        event = PingedEvent(name="test")
+        assert encoders.loads(encoders.dumps(event)) == {"name": "test", "count": 1}
+
+
+class TestLightMessageBus:
+
+    @pytest.fixture
+    def bootstrapper(self, mock_uow: mock.MagicMock) -> core.Bootstrapper:
+        return core.Bootstrapper(
+            command_router={PingCommand: mock.Mock()},
+            event_router={PingedEvent: [mock.Mock(), mock.Mock()]},
+            dependencies={"uow": mock_uow},
+        )
+
+    @pytest.mark.parametrize(
+        "message, router",
+        [
+            pytest.param(PingCommand(name="test"), "command_router", id="success:command"),
+            pytest.param(PingedEvent(name="test"), "event_router", id="success:event"),
+        ],
+    )
+    def test_handle(
+        self,
+        bootstrapper: core.Bootstrapper,
+        message: core.LightMessage,
+        router: str,
+    ):
+        bootstrapper.bootstrap().handle(message)
+        handlers = getattr(bootstrapper, router)[type(message)]
+        for handler in handlers if isinstance(handlers, list) else [handlers]:
+            handler.assert_called_once_with(message)
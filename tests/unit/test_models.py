@@ -7,6 +7,7 @@ import pytest
 from icecream import ic
 
 import core
+from core import models
 from tests.double import fake
 
 
@@ -130,3 +131,19 @@ class TestInheritModel:
     def test_json(self, l0_model: L0Model):
         ic(l0_model.json["j"])
         json.dumps(l0_model.json)
+
+    def test_json_matches_dict_json(self, l0_model: L0Model):
+        model_json = l0_model.json
+        legacy_json = core.BaseModel.dict_json(
+            {
+                key: value
+                for key, value in l0_model.__dict__.items()
+                if key not in l0_model.ignore_keys and models.is_serializable(key)
+            }
+        )
+        assert model_json == legacy_json
+
+    def test_json_does_not_mutate_model(self):
+        model = L0Model(i={"0": L1Model()})
+        model.json
+        assert isinstance(model.i["0"], L1Model)
@@ -0,0 +1,78 @@
+import contextvars
+
+import pytest
+
+from core import statements
+
+
+class TestFingerprint:
+
+    @pytest.mark.parametrize(
+        "statement, expected",
+        [
+            pytest.param(
+                "SELECT * FROM models WHERE id = ?",
+                "SELECT * FROM models WHERE id = ?",
+                id="success:qmark",
+            ),
+            pytest.param(
+                "SELECT * FROM models\n WHERE id = %(id_1)s AND name = 'x'",
+                "SELECT * FROM models WHERE id = ? AND name = ?",
+                id="success:pyformat-literal",
+            ),
+            pytest.param(
+                "SELECT * FROM models WHERE id IN (?, ?, ?) LIMIT 10",
+                "SELECT * FROM models WHERE id IN (?) LIMIT ?",
+                id="success:in-list",
+            ),
+            pytest.param(
+                "SELECT * FROM t1 WHERE a = $1 AND b = :b AND c::text = 'it''s'",
+                "SELECT * FROM t1 WHERE a = ? AND b = ? AND c::text = ?",
+                id="success:identifiers-kept",
+            ),
+        ],
+    )
+    def test_fingerprint(self, statement: str, expected: str):
+        assert statements.fingerprint(statement) == expected
+
+
+class TestStatementStats:
+
+    def test_record(self):
+        outer = statements.StatementStats(keep=2)
+        inner = statements.StatementStats()
+        statements.record("SELECT 1", 1.0)
+        with outer:
+            statements.record("SELECT 1", 1.0)
+            with inner:
+                statements.record("SELECT 2", 3.0)
+            statements.record("SELECT 3", 2.0)
+        assert not statements.tracking()
+        assert (outer.count, outer.duration) == (3, 6.0)
+        assert outer.slowest == [("SELECT 2", 3.0), ("SELECT 3", 2.0)]
+        assert inner.summary() == {
+            "count": 1,
+            "duration": 3.0,
+            "slowest": [("SELECT 2", 3.0)],
+        }
+
+    def test_exit(self):
+        stats = statements.StatementStats()
+        stats.__exit__()
+        context = contextvars.copy_context()
+        context.run(stats.__enter__)
+        stats.__enter__()
+        context.run(stats.__exit__)
+        stats.__exit__()
+        assert not statements.tracking()
+        assert not context.run(statements.tracking)
+
+    def test_detector(self):
+        stats = statements.StatementStats()
+        for i in range(3):
+            stats.add(f"SELECT * FROM models WHERE id = {i}", 0.1)
+            stats.add(f"UPDATE models SET name = 'x' WHERE id = {i}", 0.1)
+        detector = statements.NPlusOneDetector(threshold=3, strict=True)
+        assert detector.find(stats) == [("SELECT * FROM models WHERE id = ?", 3)]
+        with pytest.raises(statements.NPlusOneDetected):
+            detector.check(stats)